@@ -1,11 +1,33 @@
 """SmartCloudAge integration."""
 
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-import json
 import logging
+import time
 
 from homeassistant.components import mqtt
-from homeassistant.helpers.event import async_track_time_interval
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.start import async_at_started
+
+from .availability import (
+    CONF_AVAILABILITY_TIMEOUT,
+    DEFAULT_AVAILABILITY_TIMEOUT,
+    AvailabilityTracker,
+)
+from .commands import OutputCommandBatcher
+from .controller import ControllerState, build_controller_states
+from .encoder import CommandEncoder
+from .dispatcher import CONF_DEFER_STARTUP, CONF_FLEET_MODE, SmartCloudAgeDispatcher
+from .reconcile import (
+    DeviceReconciler,
+    async_remove_device_entry,
+    diff_devices,
+    settings_changed,
+)
+from .rtc import RtcSyncScheduler
+from .services import async_setup_services
+from .stats import IntegrationStats
+from .storage import PulseStore
 
 DOMAIN = "smartcloudage"
 PLATFORMS = ["switch", "sensor"]
@@ -15,8 +37,31 @@ WRITE = 1
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+## @brief Runtime objects shared by the platforms of a configuration entry.
+@dataclass
+class SmartCloudAgeData:
+    """Per-entry runtime state stored in ``entry.runtime_data``."""
+
+    dispatcher: SmartCloudAgeDispatcher
+    rtc: RtcSyncScheduler
+    stats: IntegrationStats
+    commands: OutputCommandBatcher
+    controllers: dict[str, ControllerState]
+    pulse_store: PulseStore
+    availability: AvailabilityTracker
+    ## Options the entry was loaded or last reconciled with.
+    options: dict
+    ## Per-platform callbacks applying a controller change to its entities.
+    reconcilers: list[DeviceReconciler] = field(default_factory=list)
+
 
 ## @brief Builds the command used to synchronize a controller's real-time clock.
+#
+#  The published command is encoded by @c CommandEncoder.rtc, which produces
+#  the same JSON without building this dictionary.
 #  @param device_id Unique identifier of the target SmartCloudAge controller.
 #  @param signature Optional command signature; defaults to @p device_id.
 #  @return Dictionary containing the command, current local date/time and signature.
@@ -42,41 +87,117 @@ def build_datetime_payload(device_id, signature=None):
     }
 
 
+## @brief Registers the integration-wide service actions.
+#  @param hass Active Home Assistant instance.
+#  @param config Home Assistant YAML configuration, unused by this integration.
+#  @return Always @c True.
+async def async_setup(hass, config):
+    """Set up the SmartCloudAge services."""
+    async_setup_services(hass)
+    return True
+
+
 ## @brief Sets up a SmartCloudAge configuration entry.
+#
+#  With @c CONF_DEFER_STARTUP the MQTT subscriptions and the first RTC round
+#  wait until Home Assistant has started. The duration of each setup phase is
+#  recorded in the entry statistics.
 #  @param hass Active Home Assistant instance.
 #  @param entry SmartCloudAge configuration entry being loaded.
-#  @return @c True after platforms and periodic RTC synchronization are registered.
+#  @return @c True after platforms, MQTT subscriptions and periodic RTC
+#          synchronization are registered or scheduled.
 async def async_setup_entry(hass, entry):
     """Set up SmartCloudAge from a config entry."""
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.async_on_unload(entry.add_update_listener(_async_reload_entry))
-
+    setup_started = time.monotonic()
+    stats = IntegrationStats()
+    dispatcher = SmartCloudAgeDispatcher(
+        hass, fleet_mode=entry.options.get(CONF_FLEET_MODE, False), stats=stats
+    )
     devices = entry.options.get("devices", entry.data.get("devices", []))
+    encoder = CommandEncoder()
+    controllers = build_controller_states(devices)
+    pulse_store = PulseStore(hass, entry.entry_id, controllers)
+    phase_started = time.monotonic()
+    await pulse_store.async_load()
+    stats.record_setup_phase("storage", time.monotonic() - phase_started)
 
-    ## @brief Publishes the current date and time to every configured controller.
-    #  @param _now Timestamp supplied by Home Assistant's interval tracker.
-    async def send_datetime_to_devices(_now):
-        for device in devices:
-            device_id = device.get("device_id")
-            if not device_id:
-                continue
-            signature = device.get("signature", device_id)
-            await mqtt.async_publish(
-                hass,
-                f"CloudAge/{device_id}",
-                json.dumps(build_datetime_payload(device_id, signature)),
-                0,
-                False,
-            )
-
-    entry.async_on_unload(
-        async_track_time_interval(
-            hass,
-            send_datetime_to_devices,
-            timedelta(minutes=SYNC_RTC_INTERVAL),
+    ## @brief Publishes the current date and time to one controller.
+    #  @param device_id Unique controller identifier.
+    #  @param signature Command signature expected by the controller.
+    async def send_datetime(device_id, signature):
+        topic, payload = encoder.rtc(device_id, signature or device_id, datetime.now())
+        started = time.monotonic()
+        await mqtt.async_publish(hass, topic, payload, 0, False)
+        stats.record_publish(time.monotonic() - started)
+
+    availability = AvailabilityTracker(
+        hass,
+        controllers,
+        devices,
+        entry.options.get(CONF_AVAILABILITY_TIMEOUT, DEFAULT_AVAILABILITY_TIMEOUT),
+    )
+    # Registered first so a recovered controller is available before its
+    # entities are written from the same frame.
+    for device_id in controllers:
+        dispatcher.async_register_diagnostic_handler(
+            device_id, availability.async_frame_received
         )
+    rtc = RtcSyncScheduler(
+        hass,
+        (
+            (device["device_id"], device.get("signature", device["device_id"]))
+            for device in devices
+            if device.get("device_id")
+        ),
+        send_datetime,
+        timedelta(minutes=SYNC_RTC_INTERVAL),
+        stats=stats,
+    )
+    for device_id in rtc.device_ids:
+        dispatcher.async_register_diagnostic_handler(
+            device_id, rtc.async_frame_received
+        )
+    commands = OutputCommandBatcher(
+        hass, stats, encoder=encoder, on_publish=dispatcher.async_forget_frames
+    )
+    entry.runtime_data = SmartCloudAgeData(
+        dispatcher=dispatcher,
+        rtc=rtc,
+        stats=stats,
+        commands=commands,
+        controllers=controllers,
+        pulse_store=pulse_store,
+        availability=availability,
+        options=dict(entry.options),
+    )
+    entry.async_on_unload(commands.async_cancel)
+
+    phase_started = time.monotonic()
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    stats.record_setup_phase("platforms", time.monotonic() - phase_started)
+    entry.async_on_unload(dispatcher.async_unsubscribe)
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+
+    ## @brief Subscribes to the controllers and starts RTC synchronization.
+    #  @param _hass Home Assistant instance supplied by @c async_at_started.
+    async def async_start_traffic(_hass=None):
+        phase_started = time.monotonic()
+        await dispatcher.async_subscribe()
+        stats.record_setup_phase("subscribe", time.monotonic() - phase_started)
+        entry.async_on_unload(availability.async_start())
+        entry.async_on_unload(rtc.async_start())
+        hass.async_create_task(rtc.async_sync_all())
+
+    if entry.options.get(CONF_DEFER_STARTUP, False):
+        entry.async_on_unload(async_at_started(hass, async_start_traffic))
+    else:
+        await async_start_traffic()
+    stats.record_setup_phase("total", time.monotonic() - setup_started)
+    _LOGGER.debug(
+        "SmartCloudAge setup of %d controllers: %s",
+        len(controllers),
+        stats.setup_timings,
     )
-    hass.async_create_task(send_datetime_to_devices(None))
     return True
 
 
@@ -86,12 +207,86 @@ async def async_setup_entry(hass, entry):
 #  @return Whether every forwarded platform was successfully unloaded.
 async def async_unload_entry(hass, entry):
     """Unload a SmartCloudAge config entry."""
+    await entry.runtime_data.pulse_store.async_save()
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
-## @brief Reloads a configuration entry after its options change.
+## @brief Deletes the persisted data of a removed configuration entry.
+#  @param hass Active Home Assistant instance.
+#  @param entry SmartCloudAge configuration entry being removed.
+async def async_remove_entry(hass, entry):
+    """Remove the stored pulse accumulators of a SmartCloudAge entry."""
+    await PulseStore(hass, entry.entry_id, {}).async_remove()
+
+
+## @brief Applies an options change to a loaded configuration entry.
+#
+#  Changes limited to the device list are reconciled controller by
+#  controller: only the entities, subscriptions and RTC slots of added,
+#  removed or edited controllers change, and every other controller keeps
+#  its entities and in-memory state. Entry-wide settings still reload the
+#  entry.
 #  @param hass Active Home Assistant instance.
 #  @param entry Updated SmartCloudAge configuration entry.
-async def _async_reload_entry(hass, entry):
-    """Reload entities after an options change."""
-    await hass.config_entries.async_reload(entry.entry_id)
+async def _async_options_updated(hass, entry):
+    """Reconcile entities after an options change."""
+    data = entry.runtime_data
+    if settings_changed(data.options, entry.options):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    old_devices = data.options.get("devices", entry.data.get("devices", []))
+    new_devices = entry.options.get("devices", entry.data.get("devices", []))
+    data.options = dict(entry.options)
+    changes = diff_devices(old_devices, new_devices)
+    if not changes:
+        return
+    _LOGGER.debug(
+        "SmartCloudAge options changed: %d added, %d removed, %d edited controllers",
+        len(changes.added),
+        len(changes.removed),
+        len(changes.changed),
+    )
+
+    for device in changes.removed:
+        device_id = device["device_id"]
+        # Stop frames, RTC publishes and commands before tearing entities down.
+        data.dispatcher.async_remove_device(device_id)
+        data.availability.async_remove_device(device_id)
+        data.rtc.async_remove_device(device_id)
+        data.commands.async_cancel_device(device_id)
+        for reconcile in data.reconcilers:
+            await reconcile(device, None)
+        data.controllers.pop(device_id, None)
+        async_remove_device_entry(hass, entry.entry_id, device_id)
+
+    for old, new in changes.changed:
+        # Entities created by the reconcilers take the new alias; existing
+        # ones keep the unique ID they were created with until purged.
+        data.controllers[new["device_id"]].set_alias(new.get("alias"))
+        data.availability.async_add_device(
+            new["device_id"], new.get(CONF_AVAILABILITY_TIMEOUT)
+        )
+        data.rtc.async_add_device(
+            new["device_id"], new.get("signature", new["device_id"])
+        )
+        for reconcile in data.reconcilers:
+            await reconcile(old, new)
+
+    for device in changes.added:
+        device_id = device["device_id"]
+        data.controllers[device_id] = ControllerState(device_id, device.get("alias"))
+        data.availability.async_add_device(
+            device_id, device.get(CONF_AVAILABILITY_TIMEOUT)
+        )
+        data.dispatcher.async_register_diagnostic_handler(
+            device_id, data.availability.async_frame_received
+        )
+        for reconcile in data.reconcilers:
+            await reconcile(None, device)
+        data.rtc.async_add_device(device_id, device.get("signature", device_id))
+        data.dispatcher.async_register_diagnostic_handler(
+            device_id, data.rtc.async_frame_received
+        )
+        await data.dispatcher.async_subscribe_device(device_id)
+
+    data.pulse_store.async_schedule_save()
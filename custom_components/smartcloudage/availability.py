@@ -0,0 +1,180 @@
+"""Availability tracking of SmartCloudAge controllers from their telemetry."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Mapping
+from datetime import timedelta
+import logging
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .controller import ControllerState
+from .decoder import TelemetryFrame
+from .encoder import WRITE
+
+_LOGGER = logging.getLogger(__name__)
+
+## Entry-wide option and per-controller field holding the silence timeout.
+CONF_AVAILABILITY_TIMEOUT = "availability_timeout"
+## Seconds without telemetry after which a controller is unavailable; zero
+## disables the check.
+DEFAULT_AVAILABILITY_TIMEOUT = 600
+## Period of the sweep looking for silent controllers.
+SWEEP_INTERVAL = timedelta(seconds=10)
+## Controller IDs quoted in the log message of a sweep.
+MAX_LOGGED_DEVICES = 10
+
+## Callback receiving the controllers whose availability just changed.
+AvailabilityListener = Callable[[list[str]], None]
+
+
+## @brief Marks silent controllers unavailable with a single periodic sweep.
+#
+#  Frames only refresh a monotonic timestamp, so the hot path never touches a
+#  timer. One interval timer serves the whole fleet and flips every stale
+#  controller in one batch; the next frame of a controller flips it back.
+class AvailabilityTracker:
+    """Track the last telemetry of every controller of an entry."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        controllers: Mapping[str, ControllerState],
+        devices: Iterable[Mapping],
+        default_timeout: float = DEFAULT_AVAILABILITY_TIMEOUT,
+        sweep_interval: timedelta = SWEEP_INTERVAL,
+    ) -> None:
+        ## @brief Registers the configured controllers.
+        #  @param hass Active Home Assistant instance.
+        #  @param controllers Shared state records, whose @c available flag is
+        #         updated in place.
+        #  @param devices Controller configurations, optionally holding their
+        #         own @c CONF_AVAILABILITY_TIMEOUT.
+        #  @param default_timeout Timeout of controllers without their own, in
+        #         seconds; zero disables the check.
+        #  @param sweep_interval Period of the staleness sweep.
+        self._hass = hass
+        self._controllers = controllers
+        self._default_timeout = default_timeout
+        self._sweep_interval = sweep_interval
+        self._timeouts: dict[str, float] = {}
+        self._last_seen: dict[str, float] = {}
+        self._listeners: list[AvailabilityListener] = []
+        for device in devices:
+            if device.get("device_id"):
+                self.async_add_device(
+                    device["device_id"], device.get(CONF_AVAILABILITY_TIMEOUT)
+                )
+
+    ## @brief Starts the sweep timer, counting silence from now on.
+    #  @return Callback that stops the timer.
+    def async_start(self) -> CALLBACK_TYPE:
+        """Track one sweep per interval."""
+        now = time.monotonic()
+        for device_id in self._last_seen:
+            self._last_seen[device_id] = now
+        return async_track_time_interval(
+            self._hass, self._async_tick, self._sweep_interval
+        )
+
+    ## @brief Tracks a controller or updates its timeout.
+    #  @param device_id Unique controller identifier.
+    #  @param timeout Silence timeout in seconds, or @c None for the entry
+    #         default; zero disables the check for this controller.
+    @callback
+    def async_add_device(self, device_id: str, timeout: float | None = None) -> None:
+        """Start tracking a controller."""
+        self._timeouts[device_id] = float(
+            self._default_timeout if timeout is None else timeout
+        )
+        self._last_seen.setdefault(device_id, time.monotonic())
+
+    ## @brief Stops tracking a controller.
+    #  @param device_id Unique controller identifier.
+    @callback
+    def async_remove_device(self, device_id: str) -> None:
+        """Forget a removed controller."""
+        self._timeouts.pop(device_id, None)
+        self._last_seen.pop(device_id, None)
+
+    ## @brief Returns the silence timeout of a controller.
+    #  @param device_id Unique controller identifier.
+    #  @return Timeout in seconds, zero when disabled.
+    def timeout(self, device_id: str) -> float:
+        """Return the effective timeout of a controller."""
+        return self._timeouts[device_id]
+
+    ## @brief Registers a platform callback writing the entities of changed
+    #         controllers.
+    #  @param listener Callback receiving the controller IDs of one batch.
+    #  @return Callback that removes the listener.
+    @callback
+    def async_add_listener(self, listener: AvailabilityListener) -> CALLBACK_TYPE:
+        """Subscribe to availability changes."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    ## @brief Refreshes the last-seen time of a controller.
+    #
+    #  Registered as the first diagnostic handler of each controller, so a
+    #  recovered controller is available again before its entities are
+    #  updated from the same frame. Echoes of the integration's own write
+    #  commands, delivered back by the per-controller subscription, say
+    #  nothing about the controller and are ignored.
+    #  @param device_id Controller that produced the frame.
+    #  @param frame Normalized MQTT telemetry.
+    @callback
+    def async_frame_received(self, device_id: str, frame: TelemetryFrame) -> None:
+        """Record a frame and restore the controller when it was unavailable."""
+        if device_id not in self._timeouts:
+            return
+        data = frame.data
+        if isinstance(data, dict) and "command" in data and data.get("type") == WRITE:
+            return
+        self._last_seen[device_id] = time.monotonic()
+        controller = self._controllers.get(device_id)
+        if controller is not None and not controller.available:
+            controller.available = True
+            _LOGGER.debug("SmartCloudAge %s is reporting again", controller.alias)
+            self._notify([device_id])
+
+    ## @brief Marks every controller silent for longer than its timeout.
+    #  @param now Monotonic time of the sweep; defaults to the current time.
+    #  @return Controllers that became unavailable.
+    @callback
+    def async_sweep(self, now: float | None = None) -> list[str]:
+        """Flip stale controllers to unavailable in one batch."""
+        if now is None:
+            now = time.monotonic()
+        stale = []
+        for device_id, last_seen in self._last_seen.items():
+            timeout = self._timeouts[device_id]
+            if not timeout or now - last_seen < timeout:
+                continue
+            controller = self._controllers.get(device_id)
+            if controller is not None and controller.available:
+                controller.available = False
+                stale.append(device_id)
+        if stale:
+            _LOGGER.warning(
+                "%d SmartCloudAge controllers stopped reporting: %s%s",
+                len(stale),
+                ", ".join(stale[:MAX_LOGGED_DEVICES]),
+                "…" if len(stale) > MAX_LOGGED_DEVICES else "",
+            )
+            self._notify(stale)
+        return stale
+
+    ## @brief Runs the sweep on each timer tick.
+    #  @param _now Wall-clock time supplied by the timer.
+    @callback
+    def _async_tick(self, _now) -> None:
+        self.async_sweep()
+
+    ## @brief Passes a batch of changed controllers to every listener.
+    #  @param device_ids Controllers whose availability changed.
+    def _notify(self, device_ids: list[str]) -> None:
+        for listener in self._listeners:
+            listener(device_ids)
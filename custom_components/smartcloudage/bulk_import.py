@@ -0,0 +1,337 @@
+"""Bulk import of SmartCloudAge controllers and meters from CSV or YAML."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+import csv
+import io
+from typing import Any
+
+import yaml
+
+METER_TYPES = {
+    "water": "Água",
+    "gas": "Gás",
+    "energy": "Energia elétrica",
+    "count": "Contador genérico",
+}
+OUTPUT_COUNTS = (10, 16)
+IMPORT_FORMATS = ("csv", "yaml")
+## Columns of a CSV import: controller fields followed by meter fields. Rows
+## sharing a @c device_id belong to the same controller; rows without a
+## @c channel only declare the controller.
+CSV_COLUMNS = (
+    "device_id",
+    "alias",
+    "outputs",
+    "signature",
+    "availability_timeout",
+    "channel",
+    "name",
+    "type",
+    "factor",
+    "offset",
+    "unit",
+)
+## Controller and meter fields holding text.
+DEVICE_TEXT_FIELDS = ("device_id", "alias", "signature")
+METER_TEXT_FIELDS = ("name", "type", "unit")
+## Imports with at least this many controllers default to fleet mode.
+BULK_FLEET_MODE_THRESHOLD = 20
+## Number of validation errors quoted in the error message.
+MAX_REPORTED_ERRORS = 5
+
+
+## @brief Raised when an import contains invalid controllers or meters.
+class BulkImportError(ValueError):
+    """Every problem found while validating an import."""
+
+    def __init__(self, errors: list[str]) -> None:
+        ## @brief Stores the complete error list.
+        #  @param errors Human-readable problems, each prefixed by its location.
+        shown = "; ".join(errors[:MAX_REPORTED_ERRORS])
+        if len(errors) > MAX_REPORTED_ERRORS:
+            shown += f" (+{len(errors) - MAX_REPORTED_ERRORS} more)"
+        super().__init__(shown)
+        self.errors = errors
+
+
+## @brief Returns the controller IDs held by configuration entries.
+#  @param entries SmartCloudAge configuration entries.
+#  @return Set of configured controller IDs.
+def configured_device_ids(entries: Iterable[Any]) -> set[str]:
+    """Collect the controllers of every entry."""
+    return {
+        device["device_id"]
+        for entry in entries
+        for device in entry.options.get("devices", entry.data.get("devices", []))
+        if device.get("device_id")
+    }
+
+
+## @brief Replaces or appends imported controllers in a device list.
+#  @param current Controllers of an existing entry.
+#  @param imported Validated controllers to merge.
+#  @return New device list; imported controllers replace those with the same ID.
+def merge_devices(
+    current: Iterable[Mapping[str, Any]], imported: Iterable[Mapping[str, Any]]
+) -> list[dict[str, Any]]:
+    """Merge imported controllers into an entry's device list."""
+    merged = {device["device_id"]: dict(device) for device in current}
+    for device in imported:
+        merged[device["device_id"]] = dict(device)
+    return list(merged.values())
+
+
+## @brief Reads controller records from CSV text.
+#  @param text CSV document with a header row using @c CSV_COLUMNS names.
+#  @return Pairs of location and controller record with its meter records.
+def _csv_records(text: str) -> list[tuple[str, dict[str, Any]]]:
+    reader = csv.DictReader(io.StringIO(text.strip()), skipinitialspace=True)
+    if reader.fieldnames is None or "device_id" not in reader.fieldnames:
+        raise BulkImportError(["CSV header must include a device_id column"])
+    unknown = set(reader.fieldnames) - set(CSV_COLUMNS)
+    if unknown:
+        raise BulkImportError([f"unknown CSV columns: {', '.join(sorted(unknown))}"])
+    devices: dict[str, tuple[str, dict[str, Any]]] = {}
+    records: list[tuple[str, dict[str, Any]]] = []
+    for row in reader:
+        where = f"line {reader.line_num}"
+        if None in row:
+            # DictReader keeps the fields beyond the header under the None key.
+            raise BulkImportError([f"{where}: more fields than header columns"])
+        values = {key: value.strip() for key, value in row.items() if value}
+        device_id = values.get("device_id", "")
+        known = devices.get(device_id) if device_id else None
+        if known is None:
+            record = {
+                key: values[key]
+                for key in (
+                    "device_id",
+                    "alias",
+                    "outputs",
+                    "signature",
+                    "availability_timeout",
+                )
+                if key in values
+            }
+            record["meters"] = []
+            known = (where, record)
+            records.append(known)
+            if device_id:
+                devices[device_id] = known
+        if "channel" in values:
+            known[1]["meters"].append(
+                (
+                    where,
+                    {
+                        key: values[key]
+                        for key in ("channel", "name", "type", "factor", "offset", "unit")
+                        if key in values
+                    },
+                )
+            )
+    return records
+
+
+## @brief Reads controller records from YAML text.
+#  @param text YAML list of controllers, optionally under a @c devices key,
+#         using the same fields as the entry options.
+#  @return Pairs of location and controller record with its meter records.
+def _yaml_records(text: str) -> list[tuple[str, dict[str, Any]]]:
+    try:
+        document = yaml.safe_load(text)
+    except yaml.YAMLError as err:
+        raise BulkImportError([f"invalid YAML: {err}"]) from err
+    if isinstance(document, Mapping):
+        document = document.get("devices")
+    if not isinstance(document, list):
+        raise BulkImportError(["YAML must be a list of controllers"])
+    records = []
+    for index, device in enumerate(document, start=1):
+        where = f"item {index}"
+        if not isinstance(device, Mapping):
+            records.append((where, device))
+            continue
+        meters = device.get("meters")
+        if meters is None:
+            meters = []
+        records.append(
+            (
+                where,
+                {
+                    **device,
+                    "meters": [
+                        (f"{where} meter {position}", meter)
+                        for position, meter in enumerate(meters, start=1)
+                    ]
+                    if isinstance(meters, list)
+                    else meters,
+                },
+            )
+        )
+    return records
+
+
+## @brief Checks that text fields do not hold lists or mappings.
+#  @param where Location used in error messages.
+#  @param record Raw controller or meter fields.
+#  @param keys Fields that must be text when present.
+#  @param errors List receiving the problems found.
+#  @return @c True when every field is valid.
+def _check_text_fields(
+    where: str, record: Mapping[str, Any], keys: Iterable[str], errors: list[str]
+) -> bool:
+    valid = True
+    for key in keys:
+        value = record.get(key)
+        if value is not None and not isinstance(value, (str, int, float)):
+            errors.append(f"{where}: {key} must be text")
+            valid = False
+    return valid
+
+
+## @brief Validates one meter record.
+#  @param where Location used in error messages.
+#  @param meter Raw meter fields.
+#  @param errors List receiving the problems found.
+#  @return Normalized meter, or @c None when invalid.
+def _validate_meter(
+    where: str, meter: Any, errors: list[str]
+) -> dict[str, Any] | None:
+    if not isinstance(meter, Mapping):
+        errors.append(f"{where}: meter must be a mapping")
+        return None
+    if not _check_text_fields(where, meter, METER_TEXT_FIELDS, errors):
+        return None
+    try:
+        channel = int(meter.get("channel"))
+        factor = float(meter.get("factor", 0.01))
+        offset = float(meter.get("offset", 0.0))
+    except (TypeError, ValueError):
+        errors.append(f"{where}: channel, factor and offset must be numbers")
+        return None
+    meter_type = meter.get("type", "water")
+    problems = len(errors)
+    if not 1 <= channel <= 16:
+        errors.append(f"{where}: channel {channel} is outside 1-16")
+    if factor <= 0:
+        errors.append(f"{where}: factor must be greater than zero")
+    if not isinstance(meter_type, str) or meter_type not in METER_TYPES:
+        errors.append(f"{where}: unknown meter type {meter_type!r}")
+    if len(errors) > problems:
+        return None
+    return {
+        "channel": channel,
+        "name": str(meter.get("name", "")),
+        "type": meter_type,
+        "factor": factor,
+        "offset": offset,
+        "unit": str(meter.get("unit", "m³")),
+    }
+
+
+## @brief Validates controller records in a single pass.
+#  @param records Pairs of location and raw controller record.
+#  @param configured Controller IDs that already belong to other entries.
+#  @return Normalized device list for the entry options.
+#  @throws BulkImportError With every problem found.
+def validate_devices(
+    records: Iterable[tuple[str, Any]], configured: set[str] | None = None
+) -> list[dict[str, Any]]:
+    """Normalize imported controllers, collecting every error."""
+    configured = configured or set()
+    errors: list[str] = []
+    devices: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    for where, record in records:
+        if not isinstance(record, Mapping):
+            errors.append(f"{where}: controller must be a mapping")
+            continue
+        if not _check_text_fields(where, record, DEVICE_TEXT_FIELDS, errors):
+            continue
+        device_id = str(record.get("device_id") or "").strip()
+        if not device_id:
+            errors.append(f"{where}: device_id is required")
+            continue
+        if device_id in seen:
+            errors.append(f"{where}: duplicate controller {device_id}")
+            continue
+        seen.add(device_id)
+        if device_id in configured:
+            errors.append(f"{where}: controller {device_id} is already configured")
+            continue
+        try:
+            outputs = int(record.get("outputs", 16))
+        except (TypeError, ValueError):
+            outputs = None
+        if outputs not in OUTPUT_COUNTS:
+            errors.append(f"{where}: outputs must be 10 or 16")
+            continue
+        timeout = record.get("availability_timeout")
+        if timeout is not None:
+            try:
+                timeout = int(timeout)
+            except (TypeError, ValueError):
+                timeout = -1
+            if timeout < 0:
+                errors.append(f"{where}: availability_timeout must be zero or more seconds")
+                continue
+        meter_records = record.get("meters")
+        if meter_records is None:
+            meter_records = []
+        if not isinstance(meter_records, list):
+            errors.append(f"{where}: meters must be a list")
+            continue
+        meters = []
+        channels: set[int] = set()
+        for position, item in enumerate(meter_records, start=1):
+            meter_where, meter = (
+                item if isinstance(item, tuple) else (f"{where} meter {position}", item)
+            )
+            meter = _validate_meter(meter_where, meter, errors)
+            if meter is None:
+                continue
+            if meter["channel"] in channels:
+                errors.append(
+                    f"{meter_where}: channel {meter['channel']} is already used "
+                    f"on {device_id}"
+                )
+                continue
+            channels.add(meter["channel"])
+            meters.append(meter)
+        device = {
+            "device_id": device_id,
+            "outputs": outputs,
+            "alias": str(record.get("alias") or device_id),
+            "meters": meters,
+        }
+        if record.get("signature"):
+            device["signature"] = str(record["signature"])
+        if timeout is not None:
+            device["availability_timeout"] = timeout
+        devices.append(device)
+    if errors:
+        raise BulkImportError(errors)
+    if not devices:
+        raise BulkImportError(["no controllers found"])
+    return devices
+
+
+## @brief Parses and validates a CSV or YAML controller list.
+#  @param text Document to import.
+#  @param import_format Either @c csv or @c yaml.
+#  @param configured Controller IDs that already belong to other entries.
+#  @return Normalized device list for the entry options.
+#  @throws BulkImportError With every problem found.
+def parse_devices(
+    text: str, import_format: str, configured: set[str] | None = None
+) -> list[dict[str, Any]]:
+    """Return the validated controllers of a CSV or YAML document."""
+    if import_format == "csv":
+        records = _csv_records(text)
+    elif import_format == "yaml":
+        records = _yaml_records(text)
+    else:
+        raise BulkImportError([f"unsupported format {import_format!r}"])
+    return validate_devices(records, configured)
@@ -0,0 +1,306 @@
+"""Coalesced output commands for SmartCloudAge controllers."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Mapping
+import logging
+import time
+
+from homeassistant.components import mqtt
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .encoder import OUTPUT_COMMAND, WRITE, CommandEncoder
+from .stats import IntegrationStats
+
+_LOGGER = logging.getLogger(__name__)
+
+## Seconds during which output requests for the same controller are merged.
+OUTPUT_COALESCE_WINDOW = 0.02
+## Seconds to wait for a status frame confirming a command before resending it;
+## doubled after every retry.
+OUTPUT_ACK_TIMEOUT = 2.0
+OUTPUT_MAX_RETRIES = 3
+
+
+## @brief Builds the command that switches one controller output as a dictionary.
+#
+#  Commands are published through @c CommandEncoder; this form documents the
+#  protocol and serves as the reference for the encoder.
+#  @param device_id Unique controller identifier, also used as signature.
+#  @param output_id Zero-based output index.
+#  @param value Output state, where 1 is on and 0 is off.
+#  @return Command dictionary in the firmware format.
+def build_output_payload(device_id: str, output_id: int, value: int) -> dict:
+    """Build a command-11 output write."""
+    return {
+        "command": OUTPUT_COMMAND,
+        "type": WRITE,
+        "signature": device_id,
+        "payload": {
+            "id": output_id + 1,
+            "value": value,
+        },
+    }
+
+
+## @brief Output changes waiting for the coalescing window of a controller.
+class _PendingBatch:
+    """Requested output states and the future shared by their callers."""
+
+    __slots__ = ("done", "handle", "outputs")
+
+    def __init__(self, done: asyncio.Future) -> None:
+        ## @brief Starts an empty batch.
+        #  @param done Future resolved once the batch has been published.
+        self.done = done
+        self.outputs: dict[int, int] = {}
+        self.handle: asyncio.TimerHandle | None = None
+
+
+## @brief Output command published but not yet confirmed by the controller.
+class _InFlightCommand:
+    """Requested value, send count and retry timer of one output."""
+
+    __slots__ = ("attempts", "handle", "value")
+
+    def __init__(self, value: int) -> None:
+        ## @brief Records a command sent once.
+        #  @param value Requested output state, where 1 is on and 0 is off.
+        self.value = value
+        self.attempts = 1
+        self.handle: asyncio.TimerHandle | None = None
+
+
+## @brief Merges concurrent output requests per controller into one burst.
+#
+#  The firmware only accepts one output per command, so a batch is sent as a
+#  pipelined burst: every command is published without waiting for the
+#  previous one, and later requests for the same output replace earlier ones.
+#  Published commands stay in flight until an @c Output.Outputs status frame
+#  confirms them; unconfirmed commands are resent with exponential back-off
+#  and dropped after @c OUTPUT_MAX_RETRIES retries.
+class OutputCommandBatcher:
+    """Coalesce output writes, publish them as bursts and track their acks."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        stats: IntegrationStats | None = None,
+        window: float = OUTPUT_COALESCE_WINDOW,
+        encoder: CommandEncoder | None = None,
+        on_publish: Callable[[str], None] | None = None,
+    ) -> None:
+        ## @brief Initializes an idle batcher.
+        #  @param hass Active Home Assistant instance.
+        #  @param stats Optional entry counters receiving publish latencies.
+        #  @param window Coalescing window in seconds.
+        #  @param encoder Command encoder shared with the entry; a private one
+        #         is created when omitted.
+        #  @param on_publish Optional callback invoked with the controller ID
+        #         before each command is published.
+        self._hass = hass
+        self._on_publish = on_publish
+        self._stats = stats
+        self._window = window
+        self._encoder = encoder if encoder is not None else CommandEncoder()
+        self._pending: dict[str, _PendingBatch] = {}
+        ## Batches whose commands are being published, per controller.
+        self._publishing: dict[str, list[_PendingBatch]] = {}
+        self._in_flight: dict[str, dict[int, _InFlightCommand]] = {}
+
+    ## @brief Returns the outputs of a controller awaiting confirmation.
+    #  @param device_id Unique controller identifier.
+    #  @return Mapping of zero-based output index to the requested value.
+    def in_flight(self, device_id: str) -> dict[int, int]:
+        """Return the unconfirmed commands of a controller."""
+        return {
+            output_id: command.value
+            for output_id, command in self._in_flight.get(device_id, {}).items()
+        }
+
+    ## @brief Requests new states for one or more outputs of a controller.
+    #  @param device_id Unique controller identifier.
+    #  @param outputs Mapping of zero-based output index to 1 (on) or 0 (off).
+    #  @throws HomeAssistantError When a command of the batch could not be published.
+    async def async_set_outputs(self, device_id: str, outputs: Mapping[int, int]) -> None:
+        """Queue output states and wait until their batch is published."""
+        batch = self._pending.get(device_id)
+        if batch is None:
+            batch = self._pending[device_id] = _PendingBatch(
+                self._hass.loop.create_future()
+            )
+            batch.handle = self._hass.loop.call_later(
+                self._window, self._async_flush, device_id
+            )
+        batch.outputs.update(outputs)
+        await asyncio.shield(batch.done)
+
+    ## @brief Confirms in-flight commands against a controller status frame.
+    #  @param device_id Controller that produced the status frame.
+    #  @param outputs Value of the @c Output.Outputs bitmask.
+    @callback
+    def async_outputs_received(self, device_id: str, outputs: int) -> None:
+        """Acknowledge every command whose output now has the requested state."""
+        commands = self._in_flight.get(device_id)
+        if not commands:
+            return
+        for output_id, command in list(commands.items()):
+            if (outputs >> output_id) & 1 == command.value:
+                command.handle.cancel()
+                del commands[output_id]
+
+    ## @brief Drops pending batches and in-flight commands, for example on unload.
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel all batches and retries."""
+        for device_id in (
+            self._pending.keys() | self._publishing.keys() | self._in_flight.keys()
+        ):
+            self.async_cancel_device(device_id, "integration unloaded")
+
+    ## @brief Drops the pending batch and in-flight commands of one controller.
+    #
+    #  Callers waiting for a dropped batch, including one being published,
+    #  receive a @c HomeAssistantError rather than a cancellation, which would
+    #  cancel their own task. Commands of a batch dropped mid-publish are not
+    #  tracked for confirmation.
+    #  @param device_id Unique controller identifier, for example of a
+    #         controller removed from the entry.
+    #  @param reason Why the commands were dropped, reported to the callers.
+    @callback
+    def async_cancel_device(
+        self, device_id: str, reason: str = "controller removed"
+    ) -> None:
+        """Cancel the batch and retries of a controller."""
+        batches = self._publishing.pop(device_id, [])
+        batch = self._pending.pop(device_id, None)
+        if batch is not None:
+            if batch.handle is not None:
+                batch.handle.cancel()
+            batches.append(batch)
+        for batch in batches:
+            if not batch.done.done():
+                batch.done.set_exception(
+                    HomeAssistantError(
+                        f"Output commands for {device_id} were not sent: {reason}"
+                    )
+                )
+        for command in self._in_flight.pop(device_id, {}).values():
+            command.handle.cancel()
+
+    ## @brief Starts publishing the batch of a controller once its window closes.
+    #  @param device_id Unique controller identifier.
+    @callback
+    def _async_flush(self, device_id: str) -> None:
+        batch = self._pending.pop(device_id, None)
+        if batch is not None:
+            self._publishing.setdefault(device_id, []).append(batch)
+            self._hass.async_create_task(self._async_publish_batch(device_id, batch))
+
+    ## @brief Publishes a batch and tracks its commands until they are confirmed.
+    #  @param device_id Unique controller identifier.
+    #  @param batch Output states collected during the window.
+    async def _async_publish_batch(self, device_id: str, batch: _PendingBatch) -> None:
+        outputs = sorted(batch.outputs.items())
+        results = await asyncio.gather(
+            *(
+                self._async_publish(device_id, output_id, value)
+                for output_id, value in outputs
+            ),
+            return_exceptions=True,
+        )
+        publishing = self._publishing.get(device_id)
+        if publishing is None or batch not in publishing:
+            # The controller was removed or the entry unloaded meanwhile; its
+            # callers were already failed.
+            return
+        publishing.remove(batch)
+        if not publishing:
+            del self._publishing[device_id]
+        error = None
+        commands = self._in_flight.setdefault(device_id, {})
+        for (output_id, value), result in zip(outputs, results):
+            if isinstance(result, Exception):
+                error = error or result
+                _LOGGER.warning(
+                    "SmartCloudAge output %d command failed for %s: %s",
+                    output_id + 1,
+                    device_id,
+                    result,
+                )
+                continue
+            previous = commands.get(output_id)
+            if previous is not None:
+                previous.handle.cancel()
+            command = commands[output_id] = _InFlightCommand(value)
+            command.handle = self._hass.loop.call_later(
+                OUTPUT_ACK_TIMEOUT, self._async_ack_timeout, device_id, output_id
+            )
+        if error is not None:
+            batch.done.set_exception(error)
+        else:
+            batch.done.set_result(None)
+
+    ## @brief Resends or expires a command that was not confirmed in time.
+    #  @param device_id Unique controller identifier.
+    #  @param output_id Zero-based output index.
+    @callback
+    def _async_ack_timeout(self, device_id: str, output_id: int) -> None:
+        commands = self._in_flight.get(device_id, {})
+        command = commands.get(output_id)
+        if command is None:
+            return
+        if command.attempts > OUTPUT_MAX_RETRIES:
+            del commands[output_id]
+            if self._stats is not None:
+                self._stats.commands_expired += 1
+            _LOGGER.warning(
+                "SmartCloudAge output %d of %s not confirmed after %d attempts",
+                output_id + 1,
+                device_id,
+                command.attempts,
+            )
+            return
+        command.attempts += 1
+        if self._stats is not None:
+            self._stats.commands_retried += 1
+        command.handle = self._hass.loop.call_later(
+            OUTPUT_ACK_TIMEOUT * 2 ** (command.attempts - 1),
+            self._async_ack_timeout,
+            device_id,
+            output_id,
+        )
+        self._hass.async_create_task(
+            self._async_resend(device_id, output_id, command.value)
+        )
+
+    ## @brief Resends one unconfirmed command, logging publish failures.
+    #  @param device_id Unique controller identifier.
+    #  @param output_id Zero-based output index.
+    #  @param value Requested output state.
+    async def _async_resend(self, device_id: str, output_id: int, value: int) -> None:
+        try:
+            await self._async_publish(device_id, output_id, value)
+        except HomeAssistantError as err:
+            _LOGGER.warning(
+                "SmartCloudAge output %d command failed for %s: %s",
+                output_id + 1,
+                device_id,
+                err,
+            )
+
+    ## @brief Publishes a single output command.
+    #  @param device_id Unique controller identifier.
+    #  @param output_id Zero-based output index.
+    #  @param value Output state, where 1 is on and 0 is off.
+    async def _async_publish(self, device_id: str, output_id: int, value: int) -> None:
+        topic, payload = self._encoder.output(device_id, output_id, value)
+        if self._on_publish is not None:
+            self._on_publish(device_id)
+        _LOGGER.debug("Publishing to %s: %s", topic, payload)
+        started = time.monotonic()
+        await mqtt.async_publish(self._hass, topic, payload, 0, False)
+        if self._stats is not None:
+            self._stats.record_publish(time.monotonic() - started)
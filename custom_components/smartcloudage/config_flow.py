@@ -8,13 +8,34 @@ from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.helpers import entity_registry as er, selector
 
+from .availability import CONF_AVAILABILITY_TIMEOUT, DEFAULT_AVAILABILITY_TIMEOUT
+from .bulk_import import (
+    BULK_FLEET_MODE_THRESHOLD,
+    IMPORT_FORMATS,
+    METER_TYPES,
+    BulkImportError,
+    configured_device_ids,
+    merge_devices,
+    parse_devices,
+)
+from .dispatcher import CONF_DEFER_STARTUP, CONF_FLEET_MODE
+from .paging import ChoiceIndex
+from .rate import CONF_RATE_WINDOW, DEFAULT_RATE_WINDOW
+from .write_policy import (
+    CONF_HEARTBEAT_MINUTES,
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_RATE_DEADBAND,
+    CONF_RSSI_DEADBAND,
+    CONF_UPTIME_DEADBAND,
+    DEFAULT_HEARTBEAT_MINUTES,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    DEFAULT_RATE_DEADBAND,
+    DEFAULT_RSSI_DEADBAND,
+    DEFAULT_UPTIME_DEADBAND,
+)
+
 DOMAIN = "smartcloudage"
-METER_TYPES = {
-    "water": "Água",
-    "gas": "Gás",
-    "energy": "Energia elétrica",
-    "count": "Contador genérico",
-}
+DEFAULT_FLEET_TITLE = "Frota SmartCloudAge"
 
 
 ## @brief Builds the validation schema for a SmartCloudAge controller.
@@ -71,6 +92,88 @@ def meter_schema(defaults=None, *, include_add_another=True):
     return vol.Schema(fields)
 
 
+## @brief Builds the validation schema for a bulk controller import.
+#  @param defaults Optional initial form values.
+#  @param include_title Whether to ask for the title of a new entry.
+#  @return Voluptuous schema containing the format and the document to import.
+def import_schema(defaults=None, *, include_title=True):
+    """Build the bulk import form."""
+    defaults = defaults or {}
+    fields = {}
+    if include_title:
+        fields[
+            vol.Required("title", default=defaults.get("title", DEFAULT_FLEET_TITLE))
+        ] = str
+    fields[vol.Required("format", default=defaults.get("format", "csv"))] = vol.In(
+        IMPORT_FORMATS
+    )
+    fields[
+        vol.Required("devices", default=defaults.get("devices", ""))
+    ] = selector.TextSelector(selector.TextSelectorConfig(multiline=True))
+    return vol.Schema(fields)
+
+
+## @brief Builds the options of an entry created by a bulk import.
+#  @param devices Validated controllers.
+#  @return Entry options enabling fleet mode for large imports.
+def fleet_options(devices):
+    """Return the options of a new multi-controller entry."""
+    return {
+        "devices": devices,
+        CONF_FLEET_MODE: len(devices) >= BULK_FLEET_MODE_THRESHOLD,
+    }
+
+
+## @brief Builds the validation schema for entry-wide integration settings.
+#  @param defaults Current option values.
+#  @return Voluptuous schema containing the performance-related settings.
+def settings_schema(defaults=None):
+    """Build the integration settings form."""
+    defaults = defaults or {}
+    return vol.Schema(
+        {
+            vol.Required(
+                CONF_FLEET_MODE, default=defaults.get(CONF_FLEET_MODE, False)
+            ): bool,
+            vol.Required(
+                CONF_DEFER_STARTUP, default=defaults.get(CONF_DEFER_STARTUP, False)
+            ): bool,
+            vol.Required(
+                CONF_MIN_WRITE_INTERVAL,
+                default=defaults.get(
+                    CONF_MIN_WRITE_INTERVAL, DEFAULT_MIN_WRITE_INTERVAL
+                ),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Required(
+                CONF_HEARTBEAT_MINUTES,
+                default=defaults.get(CONF_HEARTBEAT_MINUTES, DEFAULT_HEARTBEAT_MINUTES),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Required(
+                CONF_RSSI_DEADBAND,
+                default=defaults.get(CONF_RSSI_DEADBAND, DEFAULT_RSSI_DEADBAND),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Required(
+                CONF_UPTIME_DEADBAND,
+                default=defaults.get(CONF_UPTIME_DEADBAND, DEFAULT_UPTIME_DEADBAND),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Required(
+                CONF_RATE_WINDOW,
+                default=defaults.get(CONF_RATE_WINDOW, DEFAULT_RATE_WINDOW),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Required(
+                CONF_RATE_DEADBAND,
+                default=defaults.get(CONF_RATE_DEADBAND, DEFAULT_RATE_DEADBAND),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Required(
+                CONF_AVAILABILITY_TIMEOUT,
+                default=defaults.get(
+                    CONF_AVAILABILITY_TIMEOUT, DEFAULT_AVAILABILITY_TIMEOUT
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        }
+    )
+
+
 ## @brief Guides initial configuration of a controller and its pulse meters.
 class SmartCloudAgeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Configure a SmartCloudAge controller and its pulse meters."""
@@ -80,15 +183,29 @@ class SmartCloudAgeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     def __init__(self):
         ## @brief Initializes the temporary controller configuration.
         self._device = None
+        self._channels = set()
+
+    ## @brief Lets the user add one controller or import a whole fleet.
+    #  @param user_input Menu input supplied by Home Assistant.
+    #  @return Configuration-flow menu.
+    async def async_step_user(self, user_input=None):
+        """Choose between a single controller and a bulk import."""
+        return self.async_show_menu(
+            step_id="user", menu_options=["controller", "bulk_import"]
+        )
 
     ## @brief Collects and validates the controller's primary settings.
     #  @param user_input Values submitted by the user, or @c None on first display.
     #  @return A form, the meter step, an abort result or a completed entry.
-    async def async_step_user(self, user_input=None):
+    async def async_step_controller(self, user_input=None):
         """Configure the controller."""
         if user_input is not None:
             await self.async_set_unique_id(user_input["device_id"])
             self._abort_if_unique_id_configured()
+            if user_input["device_id"] in configured_device_ids(
+                self._async_current_entries()
+            ):
+                return self.async_abort(reason="already_configured")
             configure_meter = user_input.pop("configure_meter")
             self._device = {
                 "device_id": user_input["device_id"],
@@ -99,7 +216,7 @@ class SmartCloudAgeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             if configure_meter:
                 return await self.async_step_meter()
             return self._create_entry()
-        return self.async_show_form(step_id="user", data_schema=device_schema())
+        return self.async_show_form(step_id="controller", data_schema=device_schema())
 
     ## @brief Collects one or more pulse-meter definitions.
     #  @param user_input Submitted meter values, or @c None on first display.
@@ -108,16 +225,14 @@ class SmartCloudAgeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Configure one or more accumulated pulse meters."""
         errors = {}
         if user_input is not None:
-            if any(
-                meter["channel"] == user_input["channel"]
-                for meter in self._device["meters"]
-            ):
+            if user_input["channel"] in self._channels:
                 errors["channel"] = "channel_already_configured"
             elif user_input["factor"] <= 0:
                 errors["factor"] = "factor_must_be_positive"
             else:
                 add_another = user_input.pop("add_another")
                 self._device["meters"].append(user_input)
+                self._channels.add(user_input["channel"])
                 if not add_another:
                     return self._create_entry()
         return self.async_show_form(
@@ -126,6 +241,52 @@ class SmartCloudAgeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    ## @brief Creates one entry holding every controller of a CSV or YAML list.
+    #
+    #  The whole document is validated in one pass and every problem is
+    #  reported at once.
+    #  @param user_input Submitted title, format and document, or @c None on
+    #         first display.
+    #  @return Import form or a completed multi-controller entry.
+    async def async_step_bulk_import(self, user_input=None):
+        """Import a fleet of controllers into a single entry."""
+        errors = {}
+        placeholders = {"details": ""}
+        if user_input is not None:
+            try:
+                devices = parse_devices(
+                    user_input["devices"],
+                    user_input["format"],
+                    configured_device_ids(self._async_current_entries()),
+                )
+            except BulkImportError as err:
+                errors["devices"] = "invalid_import"
+                placeholders["details"] = str(err)
+            else:
+                return self.async_create_entry(
+                    title=user_input["title"],
+                    data={"devices": devices},
+                    options=fleet_options(devices),
+                )
+        return self.async_show_form(
+            step_id="bulk_import",
+            data_schema=import_schema(user_input),
+            errors=errors,
+            description_placeholders=placeholders,
+        )
+
+    ## @brief Creates a multi-controller entry requested by the import service.
+    #  @param import_data Entry title and controllers validated by the service.
+    #  @return Completed multi-controller entry.
+    async def async_step_import(self, import_data):
+        """Create an entry from the ``import_devices`` service."""
+        devices = import_data["devices"]
+        return self.async_create_entry(
+            title=import_data.get("title") or DEFAULT_FLEET_TITLE,
+            data={"devices": devices},
+            options=fleet_options(devices),
+        )
+
     ## @brief Creates the Home Assistant entry from the collected controller data.
     #  @return Completed configuration-flow result.
     def _create_entry(self):
@@ -143,14 +304,25 @@ class SmartCloudAgeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return SmartCloudAgeOptionsFlow()
 
 
-## @brief Manages pulse meters belonging to an existing controller.
+## @brief Manages the controllers and pulse meters of an existing entry.
 class SmartCloudAgeOptionsFlow(config_entries.OptionsFlow):
-    """Add, edit or delete pulse meters on an existing device."""
+    """Add, edit or delete pulse meters on the devices of an entry."""
 
     def __init__(self):
-        ## @brief Initializes the editable device list and meter selection.
+        ## @brief Initializes the editable device list, settings and selections.
         self._devices = None
+        self._settings = None
+        self._device_index = None
         self._meter_index = None
+        self._next_step = None
+        ## Configured (device ID, channel) pairs, for constant-time checks.
+        self._channels = set()
+        ## Search index of the controllers, built on first use.
+        self._device_choices = None
+        ## Search index of the meters of each controller, by controller index.
+        self._meter_indexes = {}
+        ## Search text and page of each selection step.
+        self._searches = {}
 
     ## @brief Displays the available meter-management operations.
     #  @param user_input Menu input supplied by Home Assistant.
@@ -163,25 +335,139 @@ class SmartCloudAgeOptionsFlow(config_entries.OptionsFlow):
                 {**device, "meters": list(device.get("meters", []))}
                 for device in source.get("devices", [])
             ]
+            self._settings = {
+                key: value
+                for key, value in self.config_entry.options.items()
+                if key != "devices"
+            }
+            self._channels = {
+                (device.get("device_id"), int(meter["channel"]))
+                for device in self._devices
+                for meter in device["meters"]
+            }
         return self.async_show_menu(
             step_id="init",
-            menu_options=["add_meter", "edit_meter", "delete_meter", "finish"],
+            menu_options=[
+                "add_meter",
+                "edit_meter",
+                "delete_meter",
+                "device_availability",
+                "import_devices",
+                "settings",
+                "finish",
+            ],
         )
 
+    ## @brief Returns the controller whose meters are being edited.
+    #  @return Configuration of the selected controller.
+    def _device(self):
+        """Return the selected controller."""
+        return self._devices[self._device_index]
+
+    ## @brief Shows one page of a searchable list or returns the chosen item.
+    #
+    #  Lists longer than a page get a search field and a page number, and only
+    #  the choices of the current page are sent to the form.
+    #  @param step_id Step displaying the list.
+    #  @param field Name of the choice field.
+    #  @param choices Search index of the item labels.
+    #  @param user_input Submitted form, or @c None on first display.
+    #  @return Index of the chosen item, or the form of the requested page.
+    def _async_pick(self, step_id, field, choices, user_input):
+        """Return the chosen item or the form of the requested page."""
+        query, page = self._searches.get(step_id, ("", 0))
+        if user_input is not None:
+            if user_input.get(field) is not None:
+                self._searches.pop(step_id, None)
+                return int(user_input[field])
+            search = user_input.get("search", "")
+            page = user_input.get("page", page + 1) - 1 if search == query else 0
+            query = search
+        result = choices.page(query, page)
+        self._searches[step_id] = (query, result.page)
+        if len(choices.labels) > choices.page_size:
+            fields = {
+                vol.Optional("search", default=query): str,
+                vol.Required("page", default=result.page + 1): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=result.pages)
+                ),
+                vol.Optional(field): vol.In(result.choices),
+            }
+        else:
+            fields = {vol.Required(field): vol.In(result.choices)}
+        return self.async_show_form(
+            step_id=step_id,
+            data_schema=vol.Schema(fields),
+            description_placeholders={
+                "first": str(result.start + 1 if result.total else 0),
+                "last": str(result.start + len(result.choices)),
+                "total": str(result.total),
+            },
+        )
+
+    ## @brief Asks for the controller to edit when the entry holds several.
+    #  @param next_step Meter step resumed once a controller is chosen.
+    #  @return Selection form or abort result, or @c None when the controller
+    #          is already known.
+    def _async_select_device(self, next_step):
+        """Select the controller before a meter step."""
+        if self._device_index is not None:
+            return None
+        if not self._devices:
+            return self.async_abort(reason="no_devices_configured")
+        if len(self._devices) == 1:
+            self._device_index = 0
+            return None
+        self._next_step = next_step
+        return self._async_pick("select_device", "device", self._devices_index(), None)
+
+    ## @brief Returns the search index of the controllers of the entry.
+    #  @return Labels combining alias and controller ID.
+    def _devices_index(self):
+        """Return the controller labels, built once per flow."""
+        if self._device_choices is None:
+            self._device_choices = ChoiceIndex(
+                [
+                    f"{device.get('alias') or device['device_id']} "
+                    f"({device['device_id']})"
+                    for device in self._devices
+                ]
+            )
+        return self._device_choices
+
+    ## @brief Stores the selected controller and resumes the meter step.
+    #  @param user_input Selected controller or a new search, or @c None.
+    #  @return Another page of controllers or the form of the meter step
+    #          that requested the selection.
+    async def async_step_select_device(self, user_input=None):
+        """Choose the controller whose meters are edited."""
+        choice = self._async_pick(
+            "select_device", "device", self._devices_index(), user_input
+        )
+        if not isinstance(choice, int):
+            return choice
+        self._device_index = choice
+        return await getattr(self, f"async_step_{self._next_step}")()
+
     ## @brief Validates, adds and persists a new pulse meter.
     #  @param user_input Submitted meter values, or @c None on first display.
     #  @return Meter form or completed options entry.
     async def async_step_add_meter(self, user_input=None):
         """Add and immediately persist a meter."""
+        if (selection := self._async_select_device("add_meter")) is not None:
+            return selection
         errors = {}
         if user_input is not None:
-            meters = self._devices[0].setdefault("meters", [])
-            if any(meter["channel"] == user_input["channel"] for meter in meters):
+            device = self._device()
+            key = (device.get("device_id"), user_input["channel"])
+            if key in self._channels:
                 errors["channel"] = "channel_already_configured"
             elif user_input["factor"] <= 0:
                 errors["factor"] = "factor_must_be_positive"
             else:
-                meters.append(user_input)
+                device.setdefault("meters", []).append(user_input)
+                self._channels.add(key)
+                self._meter_indexes.pop(self._device_index, None)
                 return self._save_options()
         return self.async_show_form(
             step_id="add_meter",
@@ -189,52 +475,58 @@ class SmartCloudAgeOptionsFlow(config_entries.OptionsFlow):
             errors=errors,
         )
 
-    ## @brief Builds labels for the currently configured meters.
-    #  @return Mapping from meter index to a human-readable channel and name.
+    ## @brief Returns the search index of the selected controller's meters.
+    #  @return Labels combining channel and meter name.
     def _meter_choices(self):
-        """Return configured meters as selector choices."""
-        meters = self._devices[0].get("meters", [])
-        return {
-            index: f"Canal {meter['channel']} — {meter.get('name', 'Medidor')}"
-            for index, meter in enumerate(meters)
-        }
+        """Return configured meters as a searchable choice list."""
+        choices = self._meter_indexes.get(self._device_index)
+        if choices is None:
+            meters = self._device().get("meters", [])
+            choices = self._meter_indexes[self._device_index] = ChoiceIndex(
+                [
+                    f"Canal {meter['channel']} — {meter.get('name', 'Medidor')}"
+                    for meter in meters
+                ]
+            )
+        return choices
 
     ## @brief Lets the user select a configured meter for editing.
     #  @param user_input Selected meter index, or @c None on first display.
     #  @return Selection form, edit form or abort result.
     async def async_step_edit_meter(self, user_input=None):
         """Choose an existing meter to edit."""
-        meters = self._devices[0].get("meters", [])
-        if not meters:
+        if (selection := self._async_select_device("edit_meter")) is not None:
+            return selection
+        if not self._device().get("meters"):
             return self.async_abort(reason="no_meters_configured")
-        if user_input is not None:
-            self._meter_index = int(user_input["meter"])
-            return await self.async_step_edit_meter_details()
-        return self.async_show_form(
-            step_id="edit_meter",
-            data_schema=vol.Schema(
-                {vol.Required("meter"): vol.In(self._meter_choices())}
-            ),
+        choice = self._async_pick(
+            "edit_meter", "meter", self._meter_choices(), user_input
         )
+        if not isinstance(choice, int):
+            return choice
+        self._meter_index = choice
+        return await self.async_step_edit_meter_details()
 
     ## @brief Validates and persists changes to the selected meter.
     #  @param user_input Updated meter values, or @c None on first display.
     #  @return Edit form or completed options entry.
     async def async_step_edit_meter_details(self, user_input=None):
         """Edit and immediately persist a configured meter."""
-        meters = self._devices[0]["meters"]
+        device = self._device()
+        meters = device["meters"]
         current = meters[self._meter_index]
         errors = {}
         if user_input is not None:
-            if any(
-                index != self._meter_index
-                and meter["channel"] == user_input["channel"]
-                for index, meter in enumerate(meters)
-            ):
+            old_key = (device.get("device_id"), int(current["channel"]))
+            key = (device.get("device_id"), user_input["channel"])
+            if key != old_key and key in self._channels:
                 errors["channel"] = "channel_already_configured"
             elif user_input["factor"] <= 0:
                 errors["factor"] = "factor_must_be_positive"
             else:
+                self._channels.discard(old_key)
+                self._channels.add(key)
+                self._meter_indexes.pop(self._device_index, None)
                 meters[self._meter_index] = user_input
                 self._meter_index = None
                 return self._save_options()
@@ -249,29 +541,28 @@ class SmartCloudAgeOptionsFlow(config_entries.OptionsFlow):
     #  @return Selection form, confirmation form or abort result.
     async def async_step_delete_meter(self, user_input=None):
         """Choose an existing meter to delete."""
-        meters = self._devices[0].get("meters", [])
-        if not meters:
+        if (selection := self._async_select_device("delete_meter")) is not None:
+            return selection
+        if not self._device().get("meters"):
             return self.async_abort(reason="no_meters_configured")
-        if user_input is not None:
-            self._meter_index = int(user_input["meter"])
-            return await self.async_step_confirm_delete_meter()
-        return self.async_show_form(
-            step_id="delete_meter",
-            data_schema=vol.Schema(
-                {vol.Required("meter"): vol.In(self._meter_choices())}
-            ),
+        choice = self._async_pick(
+            "delete_meter", "meter", self._meter_choices(), user_input
         )
+        if not isinstance(choice, int):
+            return choice
+        self._meter_index = choice
+        return await self.async_step_confirm_delete_meter()
 
     ## @brief Confirms deletion and removes the selected meter entity.
     #  @param user_input Confirmation submitted by the user.
     #  @return Confirmation form or completed options entry.
     async def async_step_confirm_delete_meter(self, user_input=None):
         """Confirm and delete the selected meter."""
-        meters = self._devices[0]["meters"]
+        meters = self._device()["meters"]
         meter = meters[self._meter_index]
 
         if user_input is not None and user_input["confirm"]:
-            device_id = self._devices[0].get("device_id")
+            device_id = self._device().get("device_id")
             channel = int(meter["channel"])
             unique_id = f"smartcloudage_{device_id}_pulse_{channel}"
             entity_registry = er.async_get(self.hass)
@@ -282,6 +573,8 @@ class SmartCloudAgeOptionsFlow(config_entries.OptionsFlow):
                 entity_registry.async_remove(entity_id)
 
             meters.pop(self._meter_index)
+            self._channels.discard((device_id, channel))
+            self._meter_indexes.pop(self._device_index, None)
             self._meter_index = None
             return self._save_options()
 
@@ -295,6 +588,82 @@ class SmartCloudAgeOptionsFlow(config_entries.OptionsFlow):
             description_placeholders=placeholders,
         )
 
+    ## @brief Adds or replaces controllers of this entry from a CSV or YAML list.
+    #  @param user_input Submitted format and document, or @c None on first display.
+    #  @return Import form or completed options entry.
+    async def async_step_import_devices(self, user_input=None):
+        """Import controllers into the entry."""
+        errors = {}
+        placeholders = {"details": ""}
+        if user_input is not None:
+            others = (
+                entry
+                for entry in self.hass.config_entries.async_entries(DOMAIN)
+                if entry.entry_id != self.config_entry.entry_id
+            )
+            try:
+                devices = parse_devices(
+                    user_input["devices"],
+                    user_input["format"],
+                    configured_device_ids(others),
+                )
+            except BulkImportError as err:
+                errors["devices"] = "invalid_import"
+                placeholders["details"] = str(err)
+            else:
+                self._devices = merge_devices(self._devices, devices)
+                self._device_choices = None
+                self._meter_indexes.clear()
+                return self._save_options()
+        return self.async_show_form(
+            step_id="import_devices",
+            data_schema=import_schema(user_input, include_title=False),
+            errors=errors,
+            description_placeholders=placeholders,
+        )
+
+    ## @brief Edits the availability timeout of one controller.
+    #  @param user_input Submitted timeout, or @c None on first display.
+    #  @return Selection form, timeout form or completed options entry.
+    async def async_step_device_availability(self, user_input=None):
+        """Set how long a controller may stay silent."""
+        if (selection := self._async_select_device("device_availability")) is not None:
+            return selection
+        device = self._device()
+        if user_input is not None:
+            device[CONF_AVAILABILITY_TIMEOUT] = user_input[CONF_AVAILABILITY_TIMEOUT]
+            return self._save_options()
+        timeout = device.get(
+            CONF_AVAILABILITY_TIMEOUT,
+            self._settings.get(CONF_AVAILABILITY_TIMEOUT, DEFAULT_AVAILABILITY_TIMEOUT),
+        )
+        return self.async_show_form(
+            step_id="device_availability",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_AVAILABILITY_TIMEOUT, default=timeout): vol.All(
+                        vol.Coerce(int), vol.Range(min=0)
+                    )
+                }
+            ),
+            description_placeholders={
+                "device": device.get("alias") or device["device_id"]
+            },
+        )
+
+    ## @brief Edits entry-wide settings such as the fleet subscription mode.
+    #  @param user_input Submitted settings, or @c None on first display.
+    #  @return Settings form or completed options entry.
+    async def async_step_settings(self, user_input=None):
+        """Edit and immediately persist the integration settings."""
+        if user_input is not None:
+            self._settings.update(user_input)
+            return self._save_options()
+        return self.async_show_form(
+            step_id="settings",
+            data_schema=settings_schema(self._settings),
+        )
+
     ## @brief Closes the options flow without changing the working data.
     #  @param user_input Unused menu input.
     #  @return Completed options entry.
@@ -302,8 +671,10 @@ class SmartCloudAgeOptionsFlow(config_entries.OptionsFlow):
         """Save unchanged options and close the flow."""
         return self._save_options()
 
-    ## @brief Persists the current device list.
+    ## @brief Persists the current device list and settings.
     #  @return Completed options-flow result.
     def _save_options(self):
         """Persist the current device list and close the options flow."""
-        return self.async_create_entry(title="", data={"devices": self._devices})
+        return self.async_create_entry(
+            title="", data={**self._settings, "devices": self._devices}
+        )
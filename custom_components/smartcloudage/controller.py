@@ -0,0 +1,189 @@
+"""Compact per-controller state shared by the entities of a device."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+DOMAIN = "smartcloudage"
+PULSE_CHANNELS = 16
+## Modulus of the firmware pulse counter, built from two 16-bit halves.
+PULSE_COUNTER_MODULUS = 1 << 32
+## Largest drop of the raw counter still read as a wraparound instead of a reset.
+PULSE_WRAP_THRESHOLD = 1 << 31
+
+
+## @brief Latest known state of one SmartCloudAge controller.
+#
+#  Every entity of the controller is a thin view over this record, so identity
+#  and @c device_info are stored once per device instead of once per entity.
+class ControllerState:
+    """Output bitmask, pulse counters and diagnostics of one controller."""
+
+    __slots__ = (
+        "alias",
+        "available",
+        "device_id",
+        "device_info",
+        "outputs",
+        "pulses",
+        "pulses_seen",
+        "raw_pulses",
+        "reset_pending",
+        "rssi",
+        "uptime",
+    )
+
+    def __init__(self, device_id: str, alias: str | None = None) -> None:
+        ## @brief Initializes an empty state record.
+        #  @param device_id Unique controller identifier.
+        #  @param alias Human-readable controller name; defaults to @p device_id.
+        self.device_id = device_id
+        self.alias = alias or device_id
+        ## Device-registry metadata shared by every entity of the controller.
+        self.device_info: dict[str, Any] = {
+            "identifiers": {(DOMAIN, device_id)},
+            "name": f"SmartCloudAge {self.alias}",
+            "manufacturer": "SmartCloudAge",
+            "model": "MQTT Controller",
+        }
+        ## Last confirmed @c Output.Outputs bitmask (bit i = output i on).
+        self.outputs = 0
+        ## 64-bit accumulated pulse counts, indexed by channel - 1.
+        self.pulses = array("Q", bytes(8 * PULSE_CHANNELS))
+        ## Last 32-bit firmware counters, indexed by channel - 1.
+        self.raw_pulses = array("I", bytes(4 * PULSE_CHANNELS))
+        ## Bitmask of the channels that already reported a counter.
+        self.pulses_seen = 0
+        ## Bitmask of the channels whose next counter drop is a reboot reset.
+        self.reset_pending = 0
+        self.rssi: int | None = None
+        self.uptime: int | None = None
+        ## Whether the controller reported within its availability timeout.
+        self.available = True
+
+    ## @brief Renames the controller without discarding its state.
+    #  @param alias New human-readable name; defaults to the device ID.
+    def set_alias(self, alias: str | None) -> None:
+        """Update the alias and the shared device-registry name."""
+        self.alias = alias or self.device_id
+        self.device_info["name"] = f"SmartCloudAge {self.alias}"
+
+    ## @brief Returns the accumulated count of a pulse channel.
+    #  @param channel Pulse channel, between 1 and @c PULSE_CHANNELS.
+    #  @return Accumulated pulses, or @c None before the first reading.
+    def pulse(self, channel: int) -> int | None:
+        """Return the accumulated pulse count of a channel."""
+        if not (self.pulses_seen >> (channel - 1)) & 1:
+            return None
+        return self.pulses[channel - 1]
+
+    ## @brief Returns the last firmware counter of a pulse channel.
+    #  @param channel Pulse channel, between 1 and @c PULSE_CHANNELS.
+    #  @return Raw 32-bit counter, or @c None before the first reading.
+    def raw_pulse(self, channel: int) -> int | None:
+        """Return the last raw counter of a channel."""
+        if not (self.pulses_seen >> (channel - 1)) & 1:
+            return None
+        return self.raw_pulses[channel - 1]
+
+    ## @brief Accumulates a new firmware counter of a pulse channel.
+    #
+    #  The first reading starts the accumulator at the raw value. Later
+    #  increments are added as they are. A drop of the raw counter is treated
+    #  as a 32-bit wraparound when it exceeds @c PULSE_WRAP_THRESHOLD and no
+    #  reboot was reported; otherwise the counter restarted from zero and the
+    #  new raw value is added.
+    #  @param channel Pulse channel, between 1 and @c PULSE_CHANNELS.
+    #  @param raw_pulses Unsigned 32-bit firmware counter.
+    #  @return Accumulated pulse count of the channel.
+    def set_pulse(self, channel: int, raw_pulses: int) -> int:
+        """Record a raw counter and return the accumulated count."""
+        index = channel - 1
+        bit = 1 << index
+        if not self.pulses_seen & bit:
+            self.pulses_seen |= bit
+            total = raw_pulses
+        else:
+            last = self.raw_pulses[index]
+            total = self.pulses[index]
+            if raw_pulses >= last:
+                total += raw_pulses - last
+            elif not self.reset_pending & bit and last - raw_pulses > PULSE_WRAP_THRESHOLD:
+                total += raw_pulses + PULSE_COUNTER_MODULUS - last
+            else:
+                total += raw_pulses
+        self.reset_pending &= ~bit
+        self.raw_pulses[index] = raw_pulses
+        self.pulses[index] = total
+        return total
+
+    ## @brief Marks every channel as reset by a controller reboot.
+    def mark_restarted(self) -> None:
+        """Read the next counter drop of each channel as a reset."""
+        self.reset_pending = (1 << PULSE_CHANNELS) - 1
+
+    ## @brief Exports the accumulators of the channels that reported a counter.
+    #  @return Mapping of channel to accumulated and last raw counters.
+    def export_pulses(self) -> dict[str, list[int]]:
+        """Return the persistent accumulator state."""
+        return {
+            str(index + 1): [self.pulses[index], self.raw_pulses[index]]
+            for index in range(PULSE_CHANNELS)
+            if (self.pulses_seen >> index) & 1
+        }
+
+    ## @brief Restores accumulators exported by @c export_pulses.
+    #  @param channels Mapping of channel to accumulated and last raw counters.
+    def restore_pulses(self, channels: Mapping[str, list[int]]) -> None:
+        """Load a persisted accumulator state."""
+        for channel, (total, raw_pulses) in channels.items():
+            index = int(channel) - 1
+            if 0 <= index < PULSE_CHANNELS:
+                self.pulses[index] = int(total)
+                self.raw_pulses[index] = int(raw_pulses)
+                self.pulses_seen |= 1 << index
+
+    ## @brief Exports the state restored on the next start.
+    #
+    #  Fields that were never reported are omitted to keep the snapshot small.
+    #  @return Pulse accumulators, output bitmask, RSSI and uptime.
+    def export_state(self) -> dict[str, Any]:
+        """Return the persistent snapshot of the controller."""
+        state: dict[str, Any] = {}
+        if pulses := self.export_pulses():
+            state["pulses"] = pulses
+        if self.outputs:
+            state["outputs"] = self.outputs
+        if self.rssi is not None:
+            state["rssi"] = self.rssi
+        if self.uptime is not None:
+            state["uptime"] = self.uptime
+        return state
+
+    ## @brief Restores a snapshot exported by @c export_state.
+    #  @param state Pulse accumulators, output bitmask, RSSI and uptime.
+    def restore_state(self, state: Mapping[str, Any]) -> None:
+        """Load a persisted controller snapshot."""
+        self.restore_pulses(state.get("pulses", {}))
+        self.outputs = int(state.get("outputs", 0))
+        if state.get("rssi") is not None:
+            self.rssi = int(state["rssi"])
+        if state.get("uptime") is not None:
+            self.uptime = int(state["uptime"])
+
+
+## @brief Creates the state records of every configured controller.
+#  @param devices Controller configurations of a config entry.
+#  @return Mapping of controller ID to its state record.
+def build_controller_states(
+    devices: Iterable[Mapping[str, Any]],
+) -> dict[str, ControllerState]:
+    """Return one state record per configured controller."""
+    controllers: dict[str, ControllerState] = {}
+    for device in devices:
+        device_id = device.get("device_id")
+        if device_id and device_id not in controllers:
+            controllers[device_id] = ControllerState(device_id, device.get("alias"))
+    return controllers
@@ -0,0 +1,204 @@
+"""Telemetry decoding for SmartCloudAge MQTT frames."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+RSSI_KEYS = ("Wifi_db", "wifi_db", "RSSI", "rssi")
+UPTIME_KEYS = ("uptime", "Uptime", "UPTIME")
+
+## @brief Decodes an MQTT payload, unwrapping double-encoded @c message fields.
+#  @param payload Raw MQTT payload as bytes or text.
+#  @return Decoded telemetry dictionary.
+def decode_payload(payload: bytes | str) -> dict[str, Any]:
+    """Decode a telemetry frame with the generic JSON parser."""
+    raw = payload.decode("utf-8") if isinstance(payload, bytes) else payload
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError("payload is not a JSON object")
+
+    inner = data.get("message")
+    if isinstance(inner, str) and inner.startswith("{"):
+        try:
+            inner_obj = json.loads(inner)
+        except ValueError:
+            return data
+        if isinstance(inner_obj, dict):
+            data = {**data, **inner_obj}
+    return data
+
+
+## @brief Converts a telemetry value to a number.
+#  @param value Raw JSON value.
+#  @return Parsed numeric value, or @c None when the value is not numeric.
+def _numeric(value: Any) -> float | None:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+## @brief Finds the first numeric telemetry value under a known firmware key.
+#  @param data Decoded MQTT payload.
+#  @param keys Candidate keys in priority order.
+#  @return Pair of the matching key and its value, or @c (None, None).
+def _first_numeric(
+    data: dict[str, Any], keys: tuple[str, ...]
+) -> tuple[str | None, float | None]:
+    """Return the first numeric telemetry value matching any known firmware key."""
+    for key in keys:
+        value = _numeric(data.get(key))
+        if value is not None:
+            return key, value
+    return None, None
+
+
+## @brief Normalized content of one controller frame.
+class TelemetryFrame:
+    """Fields extracted from a frame, shared by every handler."""
+
+    __slots__ = ("data", "message_type", "outputs", "pulses", "rssi", "uptime")
+
+    def __init__(
+        self,
+        message_type: str,
+        rssi: float | None = None,
+        uptime: float | None = None,
+        pulses: list[tuple[int, int]] | None = None,
+        outputs: int | None = None,
+        data: dict[str, Any] | None = None,
+    ) -> None:
+        ## @brief Stores the decoded frame fields.
+        #  @param message_type Upper-case value of the @c message field.
+        #  @param rssi Wi-Fi signal strength in dBm, when present.
+        #  @param uptime Controller uptime in seconds, when present.
+        #  @param pulses Pairs of channel and raw 32-bit counter for pulse frames.
+        #  @param outputs @c Output.Outputs bitmask, when present.
+        #  @param data Full decoded payload.
+        self.message_type = message_type
+        self.rssi = rssi
+        self.uptime = uptime
+        self.pulses = pulses
+        self.outputs = outputs
+        self.data = data
+
+
+## @brief Decodes controller frames, remembering each firmware's key spellings.
+class TelemetryDecoder:
+    """Decode frames with a fast path for pulse telemetry and a generic fallback."""
+
+    def __init__(self) -> None:
+        ## @brief Initializes empty per-controller key caches.
+        self._rssi_keys: dict[str, str] = {}
+        self._uptime_keys: dict[str, str] = {}
+
+    ## @brief Decodes one MQTT payload into a normalized frame.
+    #  @param device_id Controller that published the frame.
+    #  @param payload Raw MQTT payload as bytes or text.
+    #  @return Normalized telemetry frame.
+    #  @throws ValueError When the payload is not valid telemetry.
+    def decode(self, device_id: str, payload: bytes | str) -> TelemetryFrame:
+        """Decode a frame, using the pulse fast path whenever it applies."""
+        data = decode_payload(payload)
+        if data.get("message") == "PULSE_SENSOR":
+            frame = self._decode_pulse_frame(device_id, data)
+            if frame is not None:
+                return frame
+        return self._decode_generic(device_id, data)
+
+    ## @brief Extracts a pulse frame that has the exact firmware layout.
+    #
+    #  Reads @c Sensor, @c lsb and @c msb by direct indexing with integer-only
+    #  bit operations, avoiding per-field defaults and conversions. Any other
+    #  layout returns @c None so the generic parser handles it.
+    #  @param device_id Controller that published the frame.
+    #  @param data Decoded MQTT payload whose message is @c PULSE_SENSOR.
+    #  @return Decoded frame, or @c None when the payload has another layout.
+    def _decode_pulse_frame(
+        self, device_id: str, data: dict[str, Any]
+    ) -> TelemetryFrame | None:
+        try:
+            # "| 0" and "&" raise TypeError for anything but integers.
+            pulses = [
+                (
+                    pulse["Sensor"] | 0,
+                    ((pulse["msb"] & 0xFFFF) << 16) | (pulse["lsb"] & 0xFFFF),
+                )
+                for pulse in data["Pulses"]
+            ]
+        except (KeyError, TypeError):
+            return None
+        return TelemetryFrame(
+            "PULSE_SENSOR",
+            self._cached_numeric(self._rssi_keys, device_id, data, RSSI_KEYS),
+            self._cached_numeric(self._uptime_keys, device_id, data, UPTIME_KEYS),
+            pulses,
+            None,
+            data,
+        )
+
+    ## @brief Normalizes an already parsed payload of any layout.
+    #  @param device_id Controller that published the frame.
+    #  @param data Decoded MQTT payload.
+    #  @return Normalized telemetry frame.
+    def _decode_generic(self, device_id: str, data: dict[str, Any]) -> TelemetryFrame:
+        msg_type = data.get("message")
+        if msg_type != "PULSE_SENSOR":
+            msg_type = msg_type.upper() if isinstance(msg_type, str) else ""
+
+        pulses = None
+        if msg_type == "PULSE_SENSOR":
+            pulses = []
+            for pulse in data.get("Pulses", []):
+                lsb = int(pulse.get("lsb", 0)) & 0xFFFF
+                msb = int(pulse.get("msb", 0)) & 0xFFFF
+                pulses.append((int(pulse.get("Sensor", 0)), (msb << 16) | lsb))
+
+        outputs = None
+        output_section = data.get("Output")
+        if isinstance(output_section, dict):
+            value = output_section.get("Outputs")
+            if value is not None:
+                outputs = int(value)
+
+        return TelemetryFrame(
+            msg_type,
+            rssi=self._cached_numeric(self._rssi_keys, device_id, data, RSSI_KEYS),
+            uptime=self._cached_numeric(self._uptime_keys, device_id, data, UPTIME_KEYS),
+            pulses=pulses,
+            outputs=outputs,
+            data=data,
+        )
+
+    ## @brief Reads a field using the spelling the controller's firmware uses.
+    #
+    #  The cached spelling of the controller is read first. When it is absent,
+    #  as when pulse and status frames of one firmware spell the field
+    #  differently, every spelling is probed and the matching one is cached.
+    #  @param cache Mapping of controller ID to its known key spelling.
+    #  @param device_id Controller that published the frame.
+    #  @param data Decoded MQTT payload.
+    #  @param keys Candidate spellings in priority order.
+    #  @return Parsed numeric value, or @c None when absent.
+    @staticmethod
+    def _cached_numeric(
+        cache: dict[str, str],
+        device_id: str,
+        data: dict[str, Any],
+        keys: tuple[str, ...],
+    ) -> float | None:
+        key = cache.get(device_id)
+        if key is not None:
+            value = data.get(key)
+            if type(value) is int or type(value) is float:
+                return value
+            value = _numeric(value)
+            if value is not None:
+                return value
+        key, value = _first_numeric(data, keys)
+        if key is not None:
+            cache[device_id] = key
+        return value
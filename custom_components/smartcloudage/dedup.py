@@ -0,0 +1,64 @@
+"""Detection of duplicate SmartCloudAge frames before decoding."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+
+## Frames remembered per controller.
+DEDUP_SIZE = 8
+## Seconds during which an identical frame is treated as a duplicate.
+DEDUP_TTL = 1.0
+
+
+## @brief Remembers the recent frames of each controller by hash.
+#
+#  QoS redeliveries after a broker reconnect repeat frames verbatim. Each
+#  controller keeps a small LRU of hashes of its latest topic and payload
+#  pairs, so a repeated frame is discarded before it is decoded. An entry
+#  expires after @c DEDUP_TTL seconds and is not refreshed by its duplicates,
+#  so a controller that legitimately repeats a frame is still heard.
+class FrameDeduplicator:
+    """Per-controller LRU of recent frame hashes with a short TTL."""
+
+    __slots__ = ("_devices", "size", "ttl")
+
+    def __init__(self, size: int = DEDUP_SIZE, ttl: float = DEDUP_TTL) -> None:
+        ## @brief Starts without any remembered frame.
+        #  @param size Frames remembered per controller.
+        #  @param ttl Seconds during which a repeated frame is a duplicate.
+        self.size = size
+        self.ttl = ttl
+        self._devices: dict[str, OrderedDict[int, float]] = {}
+
+    ## @brief Records a frame and reports whether it repeats a recent one.
+    #  @param device_id Controller that produced the frame.
+    #  @param topic Topic the frame was received on.
+    #  @param payload Raw MQTT payload.
+    #  @param now Monotonic timestamp of the frame, in seconds.
+    #  @return @c True when the same frame was seen less than @c ttl ago.
+    def is_duplicate(
+        self, device_id: str, topic: str, payload: bytes | str, now: float
+    ) -> bool:
+        """Return whether the frame is a recent duplicate, remembering it if not."""
+        recent = self._devices.get(device_id)
+        if recent is None:
+            recent = self._devices[device_id] = OrderedDict()
+        key = hash((topic, payload))
+        seen_at = recent.get(key)
+        if seen_at is not None and now - seen_at < self.ttl:
+            return True
+        recent[key] = now
+        recent.move_to_end(key)
+        if len(recent) > self.size:
+            recent.popitem(last=False)
+        return False
+
+    ## @brief Forgets the frames of a controller.
+    #
+    #  Called when a command is sent, since the status frames that follow may
+    #  legitimately repeat a frame of the last few seconds, and when the
+    #  controller is removed.
+    #  @param device_id Unique controller identifier.
+    def forget(self, device_id: str) -> None:
+        """Drop the remembered frames of a controller."""
+        self._devices.pop(device_id, None)
@@ -0,0 +1,43 @@
+"""Diagnostics support for SmartCloudAge configuration entries."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+
+## @brief Builds the diagnostics download of a configuration entry.
+#  @param hass Active Home Assistant instance.
+#  @param entry Loaded SmartCloudAge configuration entry.
+#  @return Entry settings, controller availability, hot-path counters and RTC
+#          scheduling state.
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = entry.runtime_data
+    devices = entry.options.get("devices", entry.data.get("devices", []))
+    return {
+        "options": {key: value for key, value in entry.options.items() if key != "devices"},
+        "devices": [
+            {
+                "device_id": device.get("device_id"),
+                "outputs": device.get("outputs"),
+                "meters": len(device.get("meters", [])),
+                "available": data.controllers[device["device_id"]].available,
+                "availability_timeout": data.availability.timeout(device["device_id"]),
+            }
+            for device in devices
+            if device.get("device_id") in data.controllers
+        ],
+        "stats": data.stats.as_dict(),
+        "rtc": {
+            "last_round_duration": data.rtc.last_round_duration,
+            "sync_intervals": {
+                device_id: data.rtc.sync_interval(device_id).total_seconds()
+                for device_id in data.rtc.device_ids
+            },
+        },
+    }
@@ -0,0 +1,385 @@
+"""Shared MQTT telemetry dispatcher for SmartCloudAge controllers."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Callable
+from itertools import count
+import logging
+import time
+
+from homeassistant.components import mqtt
+from homeassistant.core import HomeAssistant, callback
+
+from .decoder import TelemetryDecoder, TelemetryFrame
+from .dedup import DEDUP_TTL, FrameDeduplicator
+from .log_limiter import LogLimiter
+from .stats import IntegrationStats
+
+_LOGGER = logging.getLogger(__name__)
+
+CONF_FLEET_MODE = "fleet_mode"
+## Option deferring subscriptions and the first RTC round until Home
+## Assistant has started.
+CONF_DEFER_STARTUP = "defer_startup"
+FLEET_TOPIC = "+/+/OutTopic/#"
+DEVICE_TOPIC = "+/{device_id}/#"
+## Longest time spent handling frames before yielding to the event loop, in
+## seconds.
+INGEST_BUDGET = 0.01
+## Largest number of frames waiting in the ingestion queue.
+INGEST_QUEUE_SIZE = 4096
+
+FrameHandler = Callable[[str, TelemetryFrame], None]
+OutputHandler = Callable[[str, int], None]
+
+
+## @brief Returns the cumulative state a frame carries, if any.
+#
+#  Pulse frames carry absolute counters and output status frames the full
+#  output bitmask, so a newer frame of the same kind on the same topic
+#  replaces a queued one without losing anything. Other frames, such as
+#  @c INPUT_STATUS, are events and must all be handled.
+#  @param frame Decoded telemetry frame.
+#  @return @c pulse, @c outputs, or @c None for frames that are not coalesced.
+def _coalesce_kind(frame: TelemetryFrame) -> str | None:
+    """Return the coalescing kind of a decoded frame."""
+    if frame.message_type == "PULSE_SENSOR":
+        return "pulse"
+    if frame.outputs is not None and frame.message_type != "INPUT_STATUS":
+        return "outputs"
+    return None
+
+
+## @brief Handlers registered for a single controller.
+class _DeviceRoute:
+    """Pulse, diagnostic and output handlers of one controller."""
+
+    __slots__ = ("diagnostic", "output", "pulse")
+
+    def __init__(self) -> None:
+        ## @brief Initializes empty handler lists.
+        self.diagnostic: list[FrameHandler] = []
+        self.pulse: list[FrameHandler] = []
+        self.output: list[OutputHandler] = []
+
+
+## @brief Owns the MQTT subscriptions of a config entry and routes decoded frames.
+#
+#  Frames are handled inline until the time budget of the current event-loop
+#  iteration is spent. Later frames, for example the backlog flushed by the
+#  controllers after a broker reconnect, wait in a bounded queue and are
+#  drained in budgeted batches. Pulse and output status frames carry the full
+#  state of their topic (cumulative counters, the whole output bitmask), so a
+#  queued one is replaced by a newer frame of the same topic and kind; any
+#  other frame is queued in arrival order.
+class SmartCloudAgeDispatcher:
+    """Subscribe once per controller and fan decoded frames out to the platforms."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        fleet_mode: bool = False,
+        stats: IntegrationStats | None = None,
+        *,
+        budget: float = INGEST_BUDGET,
+        queue_size: int = INGEST_QUEUE_SIZE,
+        dedup_ttl: float = DEDUP_TTL,
+    ) -> None:
+        ## @brief Initializes an empty routing table.
+        #  @param hass Active Home Assistant instance.
+        #  @param fleet_mode Whether to use one wildcard subscription for all
+        #         controllers instead of one subscription per controller.
+        #  @param stats Entry counters; a private set is created when omitted.
+        #  @param budget Seconds of frame handling per event-loop iteration.
+        #  @param queue_size Largest number of queued topics; further frames of
+        #         new topics are dropped.
+        #  @param dedup_ttl Seconds during which a redelivered frame is dropped
+        #         as a duplicate; 0 disables duplicate detection.
+        self._hass = hass
+        self._fleet_mode = fleet_mode
+        self.stats = stats if stats is not None else IntegrationStats()
+        self._decoder = TelemetryDecoder()
+        self._dedup = FrameDeduplicator(ttl=dedup_ttl)
+        self._log = LogLimiter(_LOGGER)
+        self._routes: dict[str, _DeviceRoute] = {}
+        self._subscriptions: dict[str, Callable[[], None]] = {}
+        self._budget = budget
+        self._queue_size = queue_size
+        ## Decoded frames waiting to be routed, oldest first. Frames with
+        ## cumulative state are keyed by topic and kind so the newest one
+        ## replaces a queued one; any other frame gets a unique sequence key.
+        self._pending: OrderedDict[
+            tuple[str, str | int], tuple[str, TelemetryFrame]
+        ] = OrderedDict()
+        self._sequence = count()
+        self._drain_task: asyncio.Task | None = None
+        self._budget_end = 0.0
+        self._budget_armed = False
+
+    ## @brief Returns the route of a controller, creating it when needed.
+    #  @param device_id Unique controller identifier.
+    #  @return Handler lists for the controller.
+    def _route(self, device_id: str) -> _DeviceRoute:
+        route = self._routes.get(device_id)
+        if route is None:
+            route = self._routes[device_id] = _DeviceRoute()
+        return route
+
+    ## @brief Registers a handler that receives every frame of a controller.
+    #  @param device_id Unique controller identifier.
+    #  @param handler Callback receiving the device ID and normalized frame.
+    @callback
+    def async_register_diagnostic_handler(
+        self, device_id: str, handler: FrameHandler
+    ) -> None:
+        """Register a handler for RSSI, uptime and other per-frame fields."""
+        self._route(device_id).diagnostic.append(handler)
+
+    ## @brief Registers a handler for @c PULSE_SENSOR frames of a controller.
+    #  @param device_id Unique controller identifier.
+    #  @param handler Callback receiving the device ID and normalized frame.
+    @callback
+    def async_register_pulse_handler(
+        self, device_id: str, handler: FrameHandler
+    ) -> None:
+        """Register a handler for pulse counter frames."""
+        self._route(device_id).pulse.append(handler)
+
+    ## @brief Registers a handler for output bitmask status frames.
+    #  @param device_id Unique controller identifier.
+    #  @param handler Callback receiving the device ID and @c Output.Outputs mask.
+    @callback
+    def async_register_output_handler(
+        self, device_id: str, handler: OutputHandler
+    ) -> None:
+        """Register a handler for output status frames."""
+        self._route(device_id).output.append(handler)
+
+    ## @brief Subscribes to the telemetry of every controller with handlers.
+    #
+    #  In fleet mode a single wildcard subscription covers the whole fleet and
+    #  frames are routed by the device segment of the topic, so unknown
+    #  controllers are discarded before their payload is decoded. Otherwise
+    #  the per-controller subscriptions are requested concurrently.
+    async def async_subscribe(self) -> None:
+        """Create one fleet-wide subscription or one subscription per controller."""
+        if self._fleet_mode:
+            await self._async_subscribe_topic(FLEET_TOPIC)
+            return
+        await asyncio.gather(
+            *(
+                self._async_subscribe_topic(DEVICE_TOPIC.format(device_id=device_id))
+                for device_id in list(self._routes)
+            )
+        )
+
+    ## @brief Subscribes to a controller added after the initial subscription.
+    #
+    #  Its handlers must already be registered. In fleet mode the wildcard
+    #  subscription already covers the controller.
+    #  @param device_id Unique controller identifier.
+    async def async_subscribe_device(self, device_id: str) -> None:
+        """Subscribe to the topics of one controller."""
+        if not self._fleet_mode:
+            await self._async_subscribe_topic(DEVICE_TOPIC.format(device_id=device_id))
+
+    ## @brief Subscribes to a topic filter unless it is already subscribed.
+    #  @param topic MQTT topic filter.
+    async def _async_subscribe_topic(self, topic: str) -> None:
+        if topic not in self._subscriptions:
+            self._subscriptions[topic] = await mqtt.async_subscribe(
+                self._hass, topic, self._async_message_received, 0
+            )
+
+    ## @brief Drops the handlers and the subscription of a removed controller.
+    #  @param device_id Unique controller identifier.
+    @callback
+    def async_remove_device(self, device_id: str) -> None:
+        """Stop routing frames of one controller."""
+        self._routes.pop(device_id, None)
+        self._dedup.forget(device_id)
+        self._log.forget(device_id)
+        unsubscribe = self._subscriptions.pop(
+            DEVICE_TOPIC.format(device_id=device_id), None
+        )
+        if unsubscribe is not None:
+            unsubscribe()
+
+    ## @brief Removes every MQTT subscription owned by the dispatcher.
+    #
+    #  Frames still waiting in the ingestion queue are discarded.
+    @callback
+    def async_unsubscribe(self) -> None:
+        """Cancel all MQTT subscriptions."""
+        while self._subscriptions:
+            self._subscriptions.popitem()[1]()
+        self._pending.clear()
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            self._drain_task = None
+        self._log.clear()
+
+    ## @brief Accepts the next frames of a controller even if they repeat
+    #         recent ones.
+    #
+    #  Called before a command is published, since the confirming status may
+    #  match a status of the last seconds.
+    #  @param device_id Unique controller identifier.
+    @callback
+    def async_forget_frames(self, device_id: str) -> None:
+        """Reset the duplicate detection of a controller."""
+        self._dedup.forget(device_id)
+
+    ## @brief Returns the number of frames waiting in the ingestion queue.
+    #  @return Queued frames.
+    @property
+    def pending(self) -> int:
+        """Return the ingestion queue length."""
+        return len(self._pending)
+
+    ## @brief Handles a frame inline or queues it once the budget is spent.
+    #
+    #  Frames repeating one of the last frames of the controller are dropped
+    #  first, before they are queued or decoded. Queued frames are decoded on
+    #  arrival; a pulse or output status frame replaces a queued frame of the
+    #  same kind and topic, and every other frame is queued in order.
+    #  @param msg MQTT message received from a controller topic.
+    @callback
+    def _async_message_received(self, msg) -> None:
+        stats = self.stats
+        stats.frames_received += 1
+        topic = msg.topic
+        topic_parts = topic.split("/", 2)
+        if len(topic_parts) < 2 or topic_parts[1] not in self._routes:
+            stats.frames_unknown_device += 1
+            return
+        if self._dedup.is_duplicate(
+            topic_parts[1], topic, msg.payload, time.monotonic()
+        ):
+            stats.frames_duplicate += 1
+            return
+        if not self._pending and self._within_budget():
+            self._async_process(topic, topic_parts[1], msg.payload)
+            return
+
+        pending = self._pending
+        device_id = topic_parts[1]
+        frame = self._decode(topic, device_id, msg.payload)
+        if frame is None:
+            return
+        kind = _coalesce_kind(frame)
+        key = (topic, kind if kind is not None else next(self._sequence))
+        if key in pending:
+            stats.frames_coalesced += 1
+        elif len(pending) >= self._queue_size:
+            stats.frames_dropped += 1
+            return
+        pending[key] = (device_id, frame)
+        if len(pending) > stats.ingest_queue_peak:
+            stats.ingest_queue_peak = len(pending)
+        if self._drain_task is None:
+            self._drain_task = self._hass.async_create_task(
+                self._async_drain(), "smartcloudage ingestion", eager_start=False
+            )
+
+    ## @brief Returns whether the current loop iteration still has budget.
+    #
+    #  The first frame of an iteration opens a budget window that is closed
+    #  again by a callback scheduled for the next iteration.
+    #  @return @c True while frames may be handled inline.
+    def _within_budget(self) -> bool:
+        now = time.monotonic()
+        if not self._budget_armed:
+            self._budget_armed = True
+            self._budget_end = now + self._budget
+            self._hass.loop.call_soon(self._async_close_budget)
+            return True
+        return now < self._budget_end
+
+    ## @brief Ends the budget window of the previous loop iteration.
+    @callback
+    def _async_close_budget(self) -> None:
+        self._budget_armed = False
+
+    ## @brief Handles queued frames in batches bounded by the time budget.
+    #
+    #  Each batch handles at least one frame, then yields to the event loop.
+    async def _async_drain(self) -> None:
+        pending = self._pending
+        try:
+            while pending:
+                deadline = time.monotonic() + self._budget
+                while True:
+                    (topic, _), (device_id, frame) = pending.popitem(last=False)
+                    self._async_route(topic, device_id, frame)
+                    if not pending or time.monotonic() >= deadline:
+                        break
+                await asyncio.sleep(0)
+        finally:
+            self._drain_task = None
+
+    ## @brief Decodes a telemetry frame once and routes it to its handlers.
+    #  @param topic Topic the frame was received on.
+    #  @param device_id Controller segment of the topic.
+    #  @param payload Raw MQTT payload.
+    @callback
+    def _async_process(self, topic: str, device_id: str, payload: bytes | str) -> None:
+        frame = self._decode(topic, device_id, payload)
+        if frame is not None:
+            self._async_route(topic, device_id, frame)
+
+    ## @brief Decodes a payload, counting and logging invalid ones.
+    #  @param topic Topic the frame was received on.
+    #  @param device_id Controller segment of the topic.
+    #  @param payload Raw MQTT payload.
+    #  @return Decoded frame, or @c None when the payload is invalid.
+    def _decode(
+        self, topic: str, device_id: str, payload: bytes | str
+    ) -> TelemetryFrame | None:
+        try:
+            frame = self._decoder.decode(device_id, payload)
+        except (AttributeError, KeyError, TypeError, ValueError) as err:
+            self.stats.frames_invalid += 1
+            self._log.warning(
+                device_id,
+                "invalid payload",
+                "Invalid SmartCloudAge payload on %s: %s",
+                topic,
+                err,
+            )
+            return None
+        self.stats.frames_decoded += 1
+        return frame
+
+    ## @brief Passes a decoded frame to the handlers of its controller.
+    #  @param topic Topic the frame was received on.
+    #  @param device_id Controller segment of the topic.
+    #  @param frame Decoded telemetry frame.
+    @callback
+    def _async_route(self, topic: str, device_id: str, frame: TelemetryFrame) -> None:
+        route = self._routes.get(device_id)
+        if route is None:
+            # The controller was removed while its frame was queued.
+            return
+
+        try:
+            for handler in route.diagnostic:
+                handler(device_id, frame)
+
+            if frame.message_type == "PULSE_SENSOR":
+                for handler in route.pulse:
+                    handler(device_id, frame)
+
+            if frame.outputs is not None and frame.message_type != "INPUT_STATUS":
+                for output_handler in route.output:
+                    output_handler(device_id, frame.outputs)
+        except (AttributeError, KeyError, TypeError, ValueError) as err:
+            self._log.warning(
+                device_id,
+                "unhandled frame",
+                "Invalid SmartCloudAge payload on %s: %s",
+                topic,
+                err,
+            )
@@ -0,0 +1,100 @@
+"""Pre-serialized MQTT command encoding for SmartCloudAge controllers."""
+
+from __future__ import annotations
+
+from datetime import datetime
+import json
+from typing import Any
+
+COMMAND_TOPIC_PREFIX = "CloudAge/"
+CONFIG_DATE_TIME_ENUM = 9
+OUTPUT_COMMAND = 11
+WRITE = 1
+
+
+## @brief Topic and constant payload fragments of one controller.
+class _DeviceTemplates:
+    """Serialized parts of every command sent to one controller."""
+
+    __slots__ = ("output_head", "rtc_tails", "topic")
+
+    def __init__(self, device_id: str) -> None:
+        ## @brief Serializes the fixed parts of the controller's commands.
+        #  @param device_id Unique controller identifier.
+        self.topic = f"{COMMAND_TOPIC_PREFIX}{device_id}"
+        self.output_head = (
+            f'{{"command": {OUTPUT_COMMAND}, "type": {WRITE}, '
+            f'"signature": {json.dumps(device_id)}, "payload": {{"id": '
+        )
+        ## Closing fragment of the RTC command, per signature.
+        self.rtc_tails: dict[str, str] = {}
+
+
+## @brief Encodes controller commands from per-device templates.
+#
+#  The topic and the constant JSON fragments of each command are serialized
+#  once per controller; encoding a command only formats its variable fields.
+#  The output is byte-identical to @c json.dumps of the equivalent dictionary.
+class CommandEncoder:
+    """Build command topics and payloads without per-call serialization."""
+
+    def __init__(self) -> None:
+        ## @brief Initializes an empty template cache.
+        self._devices: dict[str, _DeviceTemplates] = {}
+
+    ## @brief Returns the templates of a controller, building them on first use.
+    #  @param device_id Unique controller identifier.
+    #  @return Cached templates of the controller.
+    def _templates(self, device_id: str) -> _DeviceTemplates:
+        templates = self._devices.get(device_id)
+        if templates is None:
+            templates = self._devices[device_id] = _DeviceTemplates(device_id)
+        return templates
+
+    ## @brief Returns the command topic of a controller.
+    #  @param device_id Unique controller identifier.
+    #  @return MQTT topic receiving the controller's commands.
+    def topic(self, device_id: str) -> str:
+        """Return the cached command topic."""
+        return self._templates(device_id).topic
+
+    ## @brief Encodes a command-11 output write.
+    #  @param device_id Unique controller identifier, also used as signature.
+    #  @param output_id Zero-based output index.
+    #  @param value Output state, where 1 is on and 0 is off.
+    #  @return Pair of topic and JSON payload.
+    def output(self, device_id: str, output_id: int, value: int) -> tuple[str, str]:
+        """Encode an output command."""
+        templates = self._templates(device_id)
+        return (
+            templates.topic,
+            f'{templates.output_head}{output_id + 1}, "value": {value}}}}}',
+        )
+
+    ## @brief Encodes a command-9 RTC synchronization.
+    #  @param device_id Unique controller identifier.
+    #  @param signature Command signature expected by the controller.
+    #  @param now Local date and time sent to the controller.
+    #  @return Pair of topic and JSON payload.
+    def rtc(self, device_id: str, signature: str, now: datetime) -> tuple[str, str]:
+        """Encode a clock synchronization command."""
+        templates = self._templates(device_id)
+        tail = templates.rtc_tails.get(signature)
+        if tail is None:
+            tail = templates.rtc_tails[signature] = (
+                f'}}}}, "type": {WRITE}, "signature": {json.dumps(signature)}}}'
+            )
+        return (
+            templates.topic,
+            f'{{"command": {CONFIG_DATE_TIME_ENUM}, "payload": {{"datetime": '
+            f'{{"day": {now.day}, "mon": {now.month}, "year": {now.year}, '
+            f'"hour": {now.hour}, "min": {now.minute}, "sec": {now.second}{tail}',
+        )
+
+    ## @brief Encodes any other command with the generic serializer.
+    #  @param device_id Unique controller identifier.
+    #  @param command Command dictionary in the firmware format.
+    #  @return Pair of the cached topic and JSON payload.
+    def encode(self, device_id: str, command: dict[str, Any]) -> tuple[str, str]:
+        """Encode a command that has no dedicated template."""
+        return self._templates(device_id).topic, json.dumps(command)
@@ -0,0 +1,150 @@
+"""Rate-limited logging of repeated per-controller conditions."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+## Seconds after the first message of a condition during which repetitions are
+## only counted.
+LOG_SUMMARY_INTERVAL = 60.0
+
+
+## @brief Counting window of one condition.
+class _Window:
+    """Start, level and suppressed count of a condition's current window."""
+
+    __slots__ = ("handle", "level", "start", "suppressed")
+
+    def __init__(self, start: float, level: int) -> None:
+        ## @brief Opens a window with nothing suppressed yet.
+        #  @param start Monotonic time of the logged message.
+        #  @param level Logging level of the message, reused by the summary.
+        self.start = start
+        self.level = level
+        self.suppressed = 0
+        self.handle: asyncio.TimerHandle | None = None
+
+
+## @brief Logs the first occurrence of each condition and summarizes the rest.
+#
+#  Conditions are keyed by controller and error class. The first message of a
+#  window is logged as usual; later ones are only counted, without formatting
+#  their arguments. When the window closes, a timer logs the count as a single
+#  summary line, so a burst that stops is still reported. Outside an event
+#  loop the summary is logged with the next occurrence instead.
+class LogLimiter:
+    """Per-controller, per-error-class log throttle."""
+
+    __slots__ = ("_interval", "_logger", "_windows")
+
+    def __init__(
+        self, logger: logging.Logger, interval: float = LOG_SUMMARY_INTERVAL
+    ) -> None:
+        ## @brief Binds the limiter to a logger.
+        #  @param logger Logger receiving the messages and summaries.
+        #  @param interval Length of each counting window, in seconds.
+        self._logger = logger
+        self._interval = interval
+        self._windows: dict[tuple[str, str], _Window] = {}
+
+    ## @brief Logs a message unless its condition was logged recently.
+    #  @param level Logging level of the message and of its summary.
+    #  @param device_id Controller the condition belongs to.
+    #  @param kind Error class, also used in the summary text.
+    #  @param msg Message with lazy @c % placeholders.
+    #  @param args Arguments of @p msg, formatted only when it is logged.
+    #  @param now Monotonic timestamp; defaults to the current time.
+    #  @return @c True when the message was logged.
+    def log(
+        self,
+        level: int,
+        device_id: str,
+        kind: str,
+        msg: str,
+        *args: Any,
+        now: float | None = None,
+    ) -> bool:
+        """Log the first occurrence per window and count the others."""
+        if not self._logger.isEnabledFor(level):
+            return False
+        if now is None:
+            now = time.monotonic()
+        key = (device_id, kind)
+        window = self._windows.get(key)
+        if window is not None:
+            if now - window.start < self._interval:
+                window.suppressed += 1
+                if window.handle is None:
+                    self._schedule_summary(key, window, now)
+                return False
+            self._summarize(key, now)
+        self._windows[key] = _Window(now, level)
+        self._logger.log(level, msg, *args)
+        return True
+
+    ## @brief Logs a rate-limited warning.
+    #  @param device_id Controller the condition belongs to.
+    #  @param kind Error class, also used in the summary text.
+    #  @param msg Message with lazy @c % placeholders.
+    #  @param args Arguments of @p msg.
+    #  @return @c True when the message was logged.
+    def warning(self, device_id: str, kind: str, msg: str, *args: Any) -> bool:
+        """Log a warning unless its condition was logged recently."""
+        return self.log(logging.WARNING, device_id, kind, msg, *args)
+
+    ## @brief Forgets the conditions of a controller without summarizing them.
+    #  @param device_id Unique controller identifier.
+    def forget(self, device_id: str) -> None:
+        """Drop the windows of a removed controller."""
+        for key in [key for key in self._windows if key[0] == device_id]:
+            handle = self._windows.pop(key).handle
+            if handle is not None:
+                handle.cancel()
+
+    ## @brief Drops every window and its pending summary, for example on unload.
+    def clear(self) -> None:
+        """Cancel pending summaries and forget every condition."""
+        for window in self._windows.values():
+            if window.handle is not None:
+                window.handle.cancel()
+        self._windows.clear()
+
+    ## @brief Arranges for the summary of a window to be logged when it closes.
+    #  @param key Controller and error class of the window.
+    #  @param window Window holding the first suppressed message.
+    #  @param now Monotonic time of that message.
+    def _schedule_summary(
+        self, key: tuple[str, str], window: _Window, now: float
+    ) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        window.handle = loop.call_later(
+            window.start + self._interval - now, self._summarize, key
+        )
+
+    ## @brief Closes a window, logging how many messages it suppressed.
+    #  @param key Controller and error class of the window.
+    #  @param now Monotonic time the window closed; defaults to the current time.
+    def _summarize(self, key: tuple[str, str], now: float | None = None) -> None:
+        window = self._windows.pop(key, None)
+        if window is None:
+            return
+        if window.handle is not None:
+            window.handle.cancel()
+        if not window.suppressed:
+            return
+        if now is None:
+            now = time.monotonic()
+        self._logger.log(
+            window.level,
+            "%d more %s messages from SmartCloudAge %s in %.0f s",
+            window.suppressed,
+            key[1],
+            key[0],
+            now - window.start,
+        )
@@ -0,0 +1,76 @@
+"""Searchable, paged choice lists for configuration forms."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+## Choices shown per form page.
+PAGE_SIZE = 20
+
+
+## @brief One page of a filtered choice list.
+class ChoicePage:
+    """Choices of the current page and the position within the results."""
+
+    __slots__ = ("choices", "page", "pages", "start", "total")
+
+    def __init__(
+        self, choices: dict[int, str], page: int, pages: int, start: int, total: int
+    ) -> None:
+        ## @brief Stores a computed page.
+        #  @param choices Mapping of item index to label for this page.
+        #  @param page Zero-based page number.
+        #  @param pages Number of pages of the filtered list, at least one.
+        #  @param start Position of the first choice within the filtered list.
+        #  @param total Number of items matching the search.
+        self.choices = choices
+        self.page = page
+        self.pages = pages
+        self.start = start
+        self.total = total
+
+
+## @brief Labels of a choice list prepared for repeated searches.
+#
+#  Labels are case-folded once, so each search is a single scan and each
+#  form only carries the choices of one page.
+class ChoiceIndex:
+    """Search and page a list of labels."""
+
+    __slots__ = ("_folded", "labels", "page_size")
+
+    def __init__(self, labels: Sequence[str], page_size: int = PAGE_SIZE) -> None:
+        ## @brief Indexes the labels.
+        #  @param labels Label of each item, in item order.
+        #  @param page_size Choices per page.
+        self.labels = labels
+        self.page_size = page_size
+        self._folded = [label.casefold() for label in labels]
+
+    ## @brief Returns one page of the labels matching a search.
+    #  @param query Case-insensitive text contained in the wanted labels.
+    #  @param page Zero-based page, clamped to the available pages.
+    #  @return Page of matching choices.
+    def page(self, query: str = "", page: int = 0) -> ChoicePage:
+        """Filter the labels and return the requested page."""
+        query = query.strip().casefold()
+        if query:
+            matches: Sequence[int] = [
+                index for index, label in enumerate(self._folded) if query in label
+            ]
+        else:
+            matches = range(len(self._folded))
+        total = len(matches)
+        pages = max(1, -(-total // self.page_size))
+        page = min(max(page, 0), pages - 1)
+        start = page * self.page_size
+        return ChoicePage(
+            {
+                index: self.labels[index]
+                for index in matches[start : start + self.page_size]
+            },
+            page,
+            pages,
+            start,
+            total,
+        )
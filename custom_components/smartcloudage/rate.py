@@ -0,0 +1,60 @@
+"""Instantaneous flow and power rates derived from pulse counters."""
+
+from __future__ import annotations
+
+from array import array
+
+CONF_RATE_WINDOW = "rate_window"
+## Default smoothing window in seconds; 0 disables the rate sensors.
+DEFAULT_RATE_WINDOW = 60
+## Samples kept per channel; older samples are overwritten.
+RATE_SAMPLES = 32
+
+
+## @brief Pulse rate of one channel over a sliding time window.
+#
+#  Samples are kept in fixed-size ring buffers, so memory does not grow with
+#  the frame rate. The rate spans at least the window whenever the buffer
+#  holds a sample that old, and otherwise spans the oldest sample available.
+class PulseRate:
+    """Ring buffer of (timestamp, accumulated pulses) samples."""
+
+    __slots__ = ("_count", "_head", "_pulses", "_times", "window")
+
+    def __init__(self, window: float, size: int = RATE_SAMPLES) -> None:
+        ## @brief Initializes an empty buffer.
+        #  @param window Smoothing window in seconds.
+        #  @param size Number of samples kept.
+        self.window = window
+        self._times = array("d", bytes(8 * size))
+        self._pulses = array("Q", bytes(8 * size))
+        self._head = 0
+        self._count = 0
+
+    ## @brief Records a sample and returns the rate over the window.
+    #  @param pulses Accumulated pulse count of the channel.
+    #  @param now Monotonic timestamp of the sample, in seconds.
+    #  @return Pulses per second, or @c None until two samples are available.
+    def add(self, pulses: int, now: float) -> float | None:
+        """Append a sample and compute the smoothed rate."""
+        times = self._times
+        size = len(times)
+        times[self._head] = now
+        self._pulses[self._head] = pulses
+        self._head = (self._head + 1) % size
+        if self._count < size:
+            self._count += 1
+
+        # Start from the oldest sample and move forward while the next sample
+        # is still outside the window, never reaching the newest one.
+        index = (self._head - self._count) % size
+        cutoff = now - self.window
+        for _ in range(self._count - 2):
+            following = (index + 1) % size
+            if times[following] > cutoff:
+                break
+            index = following
+        elapsed = now - times[index]
+        if elapsed <= 0:
+            return None
+        return (pulses - self._pulses[index]) / elapsed
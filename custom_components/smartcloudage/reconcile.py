@@ -0,0 +1,143 @@
+"""Incremental reconciliation of entities after an options change."""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.entity import Entity
+
+DOMAIN = "smartcloudage"
+
+## Platform callback receiving the old and new configuration of one
+## controller; either side is @c None when the controller was added or removed.
+DeviceReconciler = Callable[
+    [Mapping[str, Any] | None, Mapping[str, Any] | None], Awaitable[None]
+]
+
+
+## @brief Controllers added, removed or edited between two device lists.
+@dataclass
+class DeviceChanges:
+    """Difference between the old and new ``devices`` options."""
+
+    added: list[Mapping[str, Any]] = field(default_factory=list)
+    removed: list[Mapping[str, Any]] = field(default_factory=list)
+    changed: list[tuple[Mapping[str, Any], Mapping[str, Any]]] = field(
+        default_factory=list
+    )
+
+    def __bool__(self) -> bool:
+        """Return whether any controller changed."""
+        return bool(self.added or self.removed or self.changed)
+
+
+## @brief Indexes a device list by controller ID, keeping the first duplicate.
+#  @param devices Controller configurations.
+#  @return Mapping of controller ID to its configuration.
+def _by_device_id(
+    devices: Iterable[Mapping[str, Any]],
+) -> dict[str, Mapping[str, Any]]:
+    indexed: dict[str, Mapping[str, Any]] = {}
+    for device in devices:
+        device_id = device.get("device_id")
+        if device_id and device_id not in indexed:
+            indexed[device_id] = device
+    return indexed
+
+
+## @brief Compares two device lists by controller ID.
+#  @param old Controller configurations currently loaded.
+#  @param new Controller configurations saved by the options flow.
+#  @return Controllers to add, remove and update.
+def diff_devices(
+    old: Iterable[Mapping[str, Any]], new: Iterable[Mapping[str, Any]]
+) -> DeviceChanges:
+    """Return the controllers that differ between two device lists."""
+    old_devices = _by_device_id(old)
+    new_devices = _by_device_id(new)
+    changes = DeviceChanges()
+    for device_id, device in new_devices.items():
+        previous = old_devices.get(device_id)
+        if previous is None:
+            changes.added.append(device)
+        elif previous != device:
+            changes.changed.append((previous, device))
+    changes.removed.extend(
+        device
+        for device_id, device in old_devices.items()
+        if device_id not in new_devices
+    )
+    return changes
+
+
+## @brief Compares the meters of two versions of a controller by channel.
+#  @param old Previous controller configuration.
+#  @param new Updated controller configuration.
+#  @return Channels to remove and meters to create; an edited meter appears
+#          in both.
+def diff_meters(
+    old: Mapping[str, Any], new: Mapping[str, Any]
+) -> tuple[set[int], list[Mapping[str, Any]]]:
+    """Return the removed channels and the new or edited meters."""
+    old_meters = {int(meter["channel"]): meter for meter in old.get("meters", [])}
+    new_meters = {int(meter["channel"]): meter for meter in new.get("meters", [])}
+    removed = {
+        channel
+        for channel, meter in old_meters.items()
+        if new_meters.get(channel) != meter
+    }
+    added = [
+        meter
+        for channel, meter in new_meters.items()
+        if old_meters.get(channel) != meter
+    ]
+    return removed, added
+
+
+## @brief Returns whether any option other than the device list changed.
+#  @param old Options currently loaded.
+#  @param new Options saved by the options flow.
+#  @return @c True when the entry must be reloaded.
+def settings_changed(old: Mapping[str, Any], new: Mapping[str, Any]) -> bool:
+    """Return whether entry-wide settings differ."""
+    keys = (old.keys() | new.keys()) - {"devices"}
+    return any(old.get(key) != new.get(key) for key in keys)
+
+
+## @brief Removes entities from Home Assistant.
+#  @param hass Active Home Assistant instance.
+#  @param entities Entities to remove.
+#  @param purge Whether to delete their entity-registry entries as well;
+#         entities that will be recreated with the same unique ID keep them.
+async def async_remove_entities(
+    hass: HomeAssistant, entities: Iterable[Entity], *, purge: bool
+) -> None:
+    """Remove entities, optionally deleting their registry entries."""
+    registry = er.async_get(hass)
+    for entity in entities:
+        if not purge:
+            await entity.async_remove(force_remove=True)
+        elif registry.async_get(entity.entity_id) is not None:
+            # Removing the registry entry also removes the entity; an entry
+            # already deleted, e.g. by the options flow, removed it as well.
+            registry.async_remove(entity.entity_id)
+
+
+## @brief Detaches a removed controller's device from a configuration entry.
+#
+#  The device-registry entry is deleted once no other entry references it.
+#  @param hass Active Home Assistant instance.
+#  @param entry_id Configuration entry the controller was removed from.
+#  @param device_id Unique controller identifier.
+def async_remove_device_entry(
+    hass: HomeAssistant, entry_id: str, device_id: str
+) -> None:
+    """Remove the configuration entry from a controller's registry device."""
+    registry = dr.async_get(hass)
+    device = registry.async_get_device(identifiers={(DOMAIN, device_id)})
+    if device is not None:
+        registry.async_update_device(device.id, remove_config_entry_id=entry_id)
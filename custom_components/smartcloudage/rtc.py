@@ -0,0 +1,303 @@
+"""Fleet-wide RTC synchronization scheduling for SmartCloudAge controllers."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import datetime, timedelta
+import logging
+import time
+from typing import Any
+import zlib
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .decoder import TelemetryFrame
+from .stats import IntegrationStats
+
+_LOGGER = logging.getLogger(__name__)
+
+RTC_SYNC_SLOTS = 20
+RTC_MAX_CONCURRENCY = 16
+## Largest accepted clock error, in seconds, for a controller to count as stable.
+RTC_DRIFT_TOLERANCE = 2.0
+## Upper bound of the per-controller back-off, in sync intervals (5 min × 64 ≈ 5 h).
+RTC_MAX_INTERVAL_ROUNDS = 64
+WRITE = 1
+
+PublishCallback = Callable[[str, str], Awaitable[None]]
+
+
+## @brief Measures the clock error reported by a controller frame.
+#
+#  Accepts a @c datetime object in the RTC command format, at the top level or
+#  under @c payload, or a Unix @c timestamp. Echoes of the integration's own
+#  write commands are ignored.
+#  @param data Decoded MQTT telemetry.
+#  @return Controller clock minus local clock in seconds, or @c None.
+def controller_clock_drift(data: dict[str, Any]) -> float | None:
+    """Return the clock drift contained in a frame, if any."""
+    if "command" in data and data.get("type") == WRITE:
+        return None
+    clock = data.get("datetime")
+    if clock is None and isinstance(data.get("payload"), dict):
+        clock = data["payload"].get("datetime")
+    try:
+        if isinstance(clock, dict):
+            controller_time = datetime(
+                int(clock["year"]),
+                int(clock["mon"]),
+                int(clock["day"]),
+                int(clock["hour"]),
+                int(clock["min"]),
+                int(clock["sec"]),
+            )
+            return (controller_time - datetime.now()).total_seconds()
+        timestamp = data.get("timestamp")
+        if timestamp is not None and not isinstance(timestamp, bool):
+            return float(timestamp) - time.time()
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return None
+    return None
+
+
+## @brief Adaptive synchronization state of a single controller.
+class _ControllerClock:
+    """Back-off bookkeeping for one controller's RTC."""
+
+    __slots__ = ("drift", "interval_rounds", "observed", "rounds_left", "signature")
+
+    def __init__(self, signature: str) -> None:
+        ## @brief Starts with synchronization on every round.
+        #  @param signature Command signature expected by the controller.
+        self.signature = signature
+        self.interval_rounds = 1
+        self.rounds_left = 1
+        self.observed = False
+        self.drift: float | None = None
+
+
+## @brief Maps a controller to a stable slot of the synchronization interval.
+#  @param device_id Unique controller identifier.
+#  @param slots Number of slots the interval is divided into.
+#  @return Zero-based slot index, identical across restarts.
+def rtc_slot(device_id: str, slots: int) -> int:
+    """Return the deterministic jitter slot of a controller."""
+    return zlib.crc32(device_id.encode("utf-8")) % slots
+
+
+## @brief Spreads RTC synchronization of a fleet across the sync interval.
+#
+#  Each controller is visited once per interval on its jitter slot, but is only
+#  synchronized when its adaptive back-off has elapsed.
+class RtcSyncScheduler:
+    """Publish RTC commands slot by slot with bounded concurrency."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        devices: Iterable[tuple[str, str]],
+        publish: PublishCallback,
+        interval: timedelta,
+        *,
+        slots: int = RTC_SYNC_SLOTS,
+        max_concurrency: int = RTC_MAX_CONCURRENCY,
+        stats: IntegrationStats | None = None,
+    ) -> None:
+        ## @brief Assigns every controller to its jitter slot.
+        #  @param hass Active Home Assistant instance.
+        #  @param devices Pairs of controller ID and command signature.
+        #  @param publish Coroutine function sending the RTC command of one controller.
+        #  @param interval Period in which every controller is synchronized once.
+        #  @param slots Number of evenly spaced batches per interval.
+        #  @param max_concurrency Maximum number of simultaneous publishes.
+        #  @param stats Optional entry counters receiving the round duration.
+        self._hass = hass
+        self._stats = stats
+        self._publish = publish
+        self._interval = interval
+        self._max_concurrency = max_concurrency
+        self._clocks: dict[str, _ControllerClock] = {}
+        self._slots: list[list[str]] = [[] for _ in range(slots)]
+        for device_id, signature in devices:
+            self.async_add_device(device_id, signature)
+        self._next_slot = 0
+        self._round_elapsed = 0.0
+        self._round_count = 0
+        ## Publishing time of the last complete round, in seconds.
+        self.last_round_duration: float | None = None
+
+    ## @brief Starts the periodic slot timer.
+    #  @return Callback that stops the timer.
+    def async_start(self) -> CALLBACK_TYPE:
+        """Track one timer tick per slot of the interval."""
+        return async_track_time_interval(
+            self._hass, self._async_tick, self._interval / len(self._slots)
+        )
+
+    ## @brief Returns the identifiers of every scheduled controller.
+    #  @return Controller IDs known to the scheduler.
+    @property
+    def device_ids(self) -> Iterable[str]:
+        """Return the scheduled controllers."""
+        return self._clocks.keys()
+
+    ## @brief Schedules a controller on its jitter slot.
+    #
+    #  A controller added after startup is synchronized on its next slot.
+    #  @param device_id Unique controller identifier.
+    #  @param signature Command signature expected by the controller.
+    @callback
+    def async_add_device(self, device_id: str, signature: str) -> None:
+        """Start synchronizing a controller."""
+        if device_id in self._clocks:
+            self._clocks[device_id].signature = signature
+            return
+        self._clocks[device_id] = _ControllerClock(signature)
+        self._slots[rtc_slot(device_id, len(self._slots))].append(device_id)
+
+    ## @brief Stops synchronizing a controller.
+    #  @param device_id Unique controller identifier.
+    @callback
+    def async_remove_device(self, device_id: str) -> None:
+        """Remove a controller from its slot."""
+        if self._clocks.pop(device_id, None) is not None:
+            self._slots[rtc_slot(device_id, len(self._slots))].remove(device_id)
+
+    ## @brief Returns the current sync period of a controller.
+    #  @param device_id Unique controller identifier.
+    #  @return Period between two synchronizations of the controller.
+    def sync_interval(self, device_id: str) -> timedelta:
+        """Return the adaptive synchronization interval of a controller."""
+        return self._interval * self._clocks[device_id].interval_rounds
+
+    ## @brief Records the clock drift reported in a controller frame.
+    #
+    #  An error above @c RTC_DRIFT_TOLERANCE restores the base interval and
+    #  schedules a sync on the controller's next slot; smaller errors are kept
+    #  and evaluated when the controller is next due.
+    #  @param device_id Controller that produced the frame.
+    #  @param frame Normalized MQTT telemetry.
+    @callback
+    def async_frame_received(self, device_id: str, frame: TelemetryFrame) -> None:
+        """Track the observed drift of a controller's clock."""
+        clock = self._clocks.get(device_id)
+        if clock is None:
+            return
+        drift = controller_clock_drift(frame.data)
+        if drift is None:
+            return
+        clock.drift = drift
+        clock.observed = True
+        if abs(drift) > RTC_DRIFT_TOLERANCE and clock.interval_rounds > 1:
+            _LOGGER.debug(
+                "SmartCloudAge %s clock drifted %.1f s, restoring base RTC interval",
+                device_id,
+                drift,
+            )
+            clock.interval_rounds = 1
+            clock.rounds_left = 1
+
+    ## @brief Tightens synchronization after a controller restart.
+    #  @param device_id Controller whose uptime counter went backwards.
+    @callback
+    def async_device_restarted(self, device_id: str) -> None:
+        """Resynchronize a restarted controller on its next slot."""
+        clock = self._clocks.get(device_id)
+        if clock is None:
+            return
+        clock.interval_rounds = 1
+        clock.rounds_left = 1
+        clock.observed = False
+
+    ## @brief Synchronizes every controller at once, for example at startup.
+    async def async_sync_all(self) -> None:
+        """Run a complete synchronization round immediately."""
+        devices = list(self._clocks)
+        for clock in self._clocks.values():
+            clock.rounds_left = clock.interval_rounds
+            clock.observed = False
+        elapsed = await self._async_publish_batch(devices)
+        self._report_round(len(devices), elapsed)
+
+    ## @brief Publishes the due controllers assigned to the current slot.
+    #  @param _now Timestamp supplied by Home Assistant's interval tracker.
+    async def _async_tick(self, _now) -> None:
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % len(self._slots)
+        due = []
+        for device_id in self._slots[slot]:
+            clock = self._clocks.get(device_id)
+            if clock is None:
+                continue
+            if clock.rounds_left > 1:
+                clock.rounds_left -= 1
+                continue
+            self._adapt_interval(clock)
+            clock.rounds_left = clock.interval_rounds
+            due.append(device_id)
+        self._round_elapsed += await self._async_publish_batch(due)
+        self._round_count += len(due)
+        if self._next_slot == 0:
+            self._report_round(self._round_count, self._round_elapsed)
+            self._round_elapsed = 0.0
+            self._round_count = 0
+
+    ## @brief Adjusts a due controller's interval from the drift seen since its last sync.
+    #
+    #  A clock that stayed within @c RTC_DRIFT_TOLERANCE for a whole interval has
+    #  its interval doubled, up to @c RTC_MAX_INTERVAL_ROUNDS; a clock that
+    #  drifted further returns to the base interval. Controllers that never
+    #  report their clock keep their current interval.
+    #  @param clock Synchronization state of the due controller.
+    @staticmethod
+    def _adapt_interval(clock: _ControllerClock) -> None:
+        if clock.observed:
+            if abs(clock.drift) <= RTC_DRIFT_TOLERANCE:
+                clock.interval_rounds = min(
+                    clock.interval_rounds * 2, RTC_MAX_INTERVAL_ROUNDS
+                )
+            else:
+                clock.interval_rounds = 1
+        clock.observed = False
+
+    ## @brief Publishes a batch of RTC commands with bounded concurrency.
+    #  @param devices Identifiers of the controllers to synchronize.
+    #  @return Time spent publishing the batch, in seconds.
+    async def _async_publish_batch(self, devices: list[str]) -> float:
+        if not devices:
+            return 0.0
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def publish_one(device_id: str) -> None:
+            async with semaphore:
+                # The controller may have been removed while waiting its turn.
+                clock = self._clocks.get(device_id)
+                if clock is not None:
+                    await self._publish(device_id, clock.signature)
+
+        results = await asyncio.gather(
+            *(publish_one(device_id) for device_id in devices),
+            return_exceptions=True,
+        )
+        for device_id, result in zip(devices, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning(
+                    "SmartCloudAge RTC sync failed for %s: %s", device_id, result
+                )
+        return time.monotonic() - started
+
+    ## @brief Records and logs the duration of a completed round.
+    #  @param count Number of controllers in the round.
+    #  @param elapsed Publishing time of the round, in seconds.
+    def _report_round(self, count: int, elapsed: float) -> None:
+        self.last_round_duration = elapsed
+        if self._stats is not None:
+            self._stats.rtc_round_duration = elapsed
+        _LOGGER.debug(
+            "SmartCloudAge RTC sync round for %d controllers took %.3f s",
+            count,
+            elapsed,
+        )
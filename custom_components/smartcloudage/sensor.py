@@ -2,13 +2,40 @@
 
 from __future__ import annotations
 
-import json
+from collections.abc import Callable
 import logging
+import time
 from typing import Any
 
-from homeassistant.components import mqtt
 from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
-from homeassistant.const import EntityCategory, UnitOfEnergy, UnitOfTime, UnitOfVolume
+from homeassistant.const import (
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfTime,
+    UnitOfVolume,
+    UnitOfVolumeFlowRate,
+)
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceEntryType
+
+from .controller import ControllerState
+from .decoder import TelemetryFrame
+from .log_limiter import LogLimiter
+from .rate import CONF_RATE_WINDOW, DEFAULT_RATE_WINDOW, PulseRate
+from .reconcile import async_remove_entities, diff_meters
+from .stats import IntegrationStats
+from .write_policy import (
+    CONF_RATE_DEADBAND,
+    CONF_RSSI_DEADBAND,
+    CONF_UPTIME_DEADBAND,
+    DEFAULT_RATE_DEADBAND,
+    DEFAULT_RSSI_DEADBAND,
+    DEFAULT_UPTIME_DEADBAND,
+    WritePolicy,
+    WriteThrottle,
+    write_policy_from_options,
+)
 
 DOMAIN = "smartcloudage"
 _LOGGER = logging.getLogger(__name__)
@@ -25,9 +52,86 @@ NATIVE_UNITS = {
     "energy": UnitOfEnergy.KILO_WATT_HOUR,
 }
 
+## Rate exposed for each meter type: name suffix, device class, unit and the
+## multiplier converting (pulses × factor) per second to that unit.
+RATE_KINDS = {
+    "water": (
+        "Vazão",
+        SensorDeviceClass.VOLUME_FLOW_RATE,
+        UnitOfVolumeFlowRate.LITERS_PER_MINUTE,
+        1000 * 60,
+    ),
+    "gas": (
+        "Vazão",
+        SensorDeviceClass.VOLUME_FLOW_RATE,
+        UnitOfVolumeFlowRate.LITERS_PER_MINUTE,
+        1000 * 60,
+    ),
+    "energy": ("Potência", SensorDeviceClass.POWER, UnitOfPower.KILO_WATT, 3600),
+}
+
 RSSI_WARNING_DBM = -75
 RSSI_CRITICAL_DBM = -85
 
+## Entry counters exposed as optional diagnostic sensors:
+## attribute, name, unit and state class.
+STATS_SENSORS = (
+    ("frames_received", "Mensagens recebidas", None, SensorStateClass.TOTAL_INCREASING),
+    ("frames_decoded", "Mensagens decodificadas", None, SensorStateClass.TOTAL_INCREASING),
+    (
+        "frames_unknown_device",
+        "Mensagens de controladoras desconhecidas",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+    ),
+    ("frames_invalid", "Mensagens inválidas", None, SensorStateClass.TOTAL_INCREASING),
+    (
+        "frames_duplicate",
+        "Mensagens duplicadas",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+    ),
+    (
+        "frames_coalesced",
+        "Mensagens substituídas na fila",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+    ),
+    (
+        "frames_dropped",
+        "Mensagens descartadas na fila",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+    ),
+    ("state_writes", "Gravações de estado", None, SensorStateClass.TOTAL_INCREASING),
+    (
+        "state_writes_suppressed",
+        "Gravações de estado suprimidas",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+    ),
+    (
+        "publish_latency_ms",
+        "Latência média de publicação",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+    ),
+    (
+        "publish_latency_max_ms",
+        "Latência máxima de publicação",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+    ),
+    (
+        "rtc_round_duration",
+        "Duração da sincronização RTC",
+        UnitOfTime.SECONDS,
+        SensorStateClass.MEASUREMENT,
+    ),
+    ("commands_retried", "Comandos reenviados", None, SensorStateClass.TOTAL_INCREASING),
+    ("commands_expired", "Comandos expirados", None, SensorStateClass.TOTAL_INCREASING),
+)
+
 
 ## @brief Classifies a Wi-Fi RSSI measurement.
 #  @param rssi Received signal strength in dBm.
@@ -43,97 +147,218 @@ def classify_rssi(rssi: int) -> str:
     return "good"
 
 
-## @brief Finds the first numeric telemetry value under a known firmware key.
-#  @param data Decoded MQTT payload.
-#  @param keys Candidate keys in priority order.
-#  @return Parsed numeric value, or @c None when no valid value exists.
-def _first_numeric(data: dict[str, Any], keys: tuple[str, ...]) -> float | None:
-    """Return the first numeric telemetry value matching any known firmware key."""
-    for key in keys:
-        value = data.get(key)
-        if value is None or isinstance(value, bool):
-            continue
-        try:
-            return float(value)
-        except (TypeError, ValueError):
-            continue
-    return None
+## Attributes of the RSSI sensor for each signal quality, built once.
+_RSSI_ATTRIBUTES = {
+    quality: {
+        "signal_quality": quality,
+        "alarm": quality in {"poor", "critical"},
+        "warning_threshold_dbm": RSSI_WARNING_DBM,
+        "critical_threshold_dbm": RSSI_CRITICAL_DBM,
+    }
+    for quality in (None, "good", "fair", "poor", "critical")
+}
 
 
 ## @brief Creates pulse-counter and diagnostic sensor entities.
+#
+#  The platform registers a reconciler in @c entry.runtime_data so that an
+#  options change only adds, replaces or removes the sensors of the edited
+#  controllers and meters.
 #  @param hass Active Home Assistant instance.
 #  @param entry SmartCloudAge configuration entry.
 #  @param async_add_entities Callback used to register entities.
 async def async_setup_entry(hass, entry, async_add_entities):
     """Create configured pulse counter entities."""
     devices = entry.options.get("devices", entry.data.get("devices", []))
-    entities_by_device: dict[str, dict[int, SmartCloudAgePulseSensor]] = {}
+    entities_by_device: dict[
+        str,
+        dict[int, tuple[SmartCloudAgePulseSensor, SmartCloudAgeRateSensor | None]],
+    ] = {}
     diagnostics_by_device: dict[
         str, tuple[SmartCloudAgeRSSISensor, SmartCloudAgeUptimeSensor]
     ] = {}
-    entities = []
-
+    pulse_policy = write_policy_from_options(entry.options)
+    rssi_policy = write_policy_from_options(
+        entry.options, CONF_RSSI_DEADBAND, DEFAULT_RSSI_DEADBAND
+    )
+    uptime_policy = write_policy_from_options(
+        entry.options, CONF_UPTIME_DEADBAND, DEFAULT_UPTIME_DEADBAND
+    )
+    rate_policy = write_policy_from_options(
+        entry.options, CONF_RATE_DEADBAND, DEFAULT_RATE_DEADBAND
+    )
+    rate_window = entry.options.get(CONF_RATE_WINDOW, DEFAULT_RATE_WINDOW)
+
+    rtc = entry.runtime_data.rtc
+    availability = entry.runtime_data.availability
+    stats = entry.runtime_data.stats
+    controllers = entry.runtime_data.controllers
+    pulse_store = entry.runtime_data.pulse_store
+    dispatcher = entry.runtime_data.dispatcher
+
+    ## @brief Builds the pulse and rate sensors of the given meters.
+    #  @param controller Shared state of the controller.
+    #  @param meters Pulse meter settings.
+    #  @param channel_entities Channel table of the controller, updated in place.
+    #  @return New entities.
+    def create_meters(
+        controller: ControllerState,
+        meters: list[dict[str, Any]],
+        channel_entities: dict[
+            int, tuple[SmartCloudAgePulseSensor, SmartCloudAgeRateSensor | None]
+        ],
+    ) -> list[SensorEntity]:
+        entities: list[SensorEntity] = []
+        for meter in meters:
+            channel = int(meter["channel"])
+            entity = SmartCloudAgePulseSensor(controller, meter, pulse_policy, stats)
+            entities.append(entity)
+            rate_entity = None
+            if rate_window:
+                rate_entity = SmartCloudAgeRateSensor(
+                    controller, meter, rate_window, rate_policy, stats
+                )
+                entities.append(rate_entity)
+            channel_entities[channel] = (entity, rate_entity)
+        return entities
+
+    ## @brief Builds every sensor of a controller and indexes it for routing.
+    #  @param device Controller configuration.
+    #  @return New entities.
+    def create_device(device: dict[str, Any]) -> list[SensorEntity]:
+        controller = controllers[device["device_id"]]
+        rssi_entity = SmartCloudAgeRSSISensor(controller, rssi_policy, stats)
+        uptime_entity = SmartCloudAgeUptimeSensor(
+            controller,
+            uptime_policy,
+            on_restart=rtc.async_device_restarted,
+            stats=stats,
+        )
+        diagnostics_by_device[controller.device_id] = (rssi_entity, uptime_entity)
+        channel_entities = entities_by_device[controller.device_id] = {}
+        return [
+            rssi_entity,
+            uptime_entity,
+            *create_meters(controller, device.get("meters", []), channel_entities),
+        ]
+
+    ## @brief Returns every sensor currently created for a controller.
+    #  @param device_id Unique controller identifier.
+    #  @return Diagnostic, pulse and rate entities.
+    def device_entities(device_id: str) -> list[SensorEntity]:
+        entities: list[SensorEntity] = list(diagnostics_by_device.get(device_id, ()))
+        for channel_entities in entities_by_device.get(device_id, {}).values():
+            entities.extend(entity for entity in channel_entities if entity is not None)
+        return entities
+
+    ## @brief Routes the frames of a controller to its sensors.
+    #  @param device_id Unique controller identifier.
+    def register_handlers(device_id: str) -> None:
+        dispatcher.async_register_diagnostic_handler(device_id, diagnostics_received)
+        dispatcher.async_register_pulse_handler(device_id, pulses_received)
+
+    ## @brief Applies a controller configuration change to its sensors.
+    #
+    #  New entities replace the old ones in the routing tables before the old
+    #  ones are removed, so frames never reach a removed entity. Sensors that
+    #  keep their unique ID keep their entity-registry entry.
+    #  @param old Previous controller configuration, or @c None when added.
+    #  @param new Updated controller configuration, or @c None when removed.
+    async def async_reconcile_device(old, new) -> None:
+        """Add, replace or remove only the sensors affected by the change."""
+        if old is None:
+            async_add_entities(create_device(new))
+            register_handlers(new["device_id"])
+            return
+        device_id = old["device_id"]
+        if new is None:
+            entities = device_entities(device_id)
+            entities_by_device.pop(device_id, None)
+            diagnostics_by_device.pop(device_id, None)
+            await async_remove_entities(hass, entities, purge=True)
+            return
+        if old.get("alias") != new.get("alias"):
+            # Default names derive from the alias: rebuild the whole device.
+            entities = device_entities(device_id)
+            created = create_device(new)
+            await async_remove_entities(hass, entities, purge=False)
+            async_add_entities(created)
+            return
+        channel_entities = entities_by_device[device_id]
+        removed, added = diff_meters(old, new)
+        replaced = {int(meter["channel"]) for meter in added}
+        stale = {
+            channel: channel_entities.pop(channel)
+            for channel in removed
+            if channel in channel_entities
+        }
+        created = create_meters(controllers[device_id], added, channel_entities)
+        for channel, entities in stale.items():
+            await async_remove_entities(
+                hass,
+                [entity for entity in entities if entity is not None],
+                purge=channel not in replaced,
+            )
+        async_add_entities(created)
+
+    ## @brief Writes the sensors of controllers whose availability changed.
+    #  @param device_ids Controllers of one availability batch.
+    @callback
+    def availability_changed(device_ids: list[str]) -> None:
+        for device_id in device_ids:
+            for entity in device_entities(device_id):
+                entity.async_write_ha_state()
+                stats.state_writes += 1
+
+    ## @brief Updates RSSI and uptime diagnostics from any controller frame.
+    #  @param device_id Controller that produced the frame.
+    #  @param frame Normalized MQTT telemetry.
+    @callback
+    def diagnostics_received(device_id: str, frame: TelemetryFrame) -> None:
+        rssi_entity, uptime_entity = diagnostics_by_device[device_id]
+        if frame.rssi is not None:
+            rssi_entity.update_rssi(round(frame.rssi))
+        if frame.uptime is not None and frame.uptime >= 0:
+            uptime_entity.update_uptime(round(frame.uptime))
+        pulse_store.async_schedule_save()
+
+    ## @brief Updates pulse meters from a @c PULSE_SENSOR frame.
+    #  @param device_id Controller that produced the frame.
+    #  @param frame Normalized MQTT telemetry.
+    @callback
+    def pulses_received(device_id: str, frame: TelemetryFrame) -> None:
+        configured = entities_by_device[device_id]
+        if not configured:
+            return
+        now = time.monotonic()
+        for channel, raw_pulses in frame.pulses:
+            channel_entities = configured.get(channel)
+            if channel_entities is None:
+                continue
+            entity, rate_entity = channel_entities
+            pulses = entity.update_pulses(raw_pulses)
+            # Rate entities are disabled by default and stay detached until
+            # enabled in the entity registry.
+            if rate_entity is not None and rate_entity.hass is not None:
+                rate_entity.update_rate(pulses, now)
+        pulse_store.async_schedule_save()
+
+    entities: list[SensorEntity] = []
     for device in devices:
         device_id = device.get("device_id")
-        alias = device.get("alias") or device_id
-        if not device_id:
+        if not device_id or device_id in entities_by_device:
             continue
-        channel_entities = entities_by_device.setdefault(device_id, {})
-        rssi_entity = SmartCloudAgeRSSISensor(device_id, alias)
-        uptime_entity = SmartCloudAgeUptimeSensor(device_id, alias)
-        diagnostics_by_device[device_id] = (rssi_entity, uptime_entity)
-        entities.extend((rssi_entity, uptime_entity))
-        for meter in device.get("meters", []):
-            channel = int(meter["channel"])
-            entity = SmartCloudAgePulseSensor(device_id, alias, meter)
-            channel_entities[channel] = entity
-            entities.append(entity)
-
+        entities.extend(create_device(device))
+    entities.extend(
+        SmartCloudAgeStatsSensor(entry.entry_id, entry.title, stats, *description)
+        for description in STATS_SENSORS
+    )
     async_add_entities(entities)
 
-    ## @brief Processes telemetry received from a configured MQTT controller.
-    #  @param msg MQTT message containing JSON telemetry.
-    async def message_received(msg):
-        try:
-            raw = msg.payload.decode("utf-8") if isinstance(msg.payload, bytes) else msg.payload
-            data = json.loads(raw)
-
-            device_id = data.get("device") or msg.topic.split("/")[1]
-            configured = entities_by_device.get(device_id)
-            if not configured:
-                return
-
-            rssi_entity, uptime_entity = diagnostics_by_device[device_id]
-            rssi = _first_numeric(data, ("Wifi_db", "wifi_db", "RSSI", "rssi"))
-            if rssi is not None:
-                rssi_entity.update_rssi(round(rssi))
-
-            uptime = _first_numeric(data, ("uptime", "Uptime", "UPTIME"))
-            if uptime is not None and uptime >= 0:
-                uptime_entity.update_uptime(round(uptime))
-
-            if str(data.get("message", "")).upper() != "PULSE_SENSOR":
-                return
-
-            for pulse in data.get("Pulses", []):
-                channel = int(pulse.get("Sensor", 0))
-                entity = configured.get(channel)
-                if entity is None:
-                    continue
-                lsb = int(pulse.get("lsb", 0)) & 0xFFFF
-                msb = int(pulse.get("msb", 0)) & 0xFFFF
-                entity.update_pulses((msb << 16) | lsb)
-        except (KeyError, TypeError, ValueError, json.JSONDecodeError) as err:
-            _LOGGER.warning("Invalid SmartCloudAge pulse payload on %s: %s", msg.topic, err)
-
     for device_id in entities_by_device:
-        unsubscribe = await mqtt.async_subscribe(
-            hass,
-            f"CloudAge/{device_id}/OutTopic/#",
-            message_received,
-            0,
-        )
-        entry.async_on_unload(unsubscribe)
+        register_handlers(device_id)
+    entry.runtime_data.reconcilers.append(async_reconcile_device)
+    entry.async_on_unload(availability.async_add_listener(availability_changed))
 
 
 ## @brief Base class for controller diagnostic sensors.
@@ -142,24 +367,32 @@ class SmartCloudAgeDiagnosticSensor(SensorEntity):
 
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_should_poll = False
-
-    def __init__(self, device_id: str, alias: str) -> None:
-        ## @brief Initializes the controller identity and empty sensor state.
-        #  @param device_id Unique controller identifier.
-        #  @param alias Human-readable controller name.
-        self._device_id = device_id
-        self._alias = alias
-        self._attr_native_value = None
+    _default_write_policy = WritePolicy()
+
+    def __init__(
+        self,
+        controller: ControllerState,
+        write_policy: WritePolicy | None = None,
+        stats: IntegrationStats | None = None,
+    ) -> None:
+        ## @brief Binds the sensor to its controller state record.
+        #  @param controller Shared state of the controller.
+        #  @param write_policy Rules deciding which updates reach the state machine.
+        #  @param stats Optional entry counters of issued and suppressed writes.
+        self._controller = controller
+        self._write_throttle = WriteThrottle(
+            write_policy or self._default_write_policy, stats
+        )
 
     @property
     def device_info(self):
         """Link the diagnostic sensor to its controller."""
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": f"SmartCloudAge {self._alias}",
-            "manufacturer": "SmartCloudAge",
-            "model": "MQTT Controller",
-        }
+        return self._controller.device_info
+
+    @property
+    def available(self):
+        """Return whether the controller is still reporting."""
+        return self._controller.available
 
 
 ## @brief Reports Wi-Fi strength and transition-based signal alarms.
@@ -169,56 +402,92 @@ class SmartCloudAgeRSSISensor(SmartCloudAgeDiagnosticSensor):
     _attr_device_class = SensorDeviceClass.SIGNAL_STRENGTH
     _attr_native_unit_of_measurement = "dBm"
     _attr_state_class = SensorStateClass.MEASUREMENT
-
-    def __init__(self, device_id: str, alias: str) -> None:
+    _default_write_policy = WritePolicy(deadband=DEFAULT_RSSI_DEADBAND)
+
+    def __init__(
+        self,
+        controller: ControllerState,
+        write_policy: WritePolicy | None = None,
+        stats: IntegrationStats | None = None,
+    ) -> None:
         ## @brief Initializes a controller Wi-Fi signal sensor.
-        #  @param device_id Unique controller identifier.
-        #  @param alias Human-readable controller name.
-        super().__init__(device_id, alias)
-        self._attr_name = f"{alias} Sinal Wi-Fi"
-        self._attr_unique_id = f"smartcloudage_{device_id}_wifi_rssi"
-        self._quality = None
+        #  @param controller Shared state of the controller.
+        #  @param write_policy Rules deciding which updates reach the state machine.
+        #  @param stats Optional entry counters of issued and suppressed writes.
+        super().__init__(controller, write_policy, stats)
+        self._attr_name = f"{controller.alias} Sinal Wi-Fi"
+        self._attr_unique_id = f"smartcloudage_{controller.device_id}_wifi_rssi"
+        # A value restored from the snapshot is shown without a new alarm.
+        self._quality = (
+            None if controller.rssi is None else classify_rssi(controller.rssi)
+        )
+        self._write_throttle.prime(controller.rssi)
+        # A flapping signal logs each kind of transition once per window.
+        self._log = LogLimiter(_LOGGER)
+
+    @property
+    def native_value(self):
+        """Return the last RSSI of the controller."""
+        return self._controller.rssi
 
     @property
     def extra_state_attributes(self):
         """Expose the quality and alarm thresholds."""
-        return {
-            "signal_quality": self._quality,
-            "alarm": self._quality in {"poor", "critical"},
-            "warning_threshold_dbm": RSSI_WARNING_DBM,
-            "critical_threshold_dbm": RSSI_CRITICAL_DBM,
-        }
+        return _RSSI_ATTRIBUTES[self._quality]
+
+    ## @brief Cancels the pending log summaries of the sensor.
+    async def async_will_remove_from_hass(self) -> None:
+        """Drop rate-limited log windows when the entity is removed."""
+        self._log.clear()
 
     ## @brief Updates RSSI state and logs signal-quality transitions.
+    #
+    #  The state is written when the quality changes, when the value leaves the
+    #  configured deadband or when the heartbeat interval has elapsed. Repeated
+    #  transitions of a flapping signal are summarized by the log limiter.
     #  @param rssi New received signal strength in dBm.
     def update_rssi(self, rssi: int) -> None:
         """Update RSSI and log only signal quality transitions."""
         previous_quality = self._quality
-        self._attr_native_value = rssi
+        self._controller.rssi = rssi
         self._quality = classify_rssi(rssi)
 
         if self._quality != previous_quality:
+            device_id = self._controller.device_id
+            alias = self._controller.alias
             if self._quality == "critical":
-                _LOGGER.error(
+                self._log.log(
+                    logging.ERROR,
+                    device_id,
+                    "critical signal",
                     "SmartCloudAge %s Wi-Fi signal is critical: %d dBm",
-                    self._alias,
+                    alias,
                     rssi,
                 )
             elif self._quality == "poor":
-                _LOGGER.warning(
+                self._log.log(
+                    logging.WARNING,
+                    device_id,
+                    "poor signal",
                     "SmartCloudAge %s Wi-Fi signal is poor: %d dBm",
-                    self._alias,
+                    alias,
                     rssi,
                 )
             elif previous_quality in {"poor", "critical"}:
-                _LOGGER.info(
+                self._log.log(
+                    logging.INFO,
+                    device_id,
+                    "signal recovery",
                     "SmartCloudAge %s Wi-Fi signal recovered: %d dBm (%s)",
-                    self._alias,
+                    alias,
                     rssi,
                     self._quality,
                 )
 
-        self.async_write_ha_state()
+        if self._write_throttle.should_write(
+            rssi, force=self._quality != previous_quality
+        ):
+            self.async_write_ha_state()
 
 
 ## @brief Reports controller uptime and detects counter regressions.
@@ -228,29 +497,55 @@ class SmartCloudAgeUptimeSensor(SmartCloudAgeDiagnosticSensor):
     _attr_device_class = SensorDeviceClass.DURATION
     _attr_native_unit_of_measurement = UnitOfTime.SECONDS
     _attr_suggested_unit_of_measurement = UnitOfTime.HOURS
-
-    def __init__(self, device_id: str, alias: str) -> None:
+    _default_write_policy = WritePolicy(deadband=DEFAULT_UPTIME_DEADBAND)
+
+    def __init__(
+        self,
+        controller: ControllerState,
+        write_policy: WritePolicy | None = None,
+        on_restart: Callable[[str], None] | None = None,
+        stats: IntegrationStats | None = None,
+    ) -> None:
         ## @brief Initializes a controller uptime sensor.
-        #  @param device_id Unique controller identifier.
-        #  @param alias Human-readable controller name.
-        super().__init__(device_id, alias)
-        self._attr_name = f"{alias} Uptime"
-        self._attr_unique_id = f"smartcloudage_{device_id}_uptime"
+        #  @param controller Shared state of the controller.
+        #  @param write_policy Rules deciding which updates reach the state machine.
+        #  @param on_restart Optional callback invoked with the controller ID when
+        #         a restart is detected.
+        #  @param stats Optional entry counters of issued and suppressed writes.
+        super().__init__(controller, write_policy, stats)
+        self._on_restart = on_restart
+        self._attr_name = f"{controller.alias} Uptime"
+        self._attr_unique_id = f"smartcloudage_{controller.device_id}_uptime"
+        self._write_throttle.prime(controller.uptime)
+
+    @property
+    def native_value(self):
+        """Return the last uptime of the controller."""
+        return self._controller.uptime
 
     ## @brief Updates uptime and reports a probable controller restart.
+    #
+    #  Regular increments are written at the granularity of the configured
+    #  deadband; a restart is always written immediately.
     #  @param uptime New controller uptime in seconds.
     def update_uptime(self, uptime: int) -> None:
         """Update uptime and report a controller restart."""
-        previous_uptime = self._attr_native_value
-        if previous_uptime is not None and uptime < previous_uptime:
+        controller = self._controller
+        previous_uptime = controller.uptime
+        restarted = previous_uptime is not None and uptime < previous_uptime
+        if restarted:
             _LOGGER.warning(
                 "SmartCloudAge %s restarted: uptime dropped from %d to %d seconds",
-                self._alias,
+                controller.alias,
                 previous_uptime,
                 uptime,
             )
-        self._attr_native_value = uptime
-        self.async_write_ha_state()
+            controller.mark_restarted()
+            if self._on_restart is not None:
+                self._on_restart(controller.device_id)
+        controller.uptime = uptime
+        if self._write_throttle.should_write(uptime, force=restarted):
+            self.async_write_ha_state()
 
 
 ## @brief Exposes an accumulated pulse counter as a native HA sensor.
@@ -261,52 +556,191 @@ class SmartCloudAgePulseSensor(SensorEntity):
     _attr_suggested_display_precision = 3
     _attr_should_poll = False
 
-    def __init__(self, device_id: str, alias: str, meter: dict[str, Any]) -> None:
+    def __init__(
+        self,
+        controller: ControllerState,
+        meter: dict[str, Any],
+        write_policy: WritePolicy | None = None,
+        stats: IntegrationStats | None = None,
+    ) -> None:
         ## @brief Initializes conversion and identity settings for a pulse meter.
-        #  @param device_id Unique controller identifier.
-        #  @param alias Human-readable controller name.
+        #  @param controller Shared state of the controller.
         #  @param meter Pulse channel, factor, offset, type, unit and name settings.
-        self._device_id = device_id
+        #  @param write_policy Rules deciding which updates reach the state machine.
+        #  @param stats Optional entry counters of issued and suppressed writes.
+        self._controller = controller
         self._channel = int(meter["channel"])
         self._factor = float(meter.get("factor", 1.0))
         self._offset = float(meter.get("offset", 0.0))
         meter_type = meter.get("type")
-        self._attr_name = meter.get("name") or f"{alias} Sensor {self._channel}"
-        self._attr_unique_id = f"smartcloudage_{device_id}_pulse_{self._channel}"
+        self._attr_name = meter.get("name") or f"{controller.alias} Sensor {self._channel}"
+        self._attr_unique_id = (
+            f"smartcloudage_{controller.device_id}_pulse_{self._channel}"
+        )
         self._attr_native_unit_of_measurement = NATIVE_UNITS.get(
             meter_type, meter.get("unit") or "pulses"
         )
         self._attr_device_class = DEVICE_CLASSES.get(meter_type)
-        self._attr_native_value = None
-        self._raw_pulses = None
-        self._alias = alias
-
-    @property
-    def extra_state_attributes(self):
-        """Expose the raw counter and conversion settings."""
-        return {
-            "raw_pulses": self._raw_pulses,
+        # Only the counters change; the dictionary is reused for every write.
+        self._attributes = {
+            "raw_pulses": None,
+            "accumulated_pulses": None,
             "pulse_factor": self._factor,
             "offset": self._offset,
             "channel": self._channel,
         }
+        self._write_throttle = WriteThrottle(write_policy or WritePolicy(), stats)
+        self._write_throttle.prime(controller.pulse(self._channel))
+
+    @property
+    def native_value(self):
+        """Return the converted total of the channel."""
+        pulses = self._controller.pulse(self._channel)
+        if pulses is None:
+            return None
+        return round(pulses * self._factor + self._offset, 9)
+
+    @property
+    def extra_state_attributes(self):
+        """Expose the raw and accumulated counters and conversion settings."""
+        self._attributes["raw_pulses"] = self._controller.raw_pulse(self._channel)
+        self._attributes["accumulated_pulses"] = self._controller.pulse(self._channel)
+        return self._attributes
 
     @property
     def device_info(self):
         """Link the sensor to its SmartCloudAge controller."""
+        return self._controller.device_info
+
+    @property
+    def available(self):
+        """Return whether the controller is still reporting."""
+        return self._controller.available
+
+    ## @brief Accumulates and publishes a new firmware pulse counter.
+    #
+    #  Wraparounds and reboot resets of the 32-bit firmware counter are folded
+    #  into a 64-bit accumulator, so the total never decreases.
+    #  @param raw_pulses Unsigned 32-bit pulse counter received from firmware.
+    #  @return Accumulated pulse count of the channel.
+    def update_pulses(self, raw_pulses: int) -> int:
+        """Accumulate the raw counter and update HA when the policy allows it."""
+        pulses = self._controller.set_pulse(self._channel, raw_pulses)
+        if self._write_throttle.should_write(pulses):
+            self.async_write_ha_state()
+        return pulses
+
+
+## @brief Exposes the instantaneous flow or power of a pulse meter.
+class SmartCloudAgeRateSensor(SensorEntity):
+    """Smoothed rate computed from the pulse deltas of one channel."""
+
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 2
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        controller: ControllerState,
+        meter: dict[str, Any],
+        window: float,
+        write_policy: WritePolicy | None = None,
+        stats: IntegrationStats | None = None,
+    ) -> None:
+        ## @brief Initializes the rate conversion of a pulse meter.
+        #  @param controller Shared state of the controller.
+        #  @param meter Pulse channel, factor, type, unit and name settings.
+        #  @param window Smoothing window in seconds.
+        #  @param write_policy Rules deciding which updates reach the state machine;
+        #         its deadband is expressed in the rate unit.
+        #  @param stats Optional entry counters of issued and suppressed writes.
+        self._controller = controller
+        channel = int(meter["channel"])
+        meter_type = meter.get("type")
+        unit = meter.get("unit") or "pulses"
+        label, device_class, rate_unit, multiplier = RATE_KINDS.get(
+            meter_type, ("Taxa", None, f"{unit}/min", 60)
+        )
+        name = meter.get("name") or f"{controller.alias} Sensor {channel}"
+        self._attr_name = f"{name} {label}"
+        self._attr_unique_id = f"smartcloudage_{controller.device_id}_rate_{channel}"
+        self._attr_device_class = device_class
+        self._attr_native_unit_of_measurement = rate_unit
+        self._attr_native_value = None
+        self._scale = float(meter.get("factor", 1.0)) * multiplier
+        self._rate = PulseRate(window)
+        self._write_throttle = WriteThrottle(write_policy or WritePolicy(), stats)
+
+    @property
+    def device_info(self):
+        """Link the sensor to its SmartCloudAge controller."""
+        return self._controller.device_info
+
+    @property
+    def available(self):
+        """Return whether the controller is still reporting."""
+        return self._controller.available
+
+    ## @brief Adds a pulse sample and publishes the smoothed rate.
+    #  @param pulses Accumulated pulse count of the channel.
+    #  @param now Monotonic timestamp of the frame, in seconds.
+    def update_rate(self, pulses: int, now: float) -> None:
+        """Update the rate and write it when it leaves the deadband."""
+        rate = self._rate.add(pulses, now)
+        if rate is None:
+            return
+        self._attr_native_value = round(rate * self._scale, 3)
+        if self._write_throttle.should_write(self._attr_native_value):
+            self.async_write_ha_state()
+
+
+## @brief Exposes one hot-path counter of a configuration entry.
+class SmartCloudAgeStatsSensor(SensorEntity):
+    """Integration counter polled from the in-process entry statistics."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        entry_id: str,
+        title: str,
+        stats: IntegrationStats,
+        key: str,
+        name: str,
+        unit: str | None,
+        state_class: SensorStateClass,
+    ) -> None:
+        ## @brief Binds the sensor to one attribute of the entry statistics.
+        #  @param entry_id Configuration entry identifier.
+        #  @param title Configuration entry title.
+        #  @param stats Entry counters read on every poll.
+        #  @param key Attribute of @p stats exposed by the sensor.
+        #  @param name Human-readable entity name.
+        #  @param unit Unit of measurement, if any.
+        #  @param state_class Home Assistant state class.
+        self._entry_id = entry_id
+        self._title = title
+        self._stats = stats
+        self._key = key
+        self._attr_name = f"SmartCloudAge {name}"
+        self._attr_unique_id = f"smartcloudage_{entry_id}_{key}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+
+    @property
+    def native_value(self):
+        """Return the current counter value."""
+        return getattr(self._stats, self._key)
+
+    @property
+    def device_info(self):
+        """Group the counters under a service device of the entry."""
         return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": f"SmartCloudAge {self._alias}",
+            "identifiers": {(DOMAIN, self._entry_id)},
+            "name": f"SmartCloudAge {self._title}",
             "manufacturer": "SmartCloudAge",
-            "model": "MQTT Controller",
+            "model": "Integração MQTT",
+            "entry_type": DeviceEntryType.SERVICE,
         }
-
-    ## @brief Converts and publishes a new accumulated pulse count.
-    #  @param raw_pulses Unsigned accumulated pulse value received from firmware.
-    def update_pulses(self, raw_pulses: int) -> None:
-        """Apply the configured conversion factor and update HA."""
-        self._raw_pulses = raw_pulses
-        self._attr_native_value = round(
-            raw_pulses * self._factor + self._offset, 9
-        )
-        self.async_write_ha_state()
@@ -0,0 +1,148 @@
+"""Service actions of the SmartCloudAge integration."""
+
+from __future__ import annotations
+
+from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntryState
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+
+from .bulk_import import (
+    IMPORT_FORMATS,
+    BulkImportError,
+    configured_device_ids,
+    merge_devices,
+    parse_devices,
+)
+
+DOMAIN = "smartcloudage"
+SERVICE_SET_OUTPUTS = "set_outputs"
+SERVICE_IMPORT_DEVICES = "import_devices"
+
+ATTR_DEVICE_ID = "device_id"
+ATTR_MASK = "mask"
+ATTR_OUTPUTS = "outputs"
+ATTR_STATE = "state"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_DEVICES = "devices"
+ATTR_FORMAT = "format"
+ATTR_TITLE = "title"
+
+SET_OUTPUTS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(ATTR_DEVICE_ID): cv.string,
+            vol.Exclusive(ATTR_MASK, "outputs"): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=0xFFFF)
+            ),
+            vol.Exclusive(ATTR_OUTPUTS, "outputs"): vol.All(
+                cv.ensure_list, [vol.All(vol.Coerce(int), vol.Range(min=1, max=16))]
+            ),
+            vol.Optional(ATTR_STATE, default=True): cv.boolean,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_MASK, ATTR_OUTPUTS),
+)
+
+IMPORT_DEVICES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICES): cv.string,
+        vol.Required(ATTR_FORMAT): vol.In(IMPORT_FORMATS),
+        vol.Exclusive(ATTR_CONFIG_ENTRY_ID, "target"): cv.string,
+        vol.Exclusive(ATTR_TITLE, "target"): cv.string,
+    }
+)
+
+
+## @brief Translates a @c set_outputs call into per-output command values.
+#  @param data Validated service data.
+#  @param output_count Number of outputs configured for the controller.
+#  @return Mapping of zero-based output index to 1 (on) or 0 (off).
+#  @throws ServiceValidationError When an output is not configured.
+def requested_outputs(data: dict, output_count: int) -> dict[int, int]:
+    """Return the output states requested by a service call."""
+    if ATTR_MASK in data:
+        mask = data[ATTR_MASK]
+        return {output_id: (mask >> output_id) & 1 for output_id in range(output_count)}
+    invalid = [output for output in data[ATTR_OUTPUTS] if output > output_count]
+    if invalid:
+        raise ServiceValidationError(
+            f"Output {invalid[0]} is not configured on {data[ATTR_DEVICE_ID]}"
+        )
+    value = int(data[ATTR_STATE])
+    return {output - 1: value for output in data[ATTR_OUTPUTS]}
+
+
+## @brief Registers the integration-wide service actions.
+#  @param hass Active Home Assistant instance.
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the SmartCloudAge services."""
+
+    ## @brief Switches several outputs of one controller in a single burst.
+    #  @param call Service call with the controller and the requested outputs.
+    async def async_set_outputs(call: ServiceCall) -> None:
+        device_id = call.data[ATTR_DEVICE_ID]
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            if entry.state is not ConfigEntryState.LOADED:
+                continue
+            devices = entry.options.get("devices", entry.data.get("devices", []))
+            for device in devices:
+                if device.get("device_id") == device_id:
+                    await entry.runtime_data.commands.async_set_outputs(
+                        device_id,
+                        requested_outputs(call.data, device.get("outputs", 16)),
+                    )
+                    return
+        raise ServiceValidationError(f"Unknown SmartCloudAge controller {device_id}")
+
+    ## @brief Imports a CSV or YAML controller list.
+    #
+    #  Without @c config_entry_id a new multi-controller entry is created;
+    #  otherwise the controllers are added to, or replace those of, the given
+    #  entry, which applies them without a reload.
+    #  @param call Service call with the document, its format and the target.
+    async def async_import_devices(call: ServiceCall) -> None:
+        entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+        target = None
+        if entry_id is not None:
+            target = hass.config_entries.async_get_entry(entry_id)
+            if target is None or target.domain != DOMAIN:
+                raise ServiceValidationError(
+                    f"Unknown SmartCloudAge config entry {entry_id}"
+                )
+        others = (
+            entry
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry is not target
+        )
+        try:
+            devices = parse_devices(
+                call.data[ATTR_DEVICES],
+                call.data[ATTR_FORMAT],
+                configured_device_ids(others),
+            )
+        except BulkImportError as err:
+            raise ServiceValidationError(f"Invalid SmartCloudAge import: {err}") from err
+        if target is None:
+            await hass.config_entries.flow.async_init(
+                DOMAIN,
+                context={"source": SOURCE_IMPORT},
+                data={"title": call.data.get(ATTR_TITLE), "devices": devices},
+            )
+            return
+        current = target.options.get("devices", target.data.get("devices", []))
+        hass.config_entries.async_update_entry(
+            target,
+            options={**target.options, "devices": merge_devices(current, devices)},
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_OUTPUTS, async_set_outputs, schema=SET_OUTPUTS_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_DEVICES,
+        async_import_devices,
+        schema=IMPORT_DEVICES_SCHEMA,
+    )
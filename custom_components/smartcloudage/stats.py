@@ -0,0 +1,116 @@
+"""In-process hot-path counters for SmartCloudAge configuration entries."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+## @brief Cheap counters and timings describing the work of one config entry.
+#
+#  Counters are plain integer increments on the MQTT and publish paths, so they
+#  can stay enabled in production without per-frame logging.
+class IntegrationStats:
+    """Frame, state-write, publish, command and RTC figures of a config entry."""
+
+    __slots__ = (
+        "commands_expired",
+        "commands_retried",
+        "frames_coalesced",
+        "frames_decoded",
+        "frames_dropped",
+        "frames_duplicate",
+        "frames_invalid",
+        "frames_received",
+        "frames_unknown_device",
+        "ingest_queue_peak",
+        "publish_count",
+        "publish_time_max",
+        "publish_time_total",
+        "rtc_round_duration",
+        "setup_timings",
+        "state_writes",
+        "state_writes_suppressed",
+    )
+
+    def __init__(self) -> None:
+        ## @brief Starts every counter at zero.
+        self.frames_received = 0
+        self.frames_decoded = 0
+        self.frames_unknown_device = 0
+        self.frames_invalid = 0
+        ## Queued frames replaced by a newer frame of the same topic.
+        self.frames_coalesced = 0
+        ## Frames discarded because the ingestion queue was full.
+        self.frames_dropped = 0
+        ## Frames discarded as repetitions of a recent frame.
+        self.frames_duplicate = 0
+        ## Largest number of topics waiting in the ingestion queue.
+        self.ingest_queue_peak = 0
+        self.state_writes = 0
+        self.state_writes_suppressed = 0
+        self.publish_count = 0
+        self.publish_time_total = 0.0
+        self.publish_time_max = 0.0
+        self.rtc_round_duration: float | None = None
+        self.commands_retried = 0
+        self.commands_expired = 0
+        ## Duration of each entry setup phase, in seconds.
+        self.setup_timings: dict[str, float] = {}
+
+    ## @brief Records the duration of one MQTT publish.
+    #  @param elapsed Time spent awaiting the publish, in seconds.
+    def record_publish(self, elapsed: float) -> None:
+        """Accumulate a publish latency sample."""
+        self.publish_count += 1
+        self.publish_time_total += elapsed
+        if elapsed > self.publish_time_max:
+            self.publish_time_max = elapsed
+
+    ## @brief Records the duration of one phase of the entry setup.
+    #  @param phase Name of the phase, e.g. @c storage or @c subscribe.
+    #  @param elapsed Duration of the phase, in seconds.
+    def record_setup_phase(self, phase: str, elapsed: float) -> None:
+        """Store a setup timing sample."""
+        self.setup_timings[phase] = round(elapsed, 4)
+
+    ## @brief Returns the mean publish latency.
+    #  @return Mean latency in milliseconds, or @c None before the first publish.
+    @property
+    def publish_latency_ms(self) -> float | None:
+        """Return the mean MQTT publish latency in milliseconds."""
+        if not self.publish_count:
+            return None
+        return round(self.publish_time_total / self.publish_count * 1000, 3)
+
+    ## @brief Returns the slowest publish latency.
+    #  @return Maximum latency in milliseconds, or @c None before the first publish.
+    @property
+    def publish_latency_max_ms(self) -> float | None:
+        """Return the slowest MQTT publish latency in milliseconds."""
+        if not self.publish_count:
+            return None
+        return round(self.publish_time_max * 1000, 3)
+
+    ## @brief Exports every counter for diagnostics.
+    #  @return JSON-serializable snapshot of the counters.
+    def as_dict(self) -> dict[str, Any]:
+        """Return a snapshot of the counters."""
+        return {
+            "frames_received": self.frames_received,
+            "frames_decoded": self.frames_decoded,
+            "frames_unknown_device": self.frames_unknown_device,
+            "frames_invalid": self.frames_invalid,
+            "frames_coalesced": self.frames_coalesced,
+            "frames_dropped": self.frames_dropped,
+            "frames_duplicate": self.frames_duplicate,
+            "ingest_queue_peak": self.ingest_queue_peak,
+            "state_writes": self.state_writes,
+            "state_writes_suppressed": self.state_writes_suppressed,
+            "publish_count": self.publish_count,
+            "publish_latency_ms": self.publish_latency_ms,
+            "publish_latency_max_ms": self.publish_latency_max_ms,
+            "rtc_round_duration": self.rtc_round_duration,
+            "commands_retried": self.commands_retried,
+            "commands_expired": self.commands_expired,
+            "setup_timings": dict(self.setup_timings),
+        }
@@ -0,0 +1,89 @@
+"""Persistence of the SmartCloudAge controller state snapshot."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .controller import ControllerState
+
+DOMAIN = "smartcloudage"
+STORAGE_VERSION = 1
+## Seconds between a state update and the write that persists it.
+PULSE_SAVE_DELAY = 60
+
+
+## @brief Persists the state snapshot of a configuration entry.
+#
+#  One document per entry holds the pulse accumulators, output bitmask, RSSI
+#  and uptime of every controller, so entities start from their last known
+#  values after a restart. Updates only schedule a delayed write; further
+#  updates before that write are folded into it, so disk writes are bounded by
+#  @c PULSE_SAVE_DELAY no matter how fast frames arrive.
+class PulseStore:
+    """Debounced storage of every controller's last known state."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        controllers: Mapping[str, ControllerState],
+        delay: float = PULSE_SAVE_DELAY,
+    ) -> None:
+        ## @brief Binds the store to the controllers of a configuration entry.
+        #  @param hass Active Home Assistant instance.
+        #  @param entry_id Configuration entry identifier, used as storage key.
+        #  @param controllers State records persisted in the snapshot.
+        #  @param delay Seconds between an update and its write.
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.pulses"
+        )
+        self._controllers = controllers
+        self._delay = delay
+        self._save_pending = False
+
+    ## @brief Restores the snapshot into the controller records in one read.
+    async def async_load(self) -> None:
+        """Load the controller state saved by a previous run."""
+        data = await self._store.async_load()
+        if not data:
+            return
+        for device_id, state in data.get("controllers", {}).items():
+            controller = self._controllers.get(device_id)
+            if controller is not None:
+                controller.restore_state(state)
+
+    ## @brief Schedules a write of the snapshot unless one is pending.
+    @callback
+    def async_schedule_save(self) -> None:
+        """Persist the snapshot after the save delay."""
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, self._delay)
+
+    ## @brief Writes the snapshot immediately, for example on unload.
+    async def async_save(self) -> None:
+        """Persist the snapshot now."""
+        await self._store.async_save(self._data_to_save())
+
+    ## @brief Deletes the stored snapshot of a removed entry.
+    async def async_remove(self) -> None:
+        """Remove the storage file."""
+        await self._store.async_remove()
+
+    ## @brief Builds the stored document from the controller records.
+    #  @return Snapshot of every controller that reported any state.
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        self._save_pending = False
+        return {
+            "controllers": {
+                device_id: state
+                for device_id, controller in self._controllers.items()
+                if (state := controller.export_state())
+            }
+        }
@@ -1,8 +1,9 @@
 import logging
-import json
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.helpers.entity import EntityCategory
-from homeassistant.components import mqtt
+from homeassistant.core import callback
+
+from .reconcile import async_remove_entities
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -10,7 +11,10 @@ DOMAIN = "smartcloudage"
 DEFAULT_NAME = "SmartCloudAge Output"
 HARDCODED_TOPIC_PREFIX = "CloudAge/"
 
-## @brief Creates output switch entities and subscribes to controller status.
+## @brief Creates output switch entities and registers for controller status.
+#
+#  The platform registers a reconciler in @c entry.runtime_data so that an
+#  options change only adds or removes the switches of the edited controllers.
 #  @param hass Active Home Assistant instance.
 #  @param entry SmartCloudAge configuration entry.
 #  @param async_add_entities Callback used to register entities.
@@ -21,85 +25,121 @@ async def async_setup_entry(hass, entry, async_add_entities):
             devices = entry.data.get("devices", [])
 
     except Exception as e:
-        _LOGGER.error(f"Erro ao carregar devices: {e}")
+        _LOGGER.error("Erro ao carregar devices: %s", e)
         devices = []
     entities = []
     entities_by_device = {}
     entities_by_alias = {}
-
-    for device_conf in devices:
-        device_id = device_conf.get("device_id")
-        alias = device_conf.get("alias") or device_id  # Usa alias se existir
-        outputs = device_conf.get("outputs", 16)
-        entities_by_device.setdefault(device_id, [])
-        entities_by_alias.setdefault(alias, [])
-        for output_id in range(outputs):
-            entity = SmartCloudOutputSwitch(
+    # Estado compartilhado por controladora (máscara de saídas, bit i = saída i ligada)
+    controllers = entry.runtime_data.controllers
+    stats = entry.runtime_data.stats
+    commands = entry.runtime_data.commands
+    dispatcher = entry.runtime_data.dispatcher
+    availability = entry.runtime_data.availability
+    pulse_store = entry.runtime_data.pulse_store
+
+    ## @brief Builds the switches of a range of outputs of a controller.
+    #  @param device_id Unique controller identifier.
+    #  @param output_ids Zero-based indexes of the outputs to create.
+    #  @return New switch entities, also appended to @c entities_by_device.
+    def create_switches(device_id, output_ids):
+        controller = controllers[device_id]
+        alias = controller.alias  # Usa alias se existir
+        created = [
+            SmartCloudOutputSwitch(
                 hass=hass,
                 name=f"{alias} Output {output_id + 1}",
                 output_id=output_id,
-                base_topic=HARDCODED_TOPIC_PREFIX,
-                device_id=device_id,
-                alias=alias,
+                controller=controller,
+                commands=commands,
             )
-            entities.append(entity)
-            entities_by_device[device_id].append(entity)
-            entities_by_alias[alias].append(entity)
+            for output_id in output_ids
+        ]
+        entities_by_device.setdefault(device_id, []).extend(created)
+        return created
+
+    for device_conf in devices:
+        device_id = device_conf.get("device_id")
+        if device_id not in controllers or device_id in entities_by_device:
+            continue
+        created = create_switches(device_id, range(device_conf.get("outputs", 16)))
+        entities.extend(created)
+        entities_by_alias.setdefault(controllers[device_id].alias, []).extend(created)
     async_add_entities(entities)
 
     # Exemplo: listar aliases (pode usar para log ou debug)
-    _LOGGER.info(f"Aliases cadastrados: {list(entities_by_alias.keys())}")
-
-    ## @brief Updates switch states from an MQTT controller status message.
-    #  @param msg MQTT message containing controller output state.
-    async def message_received(msg):
-        try:
-            topic_parts = msg.topic.split("/")
-            if len(topic_parts) < 2:   # <-- antes era < 3
-                return
-            device_id = topic_parts[1]
-
-            # se o device_id do tópico não é um cadastrado, ignora
-            if device_id not in entities_by_device:
-                return
-
-            raw = msg.payload.decode("utf-8") if isinstance(msg.payload, bytes) else msg.payload
-            data = json.loads(raw)
-
-            # Desembrulha se "message" vier como JSON string (duplo-JSON)
-            inner = data.get("message")
-            if isinstance(inner, str):
-                try:
-                    inner_obj = json.loads(inner)
-                    data = {**data, **inner_obj}
-                except Exception:
-                    pass
-
-            # Ignora mensagens de INPUT_STATUS
-            msg_type = data.get("message")
-            if isinstance(msg_type, str) and msg_type.upper() == "INPUT_STATUS":
-                _LOGGER.debug("Ignorando INPUT_STATUS (topic=%s)", msg.topic)
-                return
-
-            output_section = data.get("Output")
-            outputs = output_section.get("Outputs") if isinstance(output_section, dict) else None
-            if outputs is not None:
-                outputs = int(outputs)
-                _LOGGER.debug("MQTT update topic=%s device=%s Outputs=%s", msg.topic, device_id, outputs)
-                for i, ent in enumerate(entities_by_device[device_id]):
-                    ent._state = bool((outputs >> i) & 1)
-                    ent.async_write_ha_state()
-        except Exception as e:
-            _LOGGER.error(f"Erro processando mensagem MQTT: {e}  Payload: {msg.payload}")
-
-    for device_id in entities_by_device.keys():
-        # cobre qualquer product_name: +/<device_id>/OutTopic/...
-        await mqtt.async_subscribe(hass, f"+/{device_id}/OutTopic/#", message_received, 0)
-        # opcional (se algum status sair fora de OutTopic):
-        await mqtt.async_subscribe(hass, f"+/{device_id}/#", message_received, 0)
-
+    _LOGGER.info("Aliases cadastrados: %s", list(entities_by_alias))
+
+    ## @brief Updates only the switches whose bit changed in the output bitmask.
+    #  @param device_id Controller that produced the status frame.
+    #  @param outputs Value of the @c Output.Outputs bitmask.
+    @callback
+    def outputs_received(device_id, outputs):
+        controller = controllers[device_id]
+        changed = outputs ^ controller.outputs
+        if not changed:
+            return
+        _LOGGER.debug("MQTT update device=%s Outputs=%s changed=%s", device_id, outputs, changed)
+        controller.outputs = outputs
+        pulse_store.async_schedule_save()
+        for ent in entities_by_device[device_id]:
+            if (changed >> ent._output_id) & 1:
+                ent.async_write_ha_state()
+                stats.state_writes += 1
+
+    ## @brief Writes the switches of controllers whose availability changed.
+    #  @param device_ids Controllers of one availability batch.
+    @callback
+    def availability_changed(device_ids):
+        for device_id in device_ids:
+            for ent in entities_by_device.get(device_id, []):
+                ent.async_write_ha_state()
+                stats.state_writes += 1
+
+    ## @brief Routes the status frames of a controller to its switches.
+    #  @param device_id Unique controller identifier.
+    def register_handlers(device_id):
+        dispatcher.async_register_output_handler(device_id, outputs_received)
+        dispatcher.async_register_output_handler(
+            device_id, commands.async_outputs_received
+        )
 
+    ## @brief Applies a controller configuration change to its switches.
+    #  @param old Previous controller configuration, or @c None when added.
+    #  @param new Updated controller configuration, or @c None when removed.
+    async def async_reconcile_device(old, new):
+        if old is None:
+            async_add_entities(
+                create_switches(new["device_id"], range(new.get("outputs", 16)))
+            )
+            register_handlers(new["device_id"])
+            return
+        device_id = old["device_id"]
+        current = entities_by_device.get(device_id, [])
+        if new is None or old.get("alias") != new.get("alias"):
+            # O unique_id depende do alias: as saídas antigas são descartadas
+            stale = current[:]
+            current.clear()
+            first_output = 0
+        else:
+            outputs = new.get("outputs", 16)
+            stale = current[outputs:]
+            del current[outputs:]
+            first_output = len(current)
+        created = []
+        if new is not None:
+            created = create_switches(
+                device_id, range(first_output, new.get("outputs", 16))
+            )
+        else:
+            entities_by_device.pop(device_id, None)
+        await async_remove_entities(hass, stale, purge=True)
+        async_add_entities(created)
 
+    for device_id in entities_by_device.keys():
+        register_handlers(device_id)
+    entry.runtime_data.reconcilers.append(async_reconcile_device)
+    entry.async_on_unload(availability.async_add_listener(availability_changed))
 
 
 ## @brief Represents one physical output of a SmartCloudAge controller.
@@ -108,76 +148,55 @@ class SmartCloudOutputSwitch(SwitchEntity):
     #  @param hass Active Home Assistant instance.
     #  @param name Human-readable entity name.
     #  @param output_id Zero-based output index.
-    #  @param base_topic MQTT command topic prefix.
-    #  @param device_id Unique controller identifier.
-    #  @param alias Optional human-readable controller alias.
-    def __init__(self, hass, name, output_id, base_topic, device_id, alias=None):
+    #  @param controller Shared state of the controller, holding the last
+    #         confirmed output bitmask.
+    #  @param commands Batcher that coalesces and tracks the output commands of
+    #         the entry; the state changes only when a status frame confirms it.
+    def __init__(self, hass, name, output_id, controller, commands=None):
         self.hass = hass
         self._attr_name = name
-        self._state = False
         self._output_id = output_id
-        self._device_id = device_id
-        self._alias = alias or device_id
-        self._base_topic = base_topic
+        self._controller = controller
+        self._commands = commands
         self._attr_entity_category = EntityCategory.CONFIG
+        # Use alias no unique_id para fácil identificação; o valor é fixado na
+        # criação, para que uma saída antiga mantenha o seu ID até ser removida
+        # quando o alias muda.
+        self._attr_unique_id = (
+            f"smartcloudage_output_{controller.alias}_{output_id + 1}"
+        )
+
+    @property
+    ## @brief Reports whether the controller is still sending telemetry.
+    #  @return @c False once the controller exceeded its availability timeout.
+    def available(self):
+        return self._controller.available
 
     @property
     ## @brief Returns the current output state.
     #  @return @c True when the output is on.
     def is_on(self):
-        return self._state
+        return bool((self._controller.outputs >> self._output_id) & 1)
 
-    ## @brief Publishes an ON command and updates the local state.
+    ## @brief Sends an ON command; the state is updated once it is confirmed.
     #  @param kwargs Additional Home Assistant service-call arguments.
     async def async_turn_on(self, **kwargs):
         await self._publish_mqtt(1)
-        self._state = True
-        self.async_write_ha_state()
 
-    ## @brief Publishes an OFF command and updates the local state.
+    ## @brief Sends an OFF command; the state is updated once it is confirmed.
     #  @param kwargs Additional Home Assistant service-call arguments.
     async def async_turn_off(self, **kwargs):
         await self._publish_mqtt(0)
-        self._state = False
-        self.async_write_ha_state()
 
-    ## @brief Publishes an output command to the controller.
+    ## @brief Queues an output command in the entry's command batcher.
     #  @param value Numeric output state, where 1 is on and 0 is off.
     async def _publish_mqtt(self, value):
-        # Publica para topic: CloudAge/<device_id>
-        topic = f"{self._base_topic}{self._device_id}"
-        payload = {
-            "command": 11,
-            "type": 1,
-            "signature": self._device_id,
-            "payload": {
-                "id": self._output_id + 1,
-                "value": value
-            }
-        }
-        _LOGGER.debug("Publishing to %s: %s", topic, payload)
-        await mqtt.async_publish(
-            self.hass,
-            topic,
-            json.dumps(payload),
-            0,
-            False
+        await self._commands.async_set_outputs(
+            self._controller.device_id, {self._output_id: value}
         )
 
-    @property
-    ## @brief Builds the persistent identifier for this output.
-    #  @return Unique Home Assistant entity identifier.
-    def unique_id(self):
-        # Use alias no unique_id para fácil identificação
-        return f"smartcloudage_output_{self._alias}_{self._output_id + 1}"
-
     @property
     ## @brief Links this switch to its SmartCloudAge controller device.
     #  @return Home Assistant device-registry metadata.
     def device_info(self):
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": f"SmartCloudAge {self._alias}",
-            "manufacturer": "SmartCloudAge",
-            "model": "MQTT Controller"
-        }
+        return self._controller.device_info
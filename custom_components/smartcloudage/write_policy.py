@@ -0,0 +1,118 @@
+"""State-write policies for SmartCloudAge telemetry entities."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+import time
+from typing import Any
+
+from .stats import IntegrationStats
+
+CONF_MIN_WRITE_INTERVAL = "min_write_interval"
+CONF_HEARTBEAT_MINUTES = "heartbeat_minutes"
+CONF_RSSI_DEADBAND = "rssi_deadband"
+CONF_UPTIME_DEADBAND = "uptime_deadband"
+CONF_RATE_DEADBAND = "rate_deadband"
+
+DEFAULT_MIN_WRITE_INTERVAL = 0
+DEFAULT_HEARTBEAT_MINUTES = 60
+DEFAULT_RSSI_DEADBAND = 2
+DEFAULT_UPTIME_DEADBAND = 60
+DEFAULT_RATE_DEADBAND = 0
+
+
+## @brief Describes when an entity may publish a new state.
+@dataclass(frozen=True, slots=True)
+class WritePolicy:
+    """Change-only, rate-limited and deadband-filtered state publishing."""
+
+    ## Changes whose magnitude does not exceed this value are suppressed.
+    deadband: float = 0
+    ## Minimum number of seconds between two writes.
+    min_interval: float = 0
+    ## Seconds after which a write is forced even without a change.
+    heartbeat: float | None = None
+
+
+## @brief Builds a write policy from the entry-wide options.
+#  @param options Configuration entry options.
+#  @param deadband_key Option holding the entity-specific deadband, if any.
+#  @param default_deadband Deadband used when the option is not set.
+#  @return Policy shared by every entity of the same kind.
+def write_policy_from_options(
+    options: Mapping[str, Any],
+    deadband_key: str | None = None,
+    default_deadband: float = 0,
+) -> WritePolicy:
+    """Return the write policy configured for one kind of entity."""
+    heartbeat_minutes = options.get(CONF_HEARTBEAT_MINUTES, DEFAULT_HEARTBEAT_MINUTES)
+    return WritePolicy(
+        deadband=(
+            options.get(deadband_key, default_deadband)
+            if deadband_key
+            else default_deadband
+        ),
+        min_interval=options.get(CONF_MIN_WRITE_INTERVAL, DEFAULT_MIN_WRITE_INTERVAL),
+        heartbeat=heartbeat_minutes * 60 if heartbeat_minutes else None,
+    )
+
+
+## @brief Tracks the last published value of one entity against its policy.
+class WriteThrottle:
+    """Decide whether a new value must be written to the state machine."""
+
+    __slots__ = ("_last_value", "_last_write", "policy", "stats")
+
+    def __init__(
+        self, policy: WritePolicy, stats: IntegrationStats | None = None
+    ) -> None:
+        ## @brief Initializes the throttle without any previous write.
+        #  @param policy Policy applied to every subsequent value.
+        #  @param stats Optional entry counters of issued and suppressed writes.
+        self.policy = policy
+        self.stats = stats
+        self._last_value: float | None = None
+        self._last_write: float | None = None
+
+    ## @brief Treats a restored value as already written.
+    #
+    #  The entity's initial state already shows the value, so a first frame
+    #  within the policy does not write it again.
+    #  @param value Restored numeric state, or @c None when nothing was restored.
+    #  @param now Monotonic timestamp; defaults to the current time.
+    def prime(self, value: float | None, now: float | None = None) -> None:
+        """Remember a restored value without counting a write."""
+        if value is None:
+            return
+        self._last_value = value
+        self._last_write = time.monotonic() if now is None else now
+
+    ## @brief Checks a new value against the policy and records accepted writes.
+    #  @param value New numeric state.
+    #  @param now Monotonic timestamp; defaults to the current time.
+    #  @param force Whether the value must be written regardless of the policy.
+    #  @return @c True when the caller should write the entity state.
+    def should_write(
+        self, value: float, now: float | None = None, *, force: bool = False
+    ) -> bool:
+        """Return whether the value must be published and remember it if so."""
+        if now is None:
+            now = time.monotonic()
+        last_write = self._last_write
+        if not force and last_write is not None:
+            policy = self.policy
+            elapsed = now - last_write
+            if policy.heartbeat is None or elapsed < policy.heartbeat:
+                if (
+                    elapsed < policy.min_interval
+                    or abs(value - self._last_value) <= policy.deadband
+                ):
+                    if self.stats is not None:
+                        self.stats.state_writes_suppressed += 1
+                    return False
+        self._last_value = value
+        self._last_write = now
+        if self.stats is not None:
+            self.stats.state_writes += 1
+        return True
@@ -6,6 +6,8 @@ from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from .fleet import MqttSubscriptions
+
 
 @pytest.fixture(autouse=True)
 def auto_enable_custom_integrations(enable_custom_integrations):
@@ -22,6 +24,18 @@ def mock_mqtt_publish():
         yield publish
 
 
+@pytest.fixture
+def mqtt_subscriptions(hass):
+    """Capture MQTT subscriptions so tests can deliver frames without a broker."""
+    subscriptions = MqttSubscriptions()
+    hass.config.components.add("mqtt")
+    with patch(
+        "custom_components.smartcloudage.dispatcher.mqtt.async_subscribe",
+        side_effect=subscriptions.async_subscribe,
+    ):
+        yield subscriptions
+
+
 @pytest.fixture
 def device_config():
     """Return a controller with representative meter configurations."""
@@ -48,3 +62,19 @@ def device_config():
             },
         ],
     }
+
+
+def pytest_addoption(parser):
+    """Register the options of the capture replay harness."""
+    group = parser.getgroup("smartcloudage")
+    group.addoption(
+        "--replay-capture",
+        default=None,
+        help="JSONL MQTT capture replayed by tests/test_replay.py",
+    )
+    group.addoption(
+        "--replay-speed",
+        type=float,
+        default=0.0,
+        help="Replay speed: 1 for real time, >1 to accelerate, 0 as fast as possible",
+    )
@@ -0,0 +1,295 @@
+"""Synthetic SmartCloudAge fleets and MQTT frame replay helpers for tests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import partial
+import json
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.helpers.entity import Entity
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.smartcloudage import DOMAIN
+from custom_components.smartcloudage.dedup import DEDUP_TTL
+from custom_components.smartcloudage.dispatcher import SmartCloudAgeDispatcher
+
+Frame = tuple[str, bytes]
+
+
+def fleet_devices(count: int, meters: int = 4, outputs: int = 16) -> list[dict]:
+    """Return ``count`` controllers with ``meters`` pulse meters each."""
+    return [
+        {
+            "device_id": f"controller-{index:04d}",
+            "outputs": outputs,
+            "alias": f"Controladora {index}",
+            "meters": [
+                {
+                    "channel": channel,
+                    "name": f"Medidor {index}-{channel}",
+                    "type": "water",
+                    "factor": 0.01,
+                    "offset": 0.0,
+                    "unit": "m³",
+                }
+                for channel in range(1, meters + 1)
+            ],
+        }
+        for index in range(count)
+    ]
+
+
+def pulse_payload(device_id: str, sequence: int, channels: int = 4) -> bytes:
+    """Return a firmware PULSE_SENSOR frame with advancing counters."""
+    return json.dumps(
+        {
+            "message": "PULSE_SENSOR",
+            "device": device_id,
+            "Wifi_db": -60 - sequence % 7,
+            "uptime": 5 * sequence,
+            "Pulses": [
+                {"Sensor": channel, "lsb": (sequence * channel) & 0xFFFF, "msb": 0}
+                for channel in range(1, channels + 1)
+            ],
+        },
+        separators=(",", ":"),
+    ).encode()
+
+
+def status_payload(device_id: str, sequence: int) -> bytes:
+    """Return a double-encoded output status frame."""
+    inner = json.dumps({"Output": {"Outputs": (sequence // 4) & 0x3}})
+    return json.dumps({"device": device_id, "message": inner}).encode()
+
+
+def fleet_frames(devices: list[dict], rounds: int) -> list[Frame]:
+    """Interleave pulse and status frames of every controller over ``rounds``."""
+    frames = []
+    for sequence in range(1, rounds + 1):
+        for device in devices:
+            device_id = device["device_id"]
+            topic = f"CloudAge/{device_id}/OutTopic"
+            frames.append(
+                (f"{topic}/pulses", pulse_payload(device_id, sequence, len(device["meters"])))
+            )
+            if sequence % 3 == 0:
+                frames.append((f"{topic}/status", status_payload(device_id, sequence)))
+    return frames
+
+
+async def async_setup_fleet(
+    hass,
+    devices: list[dict],
+    options: dict | None = None,
+    dedup_ttl: float = DEDUP_TTL,
+):
+    """Create and load a config entry holding ``devices``.
+
+    ``dedup_ttl`` is handed to the entry's dispatcher; replays that repeat
+    earlier frames pass 0 so every frame is decoded.
+    """
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"devices": devices},
+        options={"devices": devices, **(options or {})},
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.smartcloudage.SmartCloudAgeDispatcher",
+        partial(SmartCloudAgeDispatcher, dedup_ttl=dedup_ttl),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    return entry
+
+
+def topic_matches(topic_filter: str, topic: str) -> bool:
+    """Return whether ``topic`` matches an MQTT filter with ``+`` and ``#``."""
+    filter_levels = topic_filter.split("/")
+    levels = topic.split("/")
+    for index, level in enumerate(filter_levels):
+        if level == "#":
+            return True
+        if index >= len(levels) or level not in ("+", levels[index]):
+            return False
+    return len(filter_levels) == len(levels)
+
+
+@dataclass(frozen=True)
+class ReceivedFrame:
+    """Topic and payload handed to a subscription callback."""
+
+    topic: str
+    payload: bytes | str
+
+
+class MqttSubscriptions:
+    """Stand-in for ``mqtt.async_subscribe`` delivering frames to callbacks.
+
+    Frames are matched against the recorded topic filters and handed straight
+    to the callbacks, so tests exercise the integration without an MQTT client.
+    Payloads are decoded as UTF-8 when possible, like the default subscription
+    encoding does.
+    """
+
+    def __init__(self) -> None:
+        """Start without subscriptions."""
+        self.subscriptions: list[tuple[str, object]] = []
+
+    async def async_subscribe(self, hass, topic: str, msg_callback, *args, **kwargs):
+        """Record a subscription and return its unsubscribe callback."""
+        subscription = (topic, msg_callback)
+        self.subscriptions.append(subscription)
+        return lambda: self.subscriptions.remove(subscription)
+
+    def fire(self, topic: str, payload: bytes | str) -> None:
+        """Deliver a frame to every subscription matching ``topic``."""
+        if isinstance(payload, bytes):
+            try:
+                payload = payload.decode()
+            except UnicodeDecodeError:
+                pass
+        message = ReceivedFrame(topic, payload)
+        for topic_filter, msg_callback in list(self.subscriptions):
+            if topic_matches(topic_filter, topic):
+                msg_callback(message)
+
+
+@contextmanager
+def count_state_writes():
+    """Count every ``async_write_ha_state`` call made while the context is open."""
+    original = Entity.async_write_ha_state
+    counter = {"writes": 0}
+
+    def counting_write(self):
+        counter["writes"] += 1
+        original(self)
+
+    Entity.async_write_ha_state = counting_write
+    try:
+        yield counter
+    finally:
+        Entity.async_write_ha_state = original
+
+
+@dataclass
+class IngestReport:
+    """Throughput, latency, allocation and state-write figures of a replay."""
+
+    frames: int = 0
+    elapsed: float = 0.0
+    state_writes: int = 0
+    frames_decoded: int = 0
+    frames_duplicate: int = 0
+    latencies: list[float] = field(default_factory=list)
+    transient_bytes: list[int] = field(default_factory=list)
+
+    @property
+    def frames_per_second(self) -> float:
+        """Return the sustained frame rate."""
+        return self.frames / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def writes_per_frame(self) -> float:
+        """Return the average number of state writes per frame."""
+        return self.state_writes / self.frames if self.frames else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Return a per-frame latency percentile in microseconds."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+        return ordered[index] * 1e6
+
+    @property
+    def bytes_per_frame(self) -> float:
+        """Return the mean peak of transient allocations per sampled frame."""
+        if not self.transient_bytes:
+            return 0.0
+        return sum(self.transient_bytes) / len(self.transient_bytes)
+
+    def summary(self, label: str) -> str:
+        """Format the report as a single line."""
+        return (
+            f"{label}: {self.frames} frames, {self.frames_per_second:,.0f} frames/s, "
+            f"p50={self.percentile(50):.1f}us p95={self.percentile(95):.1f}us "
+            f"p99={self.percentile(99):.1f}us, "
+            f"{self.bytes_per_frame:,.0f} B allocated/frame, "
+            f"{self.writes_per_frame:.2f} state writes/frame"
+        )
+
+
+def _loaded_dispatchers(hass) -> list:
+    """Return the dispatchers of every loaded SmartCloudAge entry."""
+    return [
+        entry.runtime_data.dispatcher
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+    ]
+
+
+async def async_replay_frames(
+    hass,
+    mqtt: MqttSubscriptions,
+    frames: Iterable[Frame],
+    allocation_sample: int = 0,
+) -> IngestReport:
+    """Deliver frames through the subscription callbacks and measure them.
+
+    Each frame is delivered in its own event loop iteration, as frames arriving
+    from the broker are, and the timed region ends only once every queued
+    frame and state write has been handled. The first ``allocation_sample``
+    frames are replayed once more under ``tracemalloc`` to estimate transient
+    allocations per frame.
+
+    Replays deliberately repeat earlier frames, so fleets set up with a zero
+    ``dedup_ttl`` keep hashing every frame but never match a duplicate: the
+    figures then cover decoding and state writes rather than dropped frames.
+    """
+    frames = list(frames)
+    report = IngestReport()
+    dispatchers = _loaded_dispatchers(hass)
+    decoded = sum(dispatcher.stats.frames_decoded for dispatcher in dispatchers)
+    duplicate = sum(dispatcher.stats.frames_duplicate for dispatcher in dispatchers)
+    with count_state_writes() as counter:
+        started = time.perf_counter()
+        for topic, payload in frames:
+            frame_started = time.perf_counter()
+            mqtt.fire(topic, payload)
+            report.latencies.append(time.perf_counter() - frame_started)
+            await asyncio.sleep(0)
+        await hass.async_block_till_done()
+        report.elapsed = time.perf_counter() - started
+        report.frames = len(frames)
+        report.state_writes = counter["writes"]
+        report.frames_decoded = (
+            sum(dispatcher.stats.frames_decoded for dispatcher in dispatchers) - decoded
+        )
+        report.frames_duplicate = (
+            sum(dispatcher.stats.frames_duplicate for dispatcher in dispatchers)
+            - duplicate
+        )
+
+    if allocation_sample:
+        tracemalloc.start()
+        try:
+            for topic, payload in frames[:allocation_sample]:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                mqtt.fire(topic, payload)
+                report.transient_bytes.append(
+                    tracemalloc.get_traced_memory()[1] - baseline
+                )
+                await asyncio.sleep(0)
+        finally:
+            tracemalloc.stop()
+        await hass.async_block_till_done()
+    return report
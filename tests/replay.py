@@ -0,0 +1,188 @@
+"""Replay recorded MQTT captures through a test Home Assistant instance.
+
+A capture is a JSONL file with one object per line::
+
+    {"timestamp": 1722290000.125, "topic": "CloudAge/controller-01/OutTopic/pulses",
+     "payload": "{\"message\": \"PULSE_SENSOR\", ...}"}
+
+``payload`` may also be a JSON object, which is serialized before delivery.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+import time
+
+from homeassistant.helpers import entity_registry as er
+from .fleet import MqttSubscriptions, count_state_writes
+
+## Frames delivered between two yields to the event loop in as-fast-as-possible mode.
+ASAP_BATCH = 100
+LAG_PROBE_INTERVAL = 0.01
+
+
+@dataclass(frozen=True)
+class CapturedFrame:
+    """One MQTT message of a capture."""
+
+    timestamp: float
+    topic: str
+    payload: bytes
+
+
+@dataclass
+class ReplayReport:
+    """Outcome of a capture replay."""
+
+    frames: int = 0
+    elapsed: float = 0.0
+    state_writes: int = 0
+    loop_lag: list[float] = field(default_factory=list)
+    states: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def frames_per_second(self) -> float:
+        """Return the achieved frame rate."""
+        return self.frames / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def max_loop_lag(self) -> float:
+        """Return the worst event-loop lag observed, in milliseconds."""
+        return max(self.loop_lag, default=0.0) * 1000
+
+    @property
+    def mean_loop_lag(self) -> float:
+        """Return the mean event-loop lag observed, in milliseconds."""
+        if not self.loop_lag:
+            return 0.0
+        return sum(self.loop_lag) / len(self.loop_lag) * 1000
+
+    def summary(self) -> str:
+        """Format throughput, lag and the final entity states."""
+        lines = [
+            f"{self.frames} frames in {self.elapsed:.3f} s "
+            f"({self.frames_per_second:,.0f} frames/s), "
+            f"{self.state_writes} state writes, "
+            f"event-loop lag mean={self.mean_loop_lag:.2f} ms "
+            f"max={self.max_loop_lag:.2f} ms",
+        ]
+        lines.extend(
+            f"  {entity_id} = {state}" for entity_id, state in sorted(self.states.items())
+        )
+        return "\n".join(lines)
+
+
+def load_capture(path: str | Path) -> list[CapturedFrame]:
+    """Read a JSONL capture, ordered by timestamp."""
+    frames = []
+    with open(path, encoding="utf-8") as capture:
+        for line in capture:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            payload = record["payload"]
+            if not isinstance(payload, str):
+                payload = json.dumps(payload)
+            frames.append(
+                CapturedFrame(
+                    float(record.get("timestamp", 0.0)),
+                    record["topic"],
+                    payload.encode("utf-8"),
+                )
+            )
+    frames.sort(key=lambda frame: frame.timestamp)
+    return frames
+
+
+def infer_devices(frames: list[CapturedFrame], outputs: int = 16) -> list[dict]:
+    """Build a controller configuration covering every device and channel seen."""
+    channels: dict[str, set[int]] = {}
+    for frame in frames:
+        parts = frame.topic.split("/")
+        if len(parts) < 3 or parts[2] != "OutTopic":
+            continue
+        device_channels = channels.setdefault(parts[1], set())
+        try:
+            data = json.loads(frame.payload)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            for pulse in data.get("Pulses") or []:
+                if isinstance(pulse, dict) and "Sensor" in pulse:
+                    device_channels.add(int(pulse["Sensor"]))
+    return [
+        {
+            "device_id": device_id,
+            "outputs": outputs,
+            "alias": device_id,
+            "meters": [
+                {
+                    "channel": channel,
+                    "name": f"{device_id} {channel}",
+                    "type": "count",
+                    "factor": 1.0,
+                    "offset": 0.0,
+                    "unit": "pulses",
+                }
+                for channel in sorted(device_channels)
+                if 1 <= channel <= 16
+            ],
+        }
+        for device_id, device_channels in channels.items()
+    ]
+
+
+async def _async_probe_loop_lag(samples: list[float]) -> None:
+    """Record how late the event loop wakes up a periodic sleeper."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + LAG_PROBE_INTERVAL
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def async_replay_capture(
+    hass,
+    mqtt: MqttSubscriptions,
+    entry,
+    frames: list[CapturedFrame],
+    speed: float = 0.0,
+) -> ReplayReport:
+    """Deliver captured frames to the integration and report the outcome.
+
+    ``speed`` 1 replays in real time, values above 1 accelerate the capture and
+    0 delivers frames as fast as possible.
+    """
+    report = ReplayReport(frames=len(frames))
+    loop = asyncio.get_running_loop()
+    probe = hass.async_create_background_task(
+        _async_probe_loop_lag(report.loop_lag), "smartcloudage replay lag probe"
+    )
+    first_timestamp = frames[0].timestamp if frames else 0.0
+    with count_state_writes() as counter:
+        started = time.perf_counter()
+        loop_started = loop.time()
+        for index, frame in enumerate(frames):
+            if speed > 0:
+                delay = (frame.timestamp - first_timestamp) / speed - (
+                    loop.time() - loop_started
+                )
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif index % ASAP_BATCH == 0:
+                await asyncio.sleep(0)
+            mqtt.fire(frame.topic, frame.payload)
+        await hass.async_block_till_done()
+        report.elapsed = time.perf_counter() - started
+        report.state_writes = counter["writes"]
+    probe.cancel()
+
+    registry = er.async_get(hass)
+    for registry_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+        state = hass.states.get(registry_entry.entity_id)
+        if state is not None:
+            report.states[registry_entry.entity_id] = state.state
+    return report
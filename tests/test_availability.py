@@ -0,0 +1,147 @@
+"""Tests for the fleet-wide availability tracker."""
+
+from __future__ import annotations
+
+from datetime import datetime
+import time
+from unittest.mock import Mock
+
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.smartcloudage.availability import AvailabilityTracker
+from custom_components.smartcloudage.controller import build_controller_states
+from custom_components.smartcloudage.decoder import TelemetryFrame
+from custom_components.smartcloudage.encoder import CommandEncoder
+
+from .fleet import async_setup_fleet, fleet_devices, pulse_payload
+
+
+def _frame():
+    return TelemetryFrame("PULSE_SENSOR", rssi=-60, data={"message": "PULSE_SENSOR"})
+
+
+def _tracker(hass, devices, default_timeout=60):
+    controllers = build_controller_states(devices)
+    return controllers, AvailabilityTracker(hass, controllers, devices, default_timeout)
+
+
+async def test_sweep_flips_stale_controllers_in_one_batch(hass):
+    """Every silent controller is reported in a single listener call."""
+    devices = fleet_devices(3, meters=0)
+    devices[2]["availability_timeout"] = 0
+    controllers, tracker = _tracker(hass, devices)
+    listener = Mock()
+    tracker.async_add_listener(listener)
+    tracker.async_frame_received("controller-0001", _frame())
+
+    now = time.monotonic()
+    assert tracker.async_sweep(now + 30) == []
+    tracker._last_seen["controller-0001"] = now + 50
+    stale = tracker.async_sweep(now + 61)
+
+    assert stale == ["controller-0000"]
+    listener.assert_called_once_with(["controller-0000"])
+    assert controllers["controller-0000"].available is False
+    assert controllers["controller-0002"].available is True
+    assert tracker.async_sweep(now + 3600) == ["controller-0001"]
+
+
+async def test_next_frame_restores_a_stale_controller(hass):
+    """A frame from an unavailable controller flips it back immediately."""
+    devices = fleet_devices(1, meters=0)
+    controllers, tracker = _tracker(hass, devices)
+    listener = Mock()
+    tracker.async_add_listener(listener)
+    tracker.async_sweep(time.monotonic() + 61)
+    listener.reset_mock()
+
+    tracker.async_frame_received("controller-0000", _frame())
+    tracker.async_frame_received("controller-0000", _frame())
+
+    assert controllers["controller-0000"].available is True
+    listener.assert_called_once_with(["controller-0000"])
+
+
+async def test_frames_without_a_mapping_payload_still_count(hass):
+    """Frames whose data is not a JSON object refresh the controller safely."""
+    devices = fleet_devices(1, meters=0)
+    controllers, tracker = _tracker(hass, devices)
+    tracker.async_sweep(time.monotonic() + 61)
+
+    tracker.async_frame_received("controller-0000", TelemetryFrame("", data=None))
+
+    assert controllers["controller-0000"].available is True
+
+
+async def test_per_device_timeout_overrides_the_default(hass):
+    """A controller-specific timeout wins over the entry default."""
+    devices = fleet_devices(2, meters=0)
+    devices[0]["availability_timeout"] = 3600
+    _, tracker = _tracker(hass, devices)
+
+    assert tracker.timeout("controller-0000") == 3600
+    assert tracker.timeout("controller-0001") == 60
+    assert tracker.async_sweep(time.monotonic() + 120) == ["controller-0001"]
+    tracker.async_add_device("controller-0001", 0)
+    assert tracker.timeout("controller-0001") == 0
+
+
+async def test_entities_of_a_silent_controller_become_unavailable(
+    hass, mqtt_subscriptions
+):
+    """Sensors and switches follow the availability of their controller."""
+    entry = await async_setup_fleet(hass, fleet_devices(2, meters=1))
+    registry = er.async_get(hass)
+    pulse = registry.async_get_entity_id(
+        "sensor", "smartcloudage", "smartcloudage_controller-0000_pulse_1"
+    )
+    output = registry.async_get_entity_id(
+        "switch", "smartcloudage", "smartcloudage_output_Controladora 0_1"
+    )
+    other = registry.async_get_entity_id(
+        "sensor", "smartcloudage", "smartcloudage_controller-0001_pulse_1"
+    )
+    tracker = entry.runtime_data.availability
+    tracker._last_seen["controller-0001"] += 3600
+
+    tracker.async_sweep(time.monotonic() + 601)
+    await hass.async_block_till_done()
+
+    assert hass.states.get(pulse).state == STATE_UNAVAILABLE
+    assert hass.states.get(output).state == STATE_UNAVAILABLE
+    assert hass.states.get(other).state != STATE_UNAVAILABLE
+
+    mqtt_subscriptions.fire(
+        "CloudAge/controller-0000/OutTopic/pulses",
+        pulse_payload("controller-0000", 3, 1),
+    )
+    await hass.async_block_till_done()
+
+    assert hass.states.get(pulse).state != STATE_UNAVAILABLE
+    assert hass.states.get(output).state == "off"
+
+
+async def test_command_echoes_do_not_keep_a_controller_available(
+    hass, mqtt_subscriptions
+):
+    """Our own commands delivered back on the command topic are not telemetry."""
+    entry = await async_setup_fleet(hass, fleet_devices(1, meters=1))
+    registry = er.async_get(hass)
+    pulse = registry.async_get_entity_id(
+        "sensor", "smartcloudage", "smartcloudage_controller-0000_pulse_1"
+    )
+    tracker = entry.runtime_data.availability
+    tracker._last_seen["controller-0000"] -= 3600
+    encoder = CommandEncoder()
+
+    for topic, payload in (
+        encoder.rtc("controller-0000", "controller-0000", datetime.now()),
+        encoder.output("controller-0000", 0, 1),
+    ):
+        mqtt_subscriptions.fire(topic, payload)
+    await hass.async_block_till_done()
+    tracker.async_sweep(time.monotonic() + 1)
+    await hass.async_block_till_done()
+
+    assert hass.states.get(pulse).state == STATE_UNAVAILABLE
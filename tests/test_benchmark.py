@@ -0,0 +1,99 @@
+"""Micro-benchmarks of the SmartCloudAge MQTT ingestion hot path.
+
+Run with ``pytest -m benchmark -s``; the suite is excluded from the default run.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+import json
+import timeit
+
+import pytest
+
+from custom_components.smartcloudage import build_datetime_payload
+from custom_components.smartcloudage.commands import build_output_payload
+from custom_components.smartcloudage.encoder import CommandEncoder
+
+from .fleet import (
+    async_replay_frames,
+    async_setup_fleet,
+    fleet_devices,
+    fleet_frames,
+)
+
+pytestmark = pytest.mark.benchmark
+
+ROUNDS = 20
+
+
+@pytest.mark.parametrize("controllers", [10, 100, 1000])
+async def test_ingestion_throughput(hass, mqtt_subscriptions, controllers):
+    """Replay a synthetic fleet and report throughput, latency and writes."""
+    devices = fleet_devices(controllers, meters=4, outputs=10)
+    await async_setup_fleet(hass, devices, dedup_ttl=0)
+    frames = fleet_frames(devices, ROUNDS)
+
+    report = await async_replay_frames(
+        hass, mqtt_subscriptions, frames, allocation_sample=min(len(frames), 500)
+    )
+    print("\n" + report.summary(f"{controllers} controllers"))
+
+    assert report.frames == len(frames)
+    assert report.frames_decoded == len(frames)
+    assert report.frames_duplicate == 0
+    # Every pulse frame may write at most its four meters and two diagnostics,
+    # and every status frame at most its ten outputs.
+    assert report.writes_per_frame < 6
+
+
+async def test_steady_state_frames_do_not_write(hass, mqtt_subscriptions):
+    """Replaying identical frames must not produce new state writes."""
+    devices = fleet_devices(10)
+    await async_setup_fleet(hass, devices, dedup_ttl=0)
+    frames = fleet_frames(devices, 3)
+    await async_replay_frames(hass, mqtt_subscriptions, frames)
+
+    report = await async_replay_frames(
+        hass, mqtt_subscriptions, [frame for frame in frames if "status" in frame[0]]
+    )
+
+    assert report.frames_decoded == report.frames
+    assert report.frames_duplicate == 0
+    assert report.state_writes == 0
+
+
+def test_command_encoding():
+    """Compare template encoding with building and serializing dictionaries."""
+    encoder = CommandEncoder()
+    device_id = "controller-0001"
+    now = datetime.now()
+    number = 100_000
+
+    def dict_output():
+        return f"CloudAge/{device_id}", json.dumps(
+            build_output_payload(device_id, 7, 1)
+        )
+
+    def dict_rtc():
+        return f"CloudAge/{device_id}", json.dumps(
+            build_datetime_payload(device_id, device_id)
+        )
+
+    timings = {
+        "output json.dumps": timeit.timeit(dict_output, number=number),
+        "output template": timeit.timeit(
+            lambda: encoder.output(device_id, 7, 1), number=number
+        ),
+        "rtc json.dumps": timeit.timeit(dict_rtc, number=number),
+        "rtc template": timeit.timeit(
+            lambda: encoder.rtc(device_id, device_id, now), number=number
+        ),
+    }
+    print()
+    for label, elapsed in timings.items():
+        print(f"{label}: {elapsed / number * 1e6:.2f} us/command")
+
+    assert encoder.output(device_id, 7, 1) == dict_output()
+    assert timings["output template"] < timings["output json.dumps"]
+    assert timings["rtc template"] < timings["rtc json.dumps"]
@@ -0,0 +1,146 @@
+"""Tests for the CSV and YAML controller import."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.smartcloudage.bulk_import import (
+    BulkImportError,
+    merge_devices,
+    parse_devices,
+)
+
+YAML_FLEET = """
+devices:
+  - device_id: controller-20
+    alias: Torre 1
+    outputs: 10
+    signature: assinado
+    availability_timeout: 1800
+    meters:
+      - {channel: 4, name: Energia, type: energy, factor: 0.001, unit: kWh}
+  - device_id: controller-21
+"""
+
+
+def test_csv_rows_are_grouped_by_controller():
+    """Meter rows of the same controller build a single device."""
+    devices = parse_devices(
+        "device_id,alias,outputs,channel,name,type,factor\n"
+        "controller-20,Torre 1,16,1,Água,water,0.01\n"
+        "controller-20,,,2,Gás,gas,0.02\n",
+        "csv",
+    )
+
+    assert devices == [
+        {
+            "device_id": "controller-20",
+            "outputs": 16,
+            "alias": "Torre 1",
+            "meters": [
+                {
+                    "channel": 1,
+                    "name": "Água",
+                    "type": "water",
+                    "factor": 0.01,
+                    "offset": 0.0,
+                    "unit": "m³",
+                },
+                {
+                    "channel": 2,
+                    "name": "Gás",
+                    "type": "gas",
+                    "factor": 0.02,
+                    "offset": 0.0,
+                    "unit": "m³",
+                },
+            ],
+        }
+    ]
+
+
+def test_yaml_uses_the_options_format():
+    """YAML controllers keep their signature and default their alias."""
+    devices = parse_devices(YAML_FLEET, "yaml")
+
+    assert devices[0]["signature"] == "assinado"
+    assert devices[0]["availability_timeout"] == 1800
+    assert devices[0]["meters"][0]["type"] == "energy"
+    assert devices[1] == {
+        "device_id": "controller-21",
+        "outputs": 16,
+        "alias": "controller-21",
+        "meters": [],
+    }
+
+
+def test_every_error_is_reported_at_once():
+    """Validation continues after the first problem."""
+    with pytest.raises(BulkImportError) as err:
+        parse_devices(
+            "device_id,outputs,availability_timeout,channel,type,factor\n"
+            "controller-20,12,,1,water,0.01\n"
+            "controller-21,16,,1,water,0.01\n"
+            "controller-21,16,,1,water,0.01\n"
+            "controller-22,16,,17,steam,0.01\n"
+            "controller-23,16,,1,water,0.01\n"
+            "controller-24,16,-5,,,\n",
+            "csv",
+            {"controller-23"},
+        )
+
+    assert err.value.errors == [
+        "line 2: outputs must be 10 or 16",
+        "line 4: channel 1 is already used on controller-21",
+        "line 5: channel 17 is outside 1-16",
+        "line 5: unknown meter type 'steam'",
+        "line 6: controller controller-23 is already configured",
+        "line 7: availability_timeout must be zero or more seconds",
+    ]
+
+
+def test_csv_row_with_extra_fields_is_rejected():
+    """Fields beyond the header are an import error, not a crash."""
+    with pytest.raises(BulkImportError) as err:
+        parse_devices("device_id,alias\ncontroller-20,Torre 1,extra\n", "csv")
+
+    assert err.value.errors == ["line 2: more fields than header columns"]
+
+
+@pytest.mark.parametrize(
+    ("document", "error"),
+    [
+        (
+            "- device_id: controller-20\n  meters:\n    - {channel: 1, type: [water]}\n",
+            "item 1 meter 1: type must be text",
+        ),
+        (
+            "- device_id: controller-20\n  meters:\n    - {channel: 1, type: {a: 1}}\n",
+            "item 1 meter 1: type must be text",
+        ),
+        (
+            "- device_id: controller-20\n  meters:\n    - {channel: 1, unit: [m3]}\n",
+            "item 1 meter 1: unit must be text",
+        ),
+        ("- device_id: [controller-20]\n", "item 1: device_id must be text"),
+        ("- {device_id: controller-20, alias: {a: 1}}\n", "item 1: alias must be text"),
+        ("- device_id: controller-20\n  meters: {}\n", "item 1: meters must be a list"),
+    ],
+)
+def test_malformed_yaml_values_are_rejected(document, error):
+    """Lists, mappings and empty meter mappings are reported as import errors."""
+    with pytest.raises(BulkImportError) as err:
+        parse_devices(document, "yaml")
+
+    assert err.value.errors == [error]
+
+
+def test_merge_replaces_controllers_with_the_same_id():
+    """Imported controllers replace existing ones and keep the list order."""
+    merged = merge_devices(
+        [{"device_id": "a", "alias": "A"}, {"device_id": "b"}],
+        [{"device_id": "a", "alias": "Novo"}, {"device_id": "c"}],
+    )
+
+    assert [device["device_id"] for device in merged] == ["a", "b", "c"]
+    assert merged[0]["alias"] == "Novo"
@@ -0,0 +1,100 @@
+"""Tests for SmartCloudAge output command tracking."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.smartcloudage.commands import (
+    OUTPUT_MAX_RETRIES,
+    OutputCommandBatcher,
+)
+from custom_components.smartcloudage.stats import IntegrationStats
+
+
+async def _send(hass, value=1):
+    stats = IntegrationStats()
+    batcher = OutputCommandBatcher(hass, stats, window=0)
+    await batcher.async_set_outputs("controller-01", {3: value})
+    return batcher, stats
+
+
+async def test_ack_ignores_frames_with_another_state(hass):
+    """Only a status frame showing the requested state confirms a command."""
+    batcher, _ = await _send(hass)
+
+    batcher.async_outputs_received("controller-01", 0b0000)
+    assert batcher.in_flight("controller-01") == {3: 1}
+
+    batcher.async_outputs_received("controller-01", 0b1000)
+    assert batcher.in_flight("controller-01") == {}
+    batcher.async_cancel()
+
+
+async def test_unconfirmed_command_is_retried_then_expired(hass, mock_mqtt_publish):
+    """Commands without acknowledgement are resent and finally dropped."""
+    batcher, stats = await _send(hass)
+    # Every step is far beyond the back-off of the pending retry.
+    for step in range(1, OUTPUT_MAX_RETRIES + 2):
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=100 * step))
+        await hass.async_block_till_done()
+
+    assert mock_mqtt_publish.call_count == OUTPUT_MAX_RETRIES + 1
+    assert stats.commands_retried == OUTPUT_MAX_RETRIES
+    assert stats.commands_expired == 1
+    assert batcher.in_flight("controller-01") == {}
+
+
+async def test_failed_publish_is_not_tracked(hass, mock_mqtt_publish):
+    """A command that could not be published raises and is not awaited for ack."""
+    mock_mqtt_publish.side_effect = HomeAssistantError("broker offline")
+    batcher = OutputCommandBatcher(hass, window=0)
+
+    with pytest.raises(HomeAssistantError):
+        await batcher.async_set_outputs("controller-01", {0: 1})
+
+    assert batcher.in_flight("controller-01") == {}
+
+
+async def test_removed_controller_fails_waiting_callers(hass, mock_mqtt_publish):
+    """Dropping a batch raises an error in its callers instead of cancelling them."""
+    batcher = OutputCommandBatcher(hass, IntegrationStats(), window=60)
+    task = hass.async_create_task(batcher.async_set_outputs("controller-01", {0: 1}))
+    await asyncio.sleep(0)
+
+    batcher.async_cancel_device("controller-01")
+
+    with pytest.raises(HomeAssistantError, match="controller removed"):
+        await task
+    assert not task.cancelled()
+    mock_mqtt_publish.assert_not_called()
+
+
+async def test_controller_removed_while_publishing_is_not_tracked(
+    hass, mock_mqtt_publish
+):
+    """A batch dropped mid-publish fails its callers and arms no retries."""
+    batcher = OutputCommandBatcher(hass, IntegrationStats(), window=0)
+    release = asyncio.Event()
+    publishing = asyncio.Event()
+
+    async def slow_publish(*args):
+        publishing.set()
+        await release.wait()
+
+    mock_mqtt_publish.side_effect = slow_publish
+    task = hass.async_create_task(batcher.async_set_outputs("controller-01", {2: 1}))
+    await asyncio.wait_for(publishing.wait(), timeout=1)
+
+    batcher.async_cancel_device("controller-01")
+    release.set()
+
+    with pytest.raises(HomeAssistantError, match="controller removed"):
+        await task
+    await hass.async_block_till_done()
+    assert batcher.in_flight("controller-01") == {}
@@ -5,16 +5,32 @@ from __future__ import annotations
 from homeassistant import config_entries
 from homeassistant.data_entry_flow import FlowResultType
 
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
 from custom_components.smartcloudage.config_flow import DOMAIN
 
+FLEET_CSV = """device_id,alias,outputs,channel,name,type,factor
+controller-10,Bloco A,16,1,Água A,water,0.01
+controller-10,,,2,Gás A,gas,0.01
+controller-11,Bloco B,10,,,,
+"""
 
-async def test_user_flow_without_meter(hass):
-    """A controller can be configured without a pulse meter."""
+
+async def _start_controller_flow(hass):
     result = await hass.config_entries.flow.async_init(
         DOMAIN, context={"source": config_entries.SOURCE_USER}
     )
+    assert result["type"] is FlowResultType.MENU
+    return await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "controller"}
+    )
+
+
+async def test_user_flow_without_meter(hass):
+    """A controller can be configured without a pulse meter."""
+    result = await _start_controller_flow(hass)
     assert result["type"] is FlowResultType.FORM
-    assert result["step_id"] == "user"
+    assert result["step_id"] == "controller"
 
     result = await hass.config_entries.flow.async_configure(
         result["flow_id"],
@@ -33,9 +49,7 @@ async def test_user_flow_without_meter(hass):
 
 async def test_meter_rejects_non_positive_factor(hass):
     """A zero conversion factor is invalid."""
-    result = await hass.config_entries.flow.async_init(
-        DOMAIN, context={"source": config_entries.SOURCE_USER}
-    )
+    result = await _start_controller_flow(hass)
     result = await hass.config_entries.flow.async_configure(
         result["flow_id"],
         {
@@ -64,9 +78,7 @@ async def test_meter_rejects_non_positive_factor(hass):
 
 async def test_meter_rejects_duplicate_channel(hass):
     """Two meters cannot consume the same physical input channel."""
-    result = await hass.config_entries.flow.async_init(
-        DOMAIN, context={"source": config_entries.SOURCE_USER}
-    )
+    result = await _start_controller_flow(hass)
     result = await hass.config_entries.flow.async_configure(
         result["flow_id"],
         {
@@ -96,3 +108,121 @@ async def test_meter_rejects_duplicate_channel(hass):
 
     assert result["type"] is FlowResultType.FORM
     assert result["errors"] == {"channel": "channel_already_configured"}
+
+
+async def test_bulk_import_creates_one_fleet_entry(hass):
+    """A CSV fleet becomes a single entry holding every controller."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "bulk_import"}
+    )
+    assert result["step_id"] == "bulk_import"
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {"title": "Condomínio", "format": "csv", "devices": FLEET_CSV},
+    )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["title"] == "Condomínio"
+    devices = result["options"]["devices"]
+    assert [device["device_id"] for device in devices] == [
+        "controller-10",
+        "controller-11",
+    ]
+    assert [meter["channel"] for meter in devices[0]["meters"]] == [1, 2]
+
+
+async def test_bulk_import_reports_every_error(hass):
+    """Invalid rows and controllers of other entries are reported together."""
+    MockConfigEntry(
+        domain=DOMAIN, data={"devices": [{"device_id": "controller-11"}]}
+    ).add_to_hass(hass)
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "bulk_import"}
+    )
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {
+            "title": "Condomínio",
+            "format": "csv",
+            "devices": FLEET_CSV.replace("0.01\ncontroller-10,,,2", "0\ncontroller-10,,,2"),
+        },
+    )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"devices": "invalid_import"}
+    details = result["description_placeholders"]["details"]
+    assert "line 2: factor must be greater than zero" in details
+    assert "controller controller-11 is already configured" in details
+
+
+async def test_options_flow_edits_the_selected_controller(hass):
+    """Meters are added to the controller chosen in a multi-controller entry."""
+    devices = [
+        {"device_id": "controller-10", "outputs": 16, "alias": "A", "meters": []},
+        {"device_id": "controller-11", "outputs": 16, "alias": "B", "meters": []},
+    ]
+    entry = MockConfigEntry(domain=DOMAIN, data={"devices": devices})
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"next_step_id": "add_meter"}
+    )
+    assert result["step_id"] == "select_device"
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"device": 1}
+    )
+    assert result["step_id"] == "add_meter"
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            "channel": 3,
+            "name": "Energia B",
+            "type": "energy",
+            "factor": 0.001,
+            "offset": 0,
+            "unit": "kWh",
+        },
+    )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["data"]["devices"][0]["meters"] == []
+    assert result["data"]["devices"][1]["meters"][0]["channel"] == 3
+
+
+async def test_options_flow_searches_large_fleets(hass):
+    """Large entries show one page of controllers and can be searched."""
+    devices = [
+        {"device_id": f"controller-{index:03d}", "alias": f"Bloco {index}", "meters": []}
+        for index in range(300)
+    ]
+    entry = MockConfigEntry(domain=DOMAIN, data={"devices": devices})
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"next_step_id": "edit_meter"}
+    )
+    assert result["step_id"] == "select_device"
+    assert result["description_placeholders"]["total"] == "300"
+    assert result["description_placeholders"]["last"] == "20"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"search": "controller-287", "page": 1}
+    )
+    assert result["step_id"] == "select_device"
+    assert result["description_placeholders"]["total"] == "1"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"search": "controller-287", "page": 1, "device": 287}
+    )
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "no_meters_configured"
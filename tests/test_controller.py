@@ -0,0 +1,78 @@
+"""Tests for the compact SmartCloudAge controller state."""
+
+from __future__ import annotations
+
+from custom_components.smartcloudage.controller import (
+    ControllerState,
+    build_controller_states,
+)
+
+
+def test_pulse_accumulator_handles_wraparound_and_reset():
+    """Counter drops are read as a 32-bit wraparound or as a reset from zero."""
+    controller = ControllerState("controller-01")
+
+    assert controller.set_pulse(3, 100) == 100
+    assert controller.set_pulse(3, 150) == 150
+    assert controller.set_pulse(3, 0xFFFF_FFFF) == 0xFFFF_FFFF
+    # A drop larger than half the counter range is a wraparound.
+    assert controller.set_pulse(3, 4) == 0xFFFF_FFFF + 5
+    # A small drop is a reset; the counter restarted from zero.
+    assert controller.set_pulse(3, 2) == 0xFFFF_FFFF + 7
+
+
+def test_reported_restart_turns_a_large_drop_into_a_reset():
+    """After a reboot any counter drop restarts from zero."""
+    controller = ControllerState("controller-01")
+    controller.set_pulse(1, 0xF000_0000)
+
+    controller.mark_restarted()
+
+    assert controller.set_pulse(1, 10) == 0xF000_0000 + 10
+    assert controller.raw_pulse(1) == 10
+
+
+def test_pulse_accumulators_round_trip():
+    """Exported accumulators restore the same totals and raw counters."""
+    controller = ControllerState("controller-01")
+    controller.set_pulse(2, 50)
+    controller.set_pulse(16, 7)
+
+    restored = ControllerState("controller-01")
+    restored.restore_pulses(controller.export_pulses())
+
+    assert restored.pulse(2) == 50
+    assert restored.pulse(16) == 7
+    assert restored.pulse(1) is None
+    assert restored.set_pulse(2, 60) == 60
+
+
+def test_state_snapshot_round_trip():
+    """Outputs, diagnostics and accumulators survive an export and restore."""
+    controller = ControllerState("controller-01")
+    controller.set_pulse(3, 42)
+    controller.outputs = 0b1010
+    controller.rssi = -61
+    controller.uptime = 3600
+
+    restored = ControllerState("controller-01")
+    restored.restore_state(controller.export_state())
+
+    assert restored.pulse(3) == 42
+    assert restored.outputs == 0b1010
+    assert (restored.rssi, restored.uptime) == (-61, 3600)
+    assert ControllerState("controller-02").export_state() == {}
+
+
+def test_build_controller_states_skips_duplicates():
+    """Each controller ID gets exactly one state record."""
+    controllers = build_controller_states(
+        [
+            {"device_id": "a", "alias": "Sala"},
+            {"device_id": "a", "alias": "Outro"},
+            {"alias": "sem id"},
+        ]
+    )
+
+    assert list(controllers) == ["a"]
+    assert controllers["a"].device_info["name"] == "SmartCloudAge Sala"
@@ -0,0 +1,98 @@
+"""Tests for SmartCloudAge telemetry decoding."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from custom_components.smartcloudage.decoder import TelemetryDecoder, decode_payload
+
+
+def _pulse_payload(**overrides) -> bytes:
+    payload = {
+        "message": "PULSE_SENSOR",
+        "device": "controller-01",
+        "Wifi_db": -72,
+        "uptime": 3121,
+        "Pulses": [{"Sensor": 9, "lsb": 208, "msb": 1}],
+    }
+    payload.update(overrides)
+    return json.dumps(payload).encode()
+
+
+def test_decode_payload_unwraps_double_encoded_message():
+    """Status frames may carry a JSON document inside the message field."""
+    payload = json.dumps(
+        {"device": "controller-01", "message": json.dumps({"Output": {"Outputs": 5}})}
+    )
+
+    assert decode_payload(payload)["Output"] == {"Outputs": 5}
+
+
+def test_fast_path_extracts_pulse_frame():
+    """The firmware pulse layout yields channels, 32-bit counters and diagnostics."""
+    frame = TelemetryDecoder().decode("controller-01", _pulse_payload())
+
+    assert frame.message_type == "PULSE_SENSOR"
+    assert frame.pulses == [(9, 65744)]
+    assert frame.rssi == -72
+    assert frame.uptime == 3121
+
+
+def test_generic_path_handles_string_values():
+    """Frames with textual numbers fall back to the tolerant parser."""
+    frame = TelemetryDecoder().decode(
+        "controller-01",
+        _pulse_payload(
+            message="pulse_sensor",
+            Pulses=[{"Sensor": "9", "lsb": "70000", "msb": "0"}],
+        ),
+    )
+
+    assert frame.message_type == "PULSE_SENSOR"
+    assert frame.pulses == [(9, 70000 & 0xFFFF)]
+
+
+def test_key_spelling_is_cached_per_controller():
+    """Once a firmware spelling is known, other spellings are no longer probed."""
+    decoder = TelemetryDecoder()
+    first = decoder.decode("controller-01", json.dumps({"RSSI": -60, "Uptime": 10}))
+    second = decoder.decode(
+        "controller-01", json.dumps({"RSSI": -61, "rssi": -99, "Uptime": 20})
+    )
+    other = decoder.decode("controller-02", json.dumps({"rssi": -50}))
+
+    assert (first.rssi, first.uptime) == (-60, 10)
+    assert (second.rssi, second.uptime) == (-61, 20)
+    assert other.rssi == -50
+
+
+def test_alternating_spellings_are_reprobed():
+    """A frame spelling a field differently from the cached key is still read."""
+    decoder = TelemetryDecoder()
+    pulse = decoder.decode("controller-01", _pulse_payload(Wifi_db=-70))
+    status = decoder.decode("controller-01", json.dumps({"RSSI": -65, "Uptime": 40}))
+    again = decoder.decode("controller-01", _pulse_payload(Wifi_db=-71))
+    missing = decoder.decode("controller-01", json.dumps({"Output": {"Outputs": 1}}))
+
+    assert pulse.rssi == -70
+    assert (status.rssi, status.uptime) == (-65, 40)
+    assert again.rssi == -71
+    assert (missing.rssi, missing.uptime) == (None, None)
+
+
+def test_status_frame_exposes_output_mask():
+    """Output status frames expose the bitmask as an integer."""
+    frame = TelemetryDecoder().decode(
+        "controller-01", json.dumps({"message": "STATUS", "Output": {"Outputs": "12"}})
+    )
+
+    assert frame.outputs == 12
+    assert frame.pulses is None
+
+
+def test_invalid_payload_raises_value_error():
+    """Non-object payloads are rejected."""
+    with pytest.raises(ValueError):
+        TelemetryDecoder().decode("controller-01", b"[1, 2]")
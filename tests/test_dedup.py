@@ -0,0 +1,39 @@
+"""Tests for the duplicate frame detection."""
+
+from __future__ import annotations
+
+from custom_components.smartcloudage.dedup import FrameDeduplicator
+
+TOPIC = "CloudAge/controller-01/OutTopic/status"
+
+
+def test_repeated_frame_is_a_duplicate_until_it_expires():
+    """Duplicates within the TTL are detected and do not extend it."""
+    dedup = FrameDeduplicator(ttl=1.0)
+
+    assert dedup.is_duplicate("controller-01", TOPIC, b"a", 0.0) is False
+    assert dedup.is_duplicate("controller-01", TOPIC, b"a", 0.5) is True
+    assert dedup.is_duplicate("controller-01", TOPIC, b"a", 0.9) is True
+    assert dedup.is_duplicate("controller-01", TOPIC, b"a", 1.0) is False
+
+
+def test_frames_are_kept_per_controller_and_topic():
+    """The same payload on another topic or controller is not a duplicate."""
+    dedup = FrameDeduplicator()
+
+    assert dedup.is_duplicate("controller-01", TOPIC, b"a", 0.0) is False
+    assert dedup.is_duplicate("controller-01", "CloudAge/controller-01/x", b"a", 0.0) is False
+    assert dedup.is_duplicate("controller-02", TOPIC, b"a", 0.0) is False
+
+
+def test_oldest_frame_is_evicted_and_forget_resets():
+    """Each controller remembers only its latest frames."""
+    dedup = FrameDeduplicator(size=2)
+    for payload in (b"a", b"b", b"c"):
+        dedup.is_duplicate("controller-01", TOPIC, payload, 0.0)
+
+    assert dedup.is_duplicate("controller-01", TOPIC, b"a", 0.1) is False
+    assert dedup.is_duplicate("controller-01", TOPIC, b"c", 0.1) is True
+
+    dedup.forget("controller-01")
+    assert dedup.is_duplicate("controller-01", TOPIC, b"c", 0.2) is False
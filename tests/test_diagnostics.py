@@ -0,0 +1,60 @@
+"""Tests for SmartCloudAge config entry diagnostics."""
+
+from __future__ import annotations
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+from homeassistant.core import CoreState
+
+from custom_components.smartcloudage.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+from .fleet import async_setup_fleet, fleet_devices, pulse_payload
+
+
+async def test_diagnostics_report_hot_path_counters(hass, mqtt_subscriptions):
+    """Diagnostics expose the frame and state-write counters of the entry."""
+    entry = await async_setup_fleet(hass, fleet_devices(2, meters=2))
+    mqtt_subscriptions.fire(
+        "CloudAge/controller-0000/OutTopic/pulses",
+        pulse_payload("controller-0000", 1, 2),
+    )
+    mqtt_subscriptions.fire("CloudAge/controller-0001/OutTopic/status", b"{bad")
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    stats = diagnostics["stats"]
+    assert stats["frames_received"] == 2
+    assert stats["frames_decoded"] == 1
+    assert stats["frames_invalid"] == 1
+    assert stats["state_writes"] > 0
+    assert [device["meters"] for device in diagnostics["devices"]] == [2, 2]
+    assert set(diagnostics["rtc"]["sync_intervals"]) == {
+        "controller-0000",
+        "controller-0001",
+    }
+
+
+async def test_deferred_startup_subscribes_after_home_assistant_started(
+    hass, mqtt_subscriptions
+):
+    """Deferred entries subscribe once started and report their setup timings."""
+    hass.set_state(CoreState.starting)
+    entry = await async_setup_fleet(
+        hass, fleet_devices(2, meters=1), options={"defer_startup": True}
+    )
+    assert not entry.runtime_data.dispatcher._subscriptions
+
+    hass.set_state(CoreState.running)
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+
+    assert len(entry.runtime_data.dispatcher._subscriptions) == 2
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert set(diagnostics["stats"]["setup_timings"]) == {
+        "storage",
+        "platforms",
+        "subscribe",
+        "total",
+    }
@@ -0,0 +1,393 @@
+"""Tests for the shared SmartCloudAge MQTT dispatcher."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+from custom_components.smartcloudage.dispatcher import (
+    FLEET_TOPIC,
+    SmartCloudAgeDispatcher,
+)
+
+from .fleet import async_setup_fleet, fleet_devices, fleet_frames
+
+
+def _message(topic: str, payload) -> Mock:
+    if not isinstance(payload, (bytes, str)):
+        payload = json.dumps(payload).encode()
+    return Mock(topic=topic, payload=payload)
+
+
+def test_pulse_frame_is_routed_to_diagnostic_and_pulse_handlers(hass):
+    """A pulse frame reaches both sensor handlers after a single decode."""
+    dispatcher = SmartCloudAgeDispatcher(hass)
+    diagnostic, pulse, output = Mock(), Mock(), Mock()
+    dispatcher.async_register_diagnostic_handler("controller-01", diagnostic)
+    dispatcher.async_register_pulse_handler("controller-01", pulse)
+    dispatcher.async_register_output_handler("controller-01", output)
+
+    dispatcher._async_message_received(
+        _message(
+            "CloudAge/controller-01/OutTopic/pulses",
+            {"message": "pulse_sensor", "Wifi_db": -70, "Pulses": []},
+        )
+    )
+
+    assert diagnostic.call_count == 1
+    assert pulse.call_count == 1
+    output.assert_not_called()
+
+
+def test_output_frame_is_routed_with_integer_mask(hass):
+    """Output status frames deliver the decoded bitmask."""
+    dispatcher = SmartCloudAgeDispatcher(hass)
+    output = Mock()
+    dispatcher.async_register_output_handler("controller-01", output)
+
+    dispatcher._async_message_received(
+        _message("Product/controller-01/OutTopic/status", {"Output": {"Outputs": "6"}})
+    )
+
+    output.assert_called_once_with("controller-01", 6)
+
+
+def test_unknown_controller_and_input_status_are_ignored(hass):
+    """Frames of other controllers and INPUT_STATUS never reach output handlers."""
+    dispatcher = SmartCloudAgeDispatcher(hass)
+    output = Mock()
+    dispatcher.async_register_output_handler("controller-01", output)
+
+    dispatcher._async_message_received(
+        _message("CloudAge/other/OutTopic/status", {"Output": {"Outputs": 1}})
+    )
+    dispatcher._async_message_received(
+        _message(
+            "CloudAge/controller-01/OutTopic/status",
+            {"message": "INPUT_STATUS", "Output": {"Outputs": 1}},
+        )
+    )
+
+    output.assert_not_called()
+
+
+def test_invalid_json_is_logged(hass, caplog):
+    """Malformed frames are reported without reaching any handler."""
+    dispatcher = SmartCloudAgeDispatcher(hass)
+    diagnostic = Mock()
+    dispatcher.async_register_diagnostic_handler("controller-01", diagnostic)
+
+    dispatcher._async_message_received(
+        _message("CloudAge/controller-01/OutTopic/pulses", b"{not json")
+    )
+
+    diagnostic.assert_not_called()
+    assert "Invalid SmartCloudAge payload" in caplog.text
+
+
+def test_repeated_invalid_payloads_are_logged_once(hass, caplog):
+    """A controller flooding malformed frames is logged once per window."""
+    dispatcher = SmartCloudAgeDispatcher(hass)
+    dispatcher.async_register_diagnostic_handler("controller-01", Mock())
+
+    for index in range(50):
+        dispatcher._async_message_received(
+            _message("CloudAge/controller-01/OutTopic/pulses", b"{not json %d" % index)
+        )
+
+    assert dispatcher.stats.frames_invalid == 50
+    assert caplog.text.count("Invalid SmartCloudAge payload") == 1
+
+
+async def test_fleet_mode_uses_a_single_wildcard_subscription(hass):
+    """Fleet mode subscribes once regardless of the number of controllers."""
+    dispatcher = SmartCloudAgeDispatcher(hass, fleet_mode=True)
+    for index in range(3):
+        dispatcher.async_register_output_handler(f"controller-{index}", Mock())
+
+    with patch(
+        "custom_components.smartcloudage.dispatcher.mqtt.async_subscribe",
+        new_callable=AsyncMock,
+    ) as subscribe:
+        await dispatcher.async_subscribe()
+
+    subscribe.assert_awaited_once()
+    assert subscribe.await_args.args[1] == FLEET_TOPIC
+
+
+async def test_per_controller_mode_subscribes_each_controller_once(hass):
+    """Without fleet mode every controller gets exactly one subscription."""
+    dispatcher = SmartCloudAgeDispatcher(hass)
+    dispatcher.async_register_diagnostic_handler("controller-01", Mock())
+    dispatcher.async_register_output_handler("controller-01", Mock())
+
+    with patch(
+        "custom_components.smartcloudage.dispatcher.mqtt.async_subscribe",
+        new_callable=AsyncMock,
+    ) as subscribe:
+        await dispatcher.async_subscribe()
+
+    subscribe.assert_awaited_once()
+    assert subscribe.await_args.args[1] == "+/controller-01/#"
+
+
+async def test_per_controller_subscriptions_are_requested_concurrently(hass):
+    """Every controller subscription is in flight before the first completes."""
+    dispatcher = SmartCloudAgeDispatcher(hass)
+    for device_id in ("controller-01", "controller-02", "controller-03"):
+        dispatcher.async_register_output_handler(device_id, Mock())
+    release = asyncio.Event()
+    all_pending = asyncio.Event()
+    pending = []
+
+    async def slow_subscribe(hass, topic, callback, **kwargs):
+        pending.append(topic)
+        if len(pending) == 3:
+            all_pending.set()
+        await release.wait()
+        return Mock()
+
+    with patch(
+        "custom_components.smartcloudage.dispatcher.mqtt.async_subscribe",
+        side_effect=slow_subscribe,
+    ):
+        task = hass.async_create_task(dispatcher.async_subscribe())
+        # Only reachable when all three requests wait at the same time.
+        await asyncio.wait_for(all_pending.wait(), timeout=1)
+        release.set()
+        await task
+
+    assert len(pending) == 3
+
+
+def test_unknown_controller_is_dropped_before_decoding(hass):
+    """Fleet wildcard traffic from unconfigured controllers is never parsed."""
+    dispatcher = SmartCloudAgeDispatcher(hass, fleet_mode=True)
+    dispatcher.async_register_output_handler("controller-01", Mock())
+
+    with patch(
+        "custom_components.smartcloudage.dispatcher.TelemetryDecoder.decode"
+    ) as decode:
+        dispatcher._async_message_received(
+            _message("CloudAge/controller-99/OutTopic/status", b"{}")
+        )
+
+    decode.assert_not_called()
+
+
+def test_frame_counters(hass):
+    """Every frame is counted as decoded, unknown or invalid."""
+    dispatcher = SmartCloudAgeDispatcher(hass)
+    dispatcher.async_register_diagnostic_handler("controller-01", Mock())
+
+    dispatcher._async_message_received(
+        _message("CloudAge/controller-01/OutTopic/status", {"uptime": 10})
+    )
+    dispatcher._async_message_received(
+        _message("CloudAge/other/OutTopic/status", {"uptime": 10})
+    )
+    dispatcher._async_message_received(
+        _message("CloudAge/controller-01/OutTopic/status", b"{not json")
+    )
+
+    stats = dispatcher.stats
+    assert stats.frames_received == 3
+    assert stats.frames_decoded == 1
+    assert stats.frames_unknown_device == 1
+    assert stats.frames_invalid == 1
+
+
+async def test_removed_controller_is_unsubscribed_and_unrouted(hass):
+    """Removing a controller drops its subscription and handlers only."""
+    dispatcher = SmartCloudAgeDispatcher(hass)
+    kept, removed = Mock(), Mock()
+    dispatcher.async_register_output_handler("controller-01", kept)
+    dispatcher.async_register_output_handler("controller-02", removed)
+    unsubscribe = Mock()
+
+    with patch(
+        "custom_components.smartcloudage.dispatcher.mqtt.async_subscribe",
+        new_callable=AsyncMock,
+        return_value=unsubscribe,
+    ):
+        await dispatcher.async_subscribe()
+        dispatcher.async_remove_device("controller-02")
+
+    unsubscribe.assert_called_once_with()
+    dispatcher._async_message_received(
+        _message("CloudAge/controller-02/OutTopic/status", {"Output": {"Outputs": 1}})
+    )
+    removed.assert_not_called()
+    assert dispatcher.stats.frames_unknown_device == 1
+
+
+async def test_burst_is_queued_and_coalesced_per_topic(hass):
+    """Frames beyond the budget wait in the queue; the newest frame per topic wins."""
+    dispatcher = SmartCloudAgeDispatcher(hass, budget=0)
+    outputs = Mock()
+    dispatcher.async_register_output_handler("controller-01", outputs)
+    dispatcher.async_register_output_handler("controller-02", outputs)
+
+    for mask in (1, 2, 3, 4):
+        dispatcher._async_message_received(
+            _message("CloudAge/controller-01/OutTopic/status", {"Output": {"Outputs": mask}})
+        )
+    dispatcher._async_message_received(
+        _message("CloudAge/controller-02/OutTopic/status", {"Output": {"Outputs": 9}})
+    )
+
+    assert outputs.call_count == 1
+    assert dispatcher.pending == 2
+    await hass.async_block_till_done()
+
+    assert [call.args for call in outputs.call_args_list] == [
+        ("controller-01", 1),
+        ("controller-01", 4),
+        ("controller-02", 9),
+    ]
+    assert dispatcher.stats.frames_coalesced == 2
+    assert dispatcher.stats.ingest_queue_peak == 2
+    assert dispatcher.pending == 0
+
+
+async def test_status_frame_does_not_replace_a_queued_pulse_frame(hass):
+    """Pulse and status frames sharing a topic are coalesced separately."""
+    dispatcher = SmartCloudAgeDispatcher(hass, budget=0)
+    pulse, outputs = Mock(), Mock()
+    dispatcher.async_register_pulse_handler("controller-01", pulse)
+    dispatcher.async_register_output_handler("controller-01", outputs)
+    topic = "CloudAge/controller-01/OutTopic"
+
+    dispatcher._async_message_received(_message(topic, {"Output": {"Outputs": 1}}))
+    for sequence in (1, 2):
+        dispatcher._async_message_received(
+            _message(
+                topic,
+                {
+                    "message": "PULSE_SENSOR",
+                    "Pulses": [{"Sensor": 1, "lsb": sequence, "msb": 0}],
+                },
+            )
+        )
+    dispatcher._async_message_received(_message(topic, {"Output": {"Outputs": 2}}))
+    dispatcher._async_message_received(_message(topic, {"Output": {"Outputs": 3}}))
+
+    assert dispatcher.pending == 2
+    await hass.async_block_till_done()
+
+    assert pulse.call_count == 1
+    assert pulse.call_args.args[1].pulses == [(1, 2)]
+    assert [call.args for call in outputs.call_args_list] == [
+        ("controller-01", 1),
+        ("controller-01", 3),
+    ]
+    assert dispatcher.stats.frames_coalesced == 2
+
+
+async def test_event_frames_are_queued_in_order_without_replacing(hass):
+    """INPUT_STATUS frames never replace a queued output status or each other."""
+    dispatcher = SmartCloudAgeDispatcher(hass, budget=0)
+    diagnostic, outputs = Mock(), Mock()
+    dispatcher.async_register_diagnostic_handler("controller-01", diagnostic)
+    dispatcher.async_register_output_handler("controller-01", outputs)
+    topic = "CloudAge/controller-01/OutTopic/status"
+
+    dispatcher._async_message_received(_message(topic, {"Output": {"Outputs": 0}}))
+    dispatcher._async_message_received(_message(topic, {"Output": {"Outputs": 5}}))
+    for inputs in (1, 2):
+        dispatcher._async_message_received(
+            _message(
+                topic,
+                {"message": "INPUT_STATUS", "Output": {"Outputs": 0}, "Inputs": inputs},
+            )
+        )
+
+    assert dispatcher.pending == 3
+    await hass.async_block_till_done()
+
+    assert [call.args for call in outputs.call_args_list] == [
+        ("controller-01", 0),
+        ("controller-01", 5),
+    ]
+    assert [
+        call.args[1].data.get("Inputs") for call in diagnostic.call_args_list
+    ] == [None, None, 1, 2]
+    assert dispatcher.stats.frames_coalesced == 0
+
+
+async def test_full_queue_drops_frames_of_new_topics(hass):
+    """A full queue still coalesces queued topics but drops new ones."""
+    dispatcher = SmartCloudAgeDispatcher(hass, budget=0, queue_size=1)
+    outputs = Mock()
+    for device_id in ("controller-01", "controller-02", "controller-03"):
+        dispatcher.async_register_output_handler(device_id, outputs)
+
+    for mask, device_id in enumerate(
+        ("controller-01", "controller-02", "controller-03", "controller-02")
+    ):
+        dispatcher._async_message_received(
+            _message(f"CloudAge/{device_id}/OutTopic/status", {"Output": {"Outputs": mask}})
+        )
+    await hass.async_block_till_done()
+
+    assert [call.args[0] for call in outputs.call_args_list] == [
+        "controller-01",
+        "controller-02",
+    ]
+    assert dispatcher.stats.frames_dropped == 1
+    assert dispatcher.stats.frames_coalesced == 1
+
+
+def test_duplicate_frames_are_dropped_before_decoding(hass):
+    """A repeated frame is counted and never reaches the decoder."""
+    dispatcher = SmartCloudAgeDispatcher(hass)
+    outputs = Mock()
+    dispatcher.async_register_output_handler("controller-01", outputs)
+    frame = _message("CloudAge/controller-01/OutTopic/status", {"Output": {"Outputs": 1}})
+
+    dispatcher._async_message_received(frame)
+    with patch(
+        "custom_components.smartcloudage.dispatcher.TelemetryDecoder.decode"
+    ) as decode:
+        dispatcher._async_message_received(frame)
+    decode.assert_not_called()
+
+    dispatcher.async_forget_frames("controller-01")
+    dispatcher._async_message_received(frame)
+
+    assert outputs.call_count == 2
+    assert dispatcher.stats.frames_duplicate == 1
+    assert dispatcher.stats.frames_decoded == 2
+
+
+def test_zero_dedup_ttl_decodes_every_frame(hass):
+    """With a zero TTL repeated frames are decoded like new ones."""
+    dispatcher = SmartCloudAgeDispatcher(hass, dedup_ttl=0)
+    outputs = Mock()
+    dispatcher.async_register_output_handler("controller-01", outputs)
+    frame = _message("CloudAge/controller-01/OutTopic/status", {"Output": {"Outputs": 1}})
+
+    for _ in range(3):
+        dispatcher._async_message_received(frame)
+
+    assert outputs.call_count == 3
+    assert dispatcher.stats.frames_duplicate == 0
+    assert dispatcher.stats.frames_decoded == 3
+
+
+async def test_redelivered_fleet_frames_are_counted_as_duplicates(
+    hass, mqtt_subscriptions
+):
+    """Redelivered frames are counted apart from decoded frames."""
+    entry = await async_setup_fleet(hass, fleet_devices(3, meters=2))
+    frames = fleet_frames(fleet_devices(3, meters=2), 3)
+
+    for _ in range(2):
+        for topic, payload in frames:
+            mqtt_subscriptions.fire(topic, payload)
+    await hass.async_block_till_done()
+
+    stats = entry.runtime_data.stats
+    assert stats.frames_decoded == len(frames)
+    assert stats.frames_duplicate == len(frames)
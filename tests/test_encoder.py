@@ -0,0 +1,70 @@
+"""Tests for the pre-serialized SmartCloudAge command encoder."""
+
+from __future__ import annotations
+
+from datetime import datetime
+import json
+
+from custom_components.smartcloudage.encoder import CommandEncoder
+
+NOW = datetime(2026, 7, 29, 21, 10, 5)
+
+
+def _output_dict(device_id, output_id, value):
+    return {
+        "command": 11,
+        "type": 1,
+        "signature": device_id,
+        "payload": {"id": output_id + 1, "value": value},
+    }
+
+
+def _rtc_dict(signature, now):
+    return {
+        "command": 9,
+        "payload": {
+            "datetime": {
+                "day": now.day,
+                "mon": now.month,
+                "year": now.year,
+                "hour": now.hour,
+                "min": now.minute,
+                "sec": now.second,
+            }
+        },
+        "type": 1,
+        "signature": signature,
+    }
+
+
+def test_output_command_matches_json_dumps():
+    """Output payloads are byte-identical to the generic serializer."""
+    encoder = CommandEncoder()
+
+    for device_id in ("controller-01", 'sala "Ação"'):
+        for output_id in (0, 15):
+            for value in (0, 1):
+                topic, payload = encoder.output(device_id, output_id, value)
+                assert topic == f"CloudAge/{device_id}"
+                assert payload == json.dumps(_output_dict(device_id, output_id, value))
+
+
+def test_rtc_command_matches_json_dumps():
+    """RTC payloads are byte-identical to the generic serializer."""
+    encoder = CommandEncoder()
+
+    topic, payload = encoder.rtc("controller-01", "signed-device", NOW)
+
+    assert topic == "CloudAge/controller-01"
+    assert payload == json.dumps(_rtc_dict("signed-device", NOW))
+
+
+def test_generic_command_uses_cached_topic():
+    """Commands without a template still reuse the controller topic."""
+    encoder = CommandEncoder()
+    command = {"command": 3, "type": 0, "signature": "controller-01"}
+
+    assert encoder.encode("controller-01", command) == (
+        "CloudAge/controller-01",
+        json.dumps(command),
+    )
@@ -0,0 +1,100 @@
+"""Tests for the per-controller log limiter."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from unittest.mock import Mock
+
+from custom_components.smartcloudage.log_limiter import LogLimiter
+
+
+def _limiter(interval=60.0):
+    logger = Mock(spec=logging.Logger)
+    logger.isEnabledFor.return_value = True
+    return logger, LogLimiter(logger, interval)
+
+
+def test_repeats_are_counted_and_summarized():
+    """Only the first message of a window is logged; the rest are summarized."""
+    logger, limiter = _limiter()
+
+    assert limiter.log(logging.WARNING, "controller-01", "invalid payload", "bad %s", 1, now=0.0)
+    for second in range(1, 50):
+        assert not limiter.log(
+            logging.WARNING, "controller-01", "invalid payload", "bad %s", 1, now=second
+        )
+    assert logger.log.call_count == 1
+
+    assert limiter.log(logging.WARNING, "controller-01", "invalid payload", "bad %s", 2, now=60.0)
+    assert logger.log.call_args_list[1].args == (
+        logging.WARNING,
+        "%d more %s messages from SmartCloudAge %s in %.0f s",
+        49,
+        "invalid payload",
+        "controller-01",
+        60.0,
+    )
+    assert logger.log.call_args_list[2].args == (logging.WARNING, "bad %s", 2)
+
+
+async def test_summary_is_logged_when_a_burst_stops():
+    """A timer reports the suppressed count even without a later occurrence."""
+    logger, limiter = _limiter(interval=0.01)
+
+    for _ in range(3):
+        limiter.warning("controller-01", "invalid payload", "bad")
+    assert logger.log.call_count == 1
+    await asyncio.sleep(0.05)
+
+    assert logger.log.call_count == 2
+    assert logger.log.call_args.args[:4] == (
+        logging.WARNING,
+        "%d more %s messages from SmartCloudAge %s in %.0f s",
+        2,
+        "invalid payload",
+    )
+    assert not limiter._windows
+
+
+def test_windows_are_per_controller_and_per_kind():
+    """Conditions of other controllers or classes are never suppressed."""
+    logger, limiter = _limiter()
+
+    assert limiter.log(logging.WARNING, "controller-01", "invalid payload", "a", now=0.0)
+    assert limiter.log(logging.WARNING, "controller-02", "invalid payload", "b", now=0.0)
+    assert limiter.log(logging.WARNING, "controller-01", "unhandled frame", "c", now=0.0)
+    assert logger.log.call_count == 3
+
+
+def test_quiet_window_logs_without_summary():
+    """A condition that did not repeat is logged again without a summary."""
+    logger, limiter = _limiter()
+
+    limiter.log(logging.WARNING, "controller-01", "invalid payload", "a", now=0.0)
+    limiter.log(logging.WARNING, "controller-01", "invalid payload", "a", now=120.0)
+
+    assert [call.args[1] for call in logger.log.call_args_list] == ["a", "a"]
+
+
+def test_disabled_level_is_neither_logged_nor_counted():
+    """Messages below the logger level cost no formatting or bookkeeping."""
+    logger, limiter = _limiter()
+    logger.isEnabledFor.return_value = False
+
+    assert not limiter.warning("controller-01", "invalid payload", "a")
+    logger.log.assert_not_called()
+    assert not limiter._windows
+
+
+async def test_forget_restarts_the_window():
+    """A removed controller starts from a fresh window and is not summarized."""
+    logger, limiter = _limiter(interval=0.01)
+
+    limiter.warning("controller-01", "invalid payload", "a")
+    limiter.warning("controller-01", "invalid payload", "a")
+    limiter.forget("controller-01")
+    await asyncio.sleep(0.05)
+
+    assert logger.log.call_count == 1
+    assert limiter.warning("controller-01", "invalid payload", "a")
@@ -0,0 +1,29 @@
+"""Tests for searchable, paged choice lists."""
+
+from __future__ import annotations
+
+from custom_components.smartcloudage.paging import ChoiceIndex
+
+
+def test_pages_cover_the_list_and_clamp():
+    """Pages split the list and out-of-range pages are clamped."""
+    index = ChoiceIndex([f"Controladora {number}" for number in range(45)], 20)
+
+    first = index.page()
+    last = index.page(page=7)
+
+    assert list(first.choices) == list(range(20))
+    assert (first.pages, first.total) == (3, 45)
+    assert last.page == 2
+    assert list(last.choices) == list(range(40, 45))
+
+
+def test_search_is_case_insensitive_and_keeps_item_indexes():
+    """Matches keep the index of the item in the full list."""
+    index = ChoiceIndex(["Bloco A (c-1)", "Bloco B (c-2)", "Portaria (c-3)"])
+
+    result = index.page("bloco b")
+
+    assert result.choices == {1: "Bloco B (c-2)"}
+    assert index.page("garagem").total == 0
+    assert index.page("garagem").pages == 1
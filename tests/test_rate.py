@@ -0,0 +1,48 @@
+"""Tests for pulse rate smoothing."""
+
+from __future__ import annotations
+
+from custom_components.smartcloudage.rate import PulseRate
+
+
+def test_first_sample_has_no_rate():
+    """A rate needs at least two samples."""
+    rate = PulseRate(60)
+
+    assert rate.add(100, 0.0) is None
+
+
+def test_rate_spans_the_window():
+    """Older samples outside the window are skipped."""
+    rate = PulseRate(60)
+    rate.add(0, 0.0)
+    rate.add(100, 30.0)
+    rate.add(200, 60.0)
+
+    assert rate.add(500, 90.0) == 400 / 60
+
+
+def test_short_history_uses_the_oldest_sample():
+    """Before the window is filled the rate covers every sample."""
+    rate = PulseRate(60)
+    rate.add(0, 0.0)
+
+    assert rate.add(50, 10.0) == 5.0
+
+
+def test_ring_buffer_overwrites_old_samples():
+    """The buffer keeps a fixed number of samples."""
+    rate = PulseRate(3600, size=4)
+    for second in range(10):
+        value = rate.add(second * 10, float(second))
+
+    # Only the samples from seconds 6 to 9 remain.
+    assert value == 10.0
+
+
+def test_repeated_timestamp_is_ignored():
+    """Samples without elapsed time do not produce a rate."""
+    rate = PulseRate(60, size=2)
+    rate.add(0, 5.0)
+
+    assert rate.add(10, 5.0) is None
@@ -0,0 +1,139 @@
+"""Tests for incremental reconciliation of options changes."""
+
+from __future__ import annotations
+
+import copy
+from unittest.mock import patch
+
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+from custom_components.smartcloudage.reconcile import (
+    diff_devices,
+    diff_meters,
+    settings_changed,
+)
+
+from .fleet import async_setup_fleet, fleet_devices, pulse_payload
+
+
+def test_diff_devices_by_controller_id():
+    """Controllers are matched by ID regardless of their position."""
+    old = fleet_devices(3, meters=1)
+    new = copy.deepcopy(old[1:]) + fleet_devices(4, meters=1)[3:]
+    new[0]["alias"] = "Renomeada"
+
+    changes = diff_devices(old, new)
+
+    assert [device["device_id"] for device in changes.added] == ["controller-0003"]
+    assert [device["device_id"] for device in changes.removed] == ["controller-0000"]
+    assert [new["alias"] for _, new in changes.changed] == ["Renomeada"]
+    assert not diff_devices(old, copy.deepcopy(old))
+
+
+def test_diff_meters_reports_edited_meters_on_both_sides():
+    """An edited meter is removed and recreated; untouched meters are kept."""
+    old = fleet_devices(1, meters=3)[0]
+    new = copy.deepcopy(old)
+    new["meters"][1]["factor"] = 0.1
+    del new["meters"][2]
+    new["meters"].append({**old["meters"][0], "channel": 5})
+
+    removed, added = diff_meters(old, new)
+
+    assert removed == {2, 3}
+    assert sorted(meter["channel"] for meter in added) == [2, 5]
+
+
+def test_settings_changed_ignores_devices():
+    """Only entry-wide settings force a reload."""
+    assert not settings_changed({"devices": []}, {"devices": [{"device_id": "x"}]})
+    assert settings_changed({"fleet_mode": False}, {"fleet_mode": True})
+    assert settings_changed({}, {"rate_window": 0})
+
+
+async def test_adding_a_meter_keeps_other_entities(hass, mqtt_subscriptions):
+    """A new meter is added without reloading the entry or its controllers."""
+    devices = fleet_devices(2, meters=1)
+    entry = await async_setup_fleet(hass, devices)
+    mqtt_subscriptions.fire(
+        "CloudAge/controller-0000/OutTopic/pulses",
+        pulse_payload("controller-0000", 10, 1),
+    )
+    await hass.async_block_till_done()
+    registry = er.async_get(hass)
+    kept = registry.async_get_entity_id(
+        "sensor", "smartcloudage", "smartcloudage_controller-0000_pulse_1"
+    )
+    kept_state = hass.states.get(kept)
+
+    new_devices = copy.deepcopy(devices)
+    new_devices[0]["meters"].append({**devices[0]["meters"][0], "channel": 2})
+    with patch.object(hass.config_entries, "async_reload") as reload:
+        hass.config_entries.async_update_entry(
+            entry, options={**entry.options, "devices": new_devices}
+        )
+        await hass.async_block_till_done()
+
+    reload.assert_not_called()
+    assert registry.async_get_entity_id(
+        "sensor", "smartcloudage", "smartcloudage_controller-0000_pulse_2"
+    )
+    assert hass.states.get(kept) is kept_state
+    assert entry.runtime_data.controllers["controller-0000"].pulse(1) == 10
+
+
+async def test_removing_a_controller_removes_only_its_entities(
+    hass, mqtt_subscriptions
+):
+    """A removed controller loses its entities, device, subscription and RTC slot."""
+    devices = fleet_devices(2, meters=1)
+    entry = await async_setup_fleet(hass, devices)
+    registry = er.async_get(hass)
+    device_registry = dr.async_get(hass)
+    assert device_registry.async_get_device(
+        identifiers={("smartcloudage", "controller-0000")}
+    )
+
+    hass.config_entries.async_update_entry(
+        entry, options={**entry.options, "devices": devices[1:]}
+    )
+    await hass.async_block_till_done()
+
+    assert not registry.async_get_entity_id(
+        "sensor", "smartcloudage", "smartcloudage_controller-0000_pulse_1"
+    )
+    assert registry.async_get_entity_id(
+        "sensor", "smartcloudage", "smartcloudage_controller-0001_pulse_1"
+    )
+    assert "controller-0000" not in entry.runtime_data.controllers
+    assert list(entry.runtime_data.rtc.device_ids) == ["controller-0001"]
+    assert [topic for topic, _ in mqtt_subscriptions.subscriptions] == [
+        "+/controller-0001/#"
+    ]
+    assert not device_registry.async_get_device(
+        identifiers={("smartcloudage", "controller-0000")}
+    )
+    assert device_registry.async_get_device(
+        identifiers={("smartcloudage", "controller-0001")}
+    )
+
+
+async def test_renaming_a_controller_replaces_its_switches(hass, mqtt_subscriptions):
+    """Switches keyed by the old alias are purged and recreated under the new one."""
+    devices = fleet_devices(1, meters=0)
+    entry = await async_setup_fleet(hass, devices)
+    registry = er.async_get(hass)
+    renamed = copy.deepcopy(devices)
+    renamed[0]["alias"] = "Renomeada"
+
+    hass.config_entries.async_update_entry(
+        entry, options={**entry.options, "devices": renamed}
+    )
+    await hass.async_block_till_done()
+
+    assert not registry.async_get_entity_id(
+        "switch", "smartcloudage", "smartcloudage_output_Controladora 0_1"
+    )
+    assert registry.async_get_entity_id(
+        "switch", "smartcloudage", "smartcloudage_output_Renomeada_1"
+    )
@@ -0,0 +1,86 @@
+"""Tests of the SmartCloudAge MQTT capture replay harness.
+
+Replay a field capture with::
+
+    pytest -m benchmark -s tests/test_replay.py --replay-capture capture.jsonl --replay-speed 10
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from homeassistant.helpers import entity_registry as er
+import pytest
+
+from .fleet import async_setup_fleet
+from .replay import async_replay_capture, infer_devices, load_capture
+
+SAMPLE_CAPTURE = Path(__file__).parent / "fixtures" / "capture.jsonl"
+
+
+def test_load_capture_orders_frames_and_infers_devices():
+    """The sample capture yields both controllers and their pulse channels."""
+    frames = load_capture(SAMPLE_CAPTURE)
+
+    assert [frame.timestamp for frame in frames] == sorted(
+        frame.timestamp for frame in frames
+    )
+    devices = {device["device_id"]: device for device in infer_devices(frames)}
+    assert set(devices) == {"controller-01", "controller-02"}
+    assert [meter["channel"] for meter in devices["controller-01"]["meters"]] == [1, 2]
+
+
+async def test_replay_sample_capture_as_fast_as_possible(hass, mqtt_subscriptions):
+    """Replaying the sample capture leaves the last counters and outputs in HA."""
+    frames = load_capture(SAMPLE_CAPTURE)
+    entry = await async_setup_fleet(hass, infer_devices(frames, outputs=2))
+
+    report = await async_replay_capture(hass, mqtt_subscriptions, entry, frames)
+
+    registry = er.async_get(hass)
+    pulse_1 = registry.async_get_entity_id(
+        "sensor", "smartcloudage", "smartcloudage_controller-01_pulse_1"
+    )
+    pulse_2 = registry.async_get_entity_id(
+        "sensor", "smartcloudage", "smartcloudage_controller-02_pulse_2"
+    )
+    assert report.frames == len(frames)
+    assert report.state_writes > 0
+    assert float(report.states[pulse_1]) == 106
+    assert float(report.states[pulse_2]) == (1 << 16) | 60
+
+
+async def test_replay_accelerated_follows_capture_timing(hass, mqtt_subscriptions):
+    """An accelerated replay takes the capture span divided by the speed."""
+    frames = load_capture(SAMPLE_CAPTURE)
+    entry = await async_setup_fleet(hass, infer_devices(frames))
+    speed = 50.0
+
+    report = await async_replay_capture(
+        hass, mqtt_subscriptions, entry, frames, speed=speed
+    )
+
+    span = frames[-1].timestamp - frames[0].timestamp
+    assert report.elapsed >= span / speed * 0.9
+    assert report.loop_lag
+
+
+@pytest.mark.benchmark
+async def test_replay_capture_file(hass, mqtt_subscriptions, request):
+    """Replay the capture given on the command line and print the report."""
+    path = request.config.getoption("--replay-capture")
+    if not path:
+        pytest.skip("pass --replay-capture to replay a field capture")
+    frames = load_capture(path)
+    entry = await async_setup_fleet(hass, infer_devices(frames))
+
+    report = await async_replay_capture(
+        hass,
+        mqtt_subscriptions,
+        entry,
+        frames,
+        speed=request.config.getoption("--replay-speed"),
+    )
+    print("\n" + report.summary())
+
+    assert report.frames == len(frames)
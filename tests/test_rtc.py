@@ -0,0 +1,186 @@
+"""Tests for the SmartCloudAge RTC synchronization scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+from custom_components.smartcloudage.decoder import TelemetryFrame
+from custom_components.smartcloudage.rtc import (
+    RTC_MAX_INTERVAL_ROUNDS,
+    RtcSyncScheduler,
+    controller_clock_drift,
+    rtc_slot,
+)
+
+
+def _devices(count: int):
+    return [(f"controller-{index:03d}", f"controller-{index:03d}") for index in range(count)]
+
+
+def test_rtc_slot_is_deterministic_and_spread():
+    """Controllers keep their slot across restarts and use every slot."""
+    slots = {rtc_slot(device_id, 20) for device_id, _ in _devices(500)}
+
+    assert rtc_slot("controller-01", 20) == rtc_slot("controller-01", 20)
+    assert slots == set(range(20))
+
+
+async def test_sync_all_bounds_concurrency(hass):
+    """A full round never exceeds the configured number of in-flight publishes."""
+    in_flight = 0
+    peak = 0
+    published = []
+
+    async def publish(device_id, signature):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        published.append(device_id)
+        in_flight -= 1
+
+    scheduler = RtcSyncScheduler(
+        hass, _devices(50), publish, timedelta(minutes=5), max_concurrency=4
+    )
+    await scheduler.async_sync_all()
+
+    assert len(published) == 50
+    assert peak == 4
+    assert scheduler.last_round_duration is not None
+
+
+async def test_ticks_publish_each_controller_once_per_round(hass):
+    """Walking through every slot synchronizes each controller exactly once."""
+    published = []
+
+    async def publish(device_id, signature):
+        published.append(device_id)
+
+    scheduler = RtcSyncScheduler(
+        hass, _devices(100), publish, timedelta(minutes=5), slots=10
+    )
+    for _ in range(10):
+        await scheduler._async_tick(None)
+
+    assert sorted(published) == [device_id for device_id, _ in _devices(100)]
+    assert scheduler.last_round_duration is not None
+
+
+async def test_failed_publish_does_not_abort_round(hass, caplog):
+    """One unreachable controller does not prevent the others from syncing."""
+    published = []
+
+    async def publish(device_id, signature):
+        if device_id == "controller-000":
+            raise RuntimeError("broker unavailable")
+        published.append(device_id)
+
+    scheduler = RtcSyncScheduler(hass, _devices(3), publish, timedelta(minutes=5))
+    await scheduler.async_sync_all()
+
+    assert len(published) == 2
+    assert "RTC sync failed for controller-000" in caplog.text
+
+
+async def test_controller_removed_mid_round_is_skipped(hass, caplog):
+    """A controller removed while its round is running is not published."""
+    published = []
+    scheduler = None
+
+    async def publish(device_id, signature):
+        if not published:
+            scheduler.async_remove_device("controller-002")
+        published.append(device_id)
+        await asyncio.sleep(0)
+
+    scheduler = RtcSyncScheduler(
+        hass, _devices(3), publish, timedelta(minutes=5), max_concurrency=1
+    )
+    await scheduler.async_sync_all()
+
+    assert "controller-002" not in published
+    assert len(published) == 2
+    assert "RTC sync failed" not in caplog.text
+
+
+def _clock_frame(offset_seconds: float) -> dict:
+    now = datetime.now() + timedelta(seconds=offset_seconds)
+    return {
+        "datetime": {
+            "day": now.day,
+            "mon": now.month,
+            "year": now.year,
+            "hour": now.hour,
+            "min": now.minute,
+            "sec": now.second,
+        }
+    }
+
+
+def test_controller_clock_drift_reads_datetime_and_ignores_own_commands():
+    """Drift comes from controller clocks, never from echoed RTC commands."""
+    assert abs(controller_clock_drift(_clock_frame(-30)) + 30) < 2
+    assert controller_clock_drift({"Wifi_db": -70}) is None
+    assert (
+        controller_clock_drift(
+            {"command": 9, "type": 1, "payload": _clock_frame(-30)}
+        )
+        is None
+    )
+
+
+async def _run_round(scheduler, slots):
+    for _ in range(slots):
+        await scheduler._async_tick(None)
+
+
+async def test_stable_clock_backs_off_and_drift_tightens(hass):
+    """Stable clocks are synced less often until they drift again."""
+    published = []
+
+    async def publish(device_id, signature):
+        published.append(device_id)
+
+    scheduler = RtcSyncScheduler(
+        hass, [("controller-01", "controller-01")], publish, timedelta(minutes=5), slots=1
+    )
+    for _ in range(2 * RTC_MAX_INTERVAL_ROUNDS):
+        scheduler.async_frame_received(
+            "controller-01", TelemetryFrame("", data=_clock_frame(0))
+        )
+        await _run_round(scheduler, 1)
+
+    assert scheduler.sync_interval("controller-01") == timedelta(
+        minutes=5 * RTC_MAX_INTERVAL_ROUNDS
+    )
+    assert len(published) < 10
+
+    scheduler.async_frame_received(
+        "controller-01", TelemetryFrame("", data=_clock_frame(-30))
+    )
+    assert scheduler.sync_interval("controller-01") == timedelta(minutes=5)
+
+
+async def test_restart_restores_base_interval(hass):
+    """A controller restart makes its next slot visit a sync."""
+    published = []
+
+    async def publish(device_id, signature):
+        published.append(device_id)
+
+    scheduler = RtcSyncScheduler(
+        hass, [("controller-01", "controller-01")], publish, timedelta(minutes=5), slots=1
+    )
+    for _ in range(4):
+        scheduler.async_frame_received(
+            "controller-01", TelemetryFrame("", data=_clock_frame(0))
+        )
+        await _run_round(scheduler, 1)
+    published.clear()
+
+    scheduler.async_device_restarted("controller-01")
+    await _run_round(scheduler, 1)
+
+    assert published == ["controller-01"]
+    assert scheduler.sync_interval("controller-01") == timedelta(minutes=5)
@@ -5,14 +5,29 @@ from __future__ import annotations
 from unittest.mock import Mock
 
 from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
-from homeassistant.const import UnitOfEnergy, UnitOfVolume
+from homeassistant.const import (
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfVolume,
+    UnitOfVolumeFlowRate,
+)
+from homeassistant.helpers import entity_registry as er
 
+from custom_components.smartcloudage.controller import ControllerState
 from custom_components.smartcloudage.sensor import (
     SmartCloudAgePulseSensor,
     SmartCloudAgeRSSISensor,
+    SmartCloudAgeRateSensor,
     SmartCloudAgeUptimeSensor,
     classify_rssi,
 )
+from custom_components.smartcloudage.write_policy import WritePolicy
+
+from .fleet import async_setup_fleet, fleet_devices, pulse_payload
+
+
+def _controller() -> ControllerState:
+    return ControllerState("controller-01", "Bancada")
 
 
 def _meter(meter_type: str, **overrides):
@@ -30,9 +45,7 @@ def _meter(meter_type: str, **overrides):
 
 def test_energy_metadata_uses_native_kwh():
     """Energy meters must be eligible for Home Assistant energy statistics."""
-    sensor = SmartCloudAgePulseSensor(
-        "controller-01", "Bancada", _meter("energy")
-    )
+    sensor = SmartCloudAgePulseSensor(_controller(), _meter("energy"))
 
     assert sensor.device_class is SensorDeviceClass.ENERGY
     assert sensor.state_class is SensorStateClass.TOTAL_INCREASING
@@ -41,12 +54,8 @@ def test_energy_metadata_uses_native_kwh():
 
 def test_water_and_gas_metadata_use_cubic_meters():
     """Volume meters must ignore an incompatible configured unit."""
-    water = SmartCloudAgePulseSensor(
-        "controller-01", "Bancada", _meter("water")
-    )
-    gas = SmartCloudAgePulseSensor(
-        "controller-01", "Bancada", _meter("gas")
-    )
+    water = SmartCloudAgePulseSensor(_controller(), _meter("water"))
+    gas = SmartCloudAgePulseSensor(_controller(), _meter("gas"))
 
     assert water.device_class is SensorDeviceClass.WATER
     assert gas.device_class is SensorDeviceClass.GAS
@@ -57,8 +66,7 @@ def test_water_and_gas_metadata_use_cubic_meters():
 def test_generic_counter_keeps_configured_unit():
     """Generic counters may keep the unit supplied by the user."""
     sensor = SmartCloudAgePulseSensor(
-        "controller-01",
-        "Bancada",
+        _controller(),
         _meter("count", unit="cycles", factor=1),
     )
 
@@ -69,8 +77,7 @@ def test_generic_counter_keeps_configured_unit():
 def test_pulse_conversion_applies_factor_and_offset():
     """The exposed total is raw pulses times factor plus offset."""
     sensor = SmartCloudAgePulseSensor(
-        "controller-01",
-        "Bancada",
+        _controller(),
         _meter("water", factor=0.01, offset=5.502),
     )
     sensor.async_write_ha_state = Mock()
@@ -80,6 +87,7 @@ def test_pulse_conversion_applies_factor_and_offset():
     assert sensor.native_value == 7.582
     assert sensor.extra_state_attributes == {
         "raw_pulses": 208,
+        "accumulated_pulses": 208,
         "pulse_factor": 0.01,
         "offset": 5.502,
         "channel": 9,
@@ -89,9 +97,7 @@ def test_pulse_conversion_applies_factor_and_offset():
 
 def test_unique_id_and_device_registry_identity_are_stable():
     """Entity and device identities must not depend on display names."""
-    sensor = SmartCloudAgePulseSensor(
-        "controller-01", "Bancada", _meter("water", channel=14)
-    )
+    sensor = SmartCloudAgePulseSensor(_controller(), _meter("water", channel=14))
 
     assert sensor.unique_id == "smartcloudage_controller-01_pulse_14"
     assert sensor.device_info["identifiers"] == {
@@ -110,7 +116,7 @@ def test_rssi_classification_thresholds():
 
 def test_rssi_alarm_attributes_and_state_update(caplog):
     """Poor RSSI exposes an alarm and logs only when its range changes."""
-    sensor = SmartCloudAgeRSSISensor("controller-01", "Bancada")
+    sensor = SmartCloudAgeRSSISensor(_controller())
     sensor.async_write_ha_state = Mock()
 
     sensor.update_rssi(-78)
@@ -127,7 +133,7 @@ def test_rssi_alarm_attributes_and_state_update(caplog):
 
 def test_rssi_recovery_is_reported(caplog):
     """Recovery from a signal alarm is logged once."""
-    sensor = SmartCloudAgeRSSISensor("controller-01", "Bancada")
+    sensor = SmartCloudAgeRSSISensor(_controller())
     sensor.async_write_ha_state = Mock()
 
     sensor.update_rssi(-90)
@@ -137,9 +143,23 @@ def test_rssi_recovery_is_reported(caplog):
     assert "SmartCloudAge Bancada Wi-Fi signal recovered: -65 dBm (good)" in caplog.messages
 
 
+def test_rssi_flapping_is_logged_once_per_transition(caplog):
+    """A signal flapping around a threshold does not flood the log."""
+    sensor = SmartCloudAgeRSSISensor(_controller())
+    sensor.async_write_ha_state = Mock()
+
+    for _ in range(20):
+        sensor.update_rssi(-76)
+        sensor.update_rssi(-74)
+
+    assert sensor.extra_state_attributes["signal_quality"] == "fair"
+    assert sum("signal is poor" in message for message in caplog.messages) == 1
+    assert sum("signal recovered" in message for message in caplog.messages) == 1
+
+
 def test_uptime_drop_detects_restart(caplog):
     """A lower uptime value indicates that the controller restarted."""
-    sensor = SmartCloudAgeUptimeSensor("controller-01", "Bancada")
+    sensor = SmartCloudAgeUptimeSensor(_controller())
     sensor.async_write_ha_state = Mock()
 
     sensor.update_uptime(3121)
@@ -150,3 +170,142 @@ def test_uptime_drop_detects_restart(caplog):
         "SmartCloudAge Bancada restarted: uptime dropped from 3121 to 7 seconds"
         in caplog.messages
     )
+
+
+def test_unchanged_pulse_count_is_not_rewritten():
+    """Repeated frames with the same counter do not write state again."""
+    sensor = SmartCloudAgePulseSensor(_controller(), _meter("water"))
+    sensor.async_write_ha_state = Mock()
+
+    sensor.update_pulses(208)
+    sensor.update_pulses(208)
+    sensor.update_pulses(209)
+
+    assert sensor.async_write_ha_state.call_count == 2
+
+
+def test_uptime_is_written_at_configured_granularity():
+    """Uptime increments inside the deadband are suppressed, restarts are not."""
+    sensor = SmartCloudAgeUptimeSensor(_controller(), WritePolicy(deadband=60))
+    sensor.async_write_ha_state = Mock()
+
+    sensor.update_uptime(100)
+    sensor.update_uptime(130)
+    sensor.update_uptime(161)
+    sensor.update_uptime(5)
+
+    assert sensor.native_value == 5
+    assert sensor.async_write_ha_state.call_count == 3
+
+
+def test_entities_of_a_controller_share_its_state():
+    """Pulse and diagnostic entities are views over one controller record."""
+    controller = _controller()
+    water = SmartCloudAgePulseSensor(controller, _meter("water", channel=1))
+    gas = SmartCloudAgePulseSensor(controller, _meter("gas", channel=2))
+    rssi = SmartCloudAgeRSSISensor(controller)
+    for sensor in (water, gas, rssi):
+        sensor.async_write_ha_state = Mock()
+
+    water.update_pulses(100)
+    rssi.update_rssi(-70)
+
+    assert controller.pulse(1) == 100
+    assert controller.pulse(2) is None
+    assert gas.native_value is None
+    assert controller.rssi == -70
+    assert water.device_info is gas.device_info is rssi.device_info
+
+
+def test_pulse_total_survives_wraparound_and_restart():
+    """Counter wraparounds and reboot resets never decrease the total."""
+    controller = _controller()
+    pulses = SmartCloudAgePulseSensor(controller, _meter("count", factor=1, offset=0))
+    uptime = SmartCloudAgeUptimeSensor(controller)
+    pulses.async_write_ha_state = Mock()
+    uptime.async_write_ha_state = Mock()
+
+    uptime.update_uptime(1000)
+    pulses.update_pulses(0xFFFF_FFF0)
+    pulses.update_pulses(0x10)
+    assert pulses.native_value == 0xFFFF_FFF0 + 0x20
+
+    uptime.update_uptime(5)
+    pulses.update_pulses(3)
+    assert pulses.native_value == 0xFFFF_FFF0 + 0x23
+    assert pulses.extra_state_attributes["raw_pulses"] == 3
+
+
+def test_rate_sensor_units_follow_meter_type():
+    """Volume meters expose L/min and energy meters expose kW."""
+    water = SmartCloudAgeRateSensor(_controller(), _meter("water"), 60)
+    energy = SmartCloudAgeRateSensor(_controller(), _meter("energy"), 60)
+
+    assert water.device_class is SensorDeviceClass.VOLUME_FLOW_RATE
+    assert water.native_unit_of_measurement == UnitOfVolumeFlowRate.LITERS_PER_MINUTE
+    assert energy.device_class is SensorDeviceClass.POWER
+    assert energy.native_unit_of_measurement == UnitOfPower.KILO_WATT
+    assert energy.state_class is SensorStateClass.MEASUREMENT
+    assert energy.unique_id == "smartcloudage_controller-01_rate_9"
+
+
+def test_rate_sensor_converts_pulse_delta_and_applies_deadband():
+    """The rate is (delta pulses x factor) / delta t, written outside the deadband."""
+    sensor = SmartCloudAgeRateSensor(
+        _controller(),
+        _meter("energy", factor=0.001),
+        60,
+        WritePolicy(deadband=0.5),
+    )
+    sensor.async_write_ha_state = Mock()
+
+    sensor.update_rate(0, 0.0)
+    sensor.update_rate(10, 10.0)
+    sensor.update_rate(20, 20.0)
+    sensor.update_rate(60, 30.0)
+
+    # 1 pulse/s of 0.001 kWh is 3.6 kW; the repeated 3.6 kW is not rewritten.
+    assert sensor.async_write_ha_state.call_count == 2
+    assert sensor.native_value == 7.2
+
+
+async def test_rate_sensors_are_disabled_by_default(hass, mqtt_subscriptions):
+    """Rate entities are registered disabled and pulse frames skip them."""
+    entry = await async_setup_fleet(hass, fleet_devices(1, meters=1))
+    registry = er.async_get(hass)
+    rate = registry.async_get(
+        registry.async_get_entity_id(
+            "sensor", "smartcloudage", "smartcloudage_controller-0000_rate_1"
+        )
+    )
+    assert rate.disabled_by is er.RegistryEntryDisabler.INTEGRATION
+
+    for sequence in (1, 2):
+        mqtt_subscriptions.fire(
+            "CloudAge/controller-0000/OutTopic/pulses",
+            pulse_payload("controller-0000", sequence, 1),
+        )
+    await hass.async_block_till_done()
+
+    assert hass.states.get(rate.entity_id) is None
+    assert entry.runtime_data.controllers["controller-0000"].pulse(1) == 2
+
+
+def test_restored_state_is_shown_without_rewriting_it(caplog):
+    """Entities built from a restored snapshot start at the last known values."""
+    controller = _controller()
+    controller.restore_state({"pulses": {"9": [208, 208]}, "rssi": -80, "uptime": 60})
+    pulses = SmartCloudAgePulseSensor(controller, _meter("water"))
+    rssi = SmartCloudAgeRSSISensor(controller)
+    pulses.async_write_ha_state = Mock()
+    rssi.async_write_ha_state = Mock()
+
+    assert pulses.native_value == 7.582
+    assert rssi.extra_state_attributes["signal_quality"] == "poor"
+
+    pulses.update_pulses(208)
+    rssi.update_rssi(-80)
+
+    pulses.async_write_ha_state.assert_not_called()
+    rssi.async_write_ha_state.assert_not_called()
+    assert "signal is poor" not in caplog.text
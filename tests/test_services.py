@@ -0,0 +1,102 @@
+"""Tests for SmartCloudAge service actions."""
+
+from __future__ import annotations
+
+import json
+
+from homeassistant.exceptions import ServiceValidationError
+import pytest
+
+from custom_components.smartcloudage.services import (
+    SERVICE_IMPORT_DEVICES,
+    SERVICE_SET_OUTPUTS,
+    requested_outputs,
+)
+
+from .fleet import async_setup_fleet, fleet_devices
+
+
+def test_requested_outputs_from_mask_and_list():
+    """Masks cover every configured output; lists switch only the given ones."""
+    assert requested_outputs({"device_id": "c", "mask": 0b101}, 4) == {
+        0: 1,
+        1: 0,
+        2: 1,
+        3: 0,
+    }
+    assert requested_outputs(
+        {"device_id": "c", "outputs": [2, 4], "state": False}, 4
+    ) == {1: 0, 3: 0}
+    with pytest.raises(ServiceValidationError):
+        requested_outputs({"device_id": "c", "outputs": [5], "state": True}, 4)
+
+
+async def test_set_outputs_sends_one_burst(hass, mqtt_subscriptions, mock_mqtt_publish):
+    """The service switches several outputs, confirmed by the next status frame."""
+    await async_setup_fleet(hass, fleet_devices(1, meters=0, outputs=4))
+    mock_mqtt_publish.reset_mock()
+
+    await hass.services.async_call(
+        "smartcloudage",
+        SERVICE_SET_OUTPUTS,
+        {"device_id": "controller-0000", "outputs": [1, 3]},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    sent = [
+        json.loads(call.args[2])["payload"] for call in mock_mqtt_publish.call_args_list
+    ]
+    assert sent == [{"id": 1, "value": 1}, {"id": 3, "value": 1}]
+
+    mqtt_subscriptions.fire(
+        "CloudAge/controller-0000/OutTopic/status",
+        json.dumps({"Output": {"Outputs": 0b0101}}),
+    )
+    await hass.async_block_till_done()
+    on = [
+        state.entity_id
+        for state in hass.states.async_all("switch")
+        if state.state == "on"
+    ]
+    assert len(on) == 2
+
+
+async def test_set_outputs_rejects_unknown_controller(hass, mqtt_subscriptions):
+    """Calls for controllers of no loaded entry are rejected."""
+    await async_setup_fleet(hass, fleet_devices(1, meters=0, outputs=4))
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            "smartcloudage",
+            SERVICE_SET_OUTPUTS,
+            {"device_id": "missing", "mask": 1},
+            blocking=True,
+        )
+
+
+async def test_import_devices_adds_controllers_to_an_entry(hass, mqtt_subscriptions):
+    """Imported controllers join a loaded entry; duplicates are rejected."""
+    entry = await async_setup_fleet(hass, fleet_devices(1, meters=1))
+    document = "device_id,alias,outputs,channel,type,factor\ncontroller-9000,Nova,10,1,gas,0.01\n"
+
+    await hass.services.async_call(
+        "smartcloudage",
+        SERVICE_IMPORT_DEVICES,
+        {"devices": document, "format": "csv", "config_entry_id": entry.entry_id},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    assert [device["device_id"] for device in entry.options["devices"]] == [
+        "controller-0000",
+        "controller-9000",
+    ]
+    assert "controller-9000" in entry.runtime_data.controllers
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            "smartcloudage",
+            SERVICE_IMPORT_DEVICES,
+            {"devices": document, "format": "csv"},
+            blocking=True,
+        )
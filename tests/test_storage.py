@@ -0,0 +1,49 @@
+"""Tests for SmartCloudAge pulse accumulator persistence."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.smartcloudage.controller import ControllerState
+from custom_components.smartcloudage.storage import PULSE_SAVE_DELAY, PulseStore
+
+
+async def test_pulse_store_debounces_and_restores(hass, hass_storage):
+    """Many updates produce a single delayed write that a new run restores."""
+    controllers = {"controller-01": ControllerState("controller-01")}
+    store = PulseStore(hass, "entry", controllers)
+
+    for raw in range(1, 101):
+        controllers["controller-01"].set_pulse(4, raw)
+        store.async_schedule_save()
+    assert "smartcloudage.entry.pulses" not in hass_storage
+
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=PULSE_SAVE_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+    assert hass_storage["smartcloudage.entry.pulses"]["data"] == {
+        "controllers": {"controller-01": {"pulses": {"4": [100, 100]}}}
+    }
+
+    restored = {"controller-01": ControllerState("controller-01")}
+    await PulseStore(hass, "entry", restored).async_load()
+    assert restored["controller-01"].pulse(4) == 100
+
+
+async def test_snapshot_restores_outputs_and_diagnostics(hass, hass_storage):
+    """One load restores every controller field kept in the snapshot."""
+    controllers = {"controller-01": ControllerState("controller-01")}
+    controllers["controller-01"].outputs = 0b11
+    controllers["controller-01"].rssi = -58
+    await PulseStore(hass, "entry", controllers).async_save()
+
+    restored = {"controller-01": ControllerState("controller-01")}
+    await PulseStore(hass, "entry", restored).async_load()
+
+    assert restored["controller-01"].outputs == 0b11
+    assert restored["controller-01"].rssi == -58
+    assert restored["controller-01"].uptime is None
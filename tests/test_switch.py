@@ -0,0 +1,104 @@
+"""Tests for SmartCloudAge output switches."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from unittest.mock import Mock, patch
+
+from custom_components.smartcloudage.commands import OutputCommandBatcher
+from custom_components.smartcloudage.controller import build_controller_states
+from custom_components.smartcloudage.dispatcher import SmartCloudAgeDispatcher
+from custom_components.smartcloudage.switch import (
+    SmartCloudOutputSwitch,
+    async_setup_entry,
+)
+
+
+async def _setup_switches(hass, outputs=4):
+    dispatcher = SmartCloudAgeDispatcher(hass)
+    devices = [{"device_id": "controller-01", "alias": "Bancada", "outputs": outputs}]
+    entry = Mock(
+        options={"devices": devices},
+        runtime_data=Mock(
+            dispatcher=dispatcher,
+            stats=dispatcher.stats,
+            commands=OutputCommandBatcher(hass, dispatcher.stats, window=0),
+            controllers=build_controller_states(devices),
+        ),
+    )
+    entities = []
+    await async_setup_entry(hass, entry, entities.extend)
+    return dispatcher, entities
+
+
+def _status(dispatcher, outputs):
+    dispatcher._async_message_received(
+        Mock(
+            topic="CloudAge/controller-01/OutTopic/status",
+            payload=json.dumps({"Output": {"Outputs": outputs}}).encode(),
+        )
+    )
+
+
+async def test_status_frame_writes_only_changed_outputs(hass):
+    """Only outputs whose bit flipped are written to the state machine."""
+    dispatcher, entities = await _setup_switches(hass)
+
+    with patch.object(SmartCloudOutputSwitch, "async_write_ha_state") as write:
+        _status(dispatcher, 0b0101)
+        assert write.call_count == 2
+
+        write.reset_mock()
+        _status(dispatcher, 0b0110)
+        assert write.call_count == 2
+
+    assert [entity.is_on for entity in entities] == [False, True, True, False]
+
+
+async def test_unchanged_status_frame_is_skipped(hass):
+    """A repeated bitmask does not produce any state write."""
+    dispatcher, _ = await _setup_switches(hass)
+
+    with patch.object(SmartCloudOutputSwitch, "async_write_ha_state") as write:
+        _status(dispatcher, 0b0011)
+        write.reset_mock()
+        _status(dispatcher, 0b0011)
+
+    write.assert_not_called()
+
+
+async def test_toggle_waits_for_status_confirmation(hass):
+    """A command changes the state only once a status frame confirms it."""
+    dispatcher, entities = await _setup_switches(hass)
+    commands = entities[0]._commands
+
+    with patch.object(SmartCloudOutputSwitch, "async_write_ha_state") as write:
+        await entities[0].async_turn_on()
+        assert entities[0].is_on is False
+        assert commands.in_flight("controller-01") == {0: 1}
+        write.assert_not_called()
+
+        _status(dispatcher, 0b0001)
+
+    assert entities[0].is_on is True
+    assert commands.in_flight("controller-01") == {}
+    write.assert_called_once_with()
+
+
+async def test_concurrent_commands_are_coalesced(hass, mock_mqtt_publish):
+    """Commands issued together are merged, the latest request per output wins."""
+    _, entities = await _setup_switches(hass)
+
+    await asyncio.gather(
+        entities[0].async_turn_on(),
+        entities[2].async_turn_on(),
+        entities[0].async_turn_off(),
+    )
+
+    sent = [
+        json.loads(call.args[2])["payload"] for call in mock_mqtt_publish.call_args_list
+    ]
+    assert sent == [{"id": 1, "value": 0}, {"id": 3, "value": 1}]
+    assert entities[0]._commands.in_flight("controller-01") == {0: 0, 2: 1}
+    entities[0]._commands.async_cancel()
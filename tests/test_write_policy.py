@@ -0,0 +1,93 @@
+"""Tests for SmartCloudAge state-write policies."""
+
+from __future__ import annotations
+
+from custom_components.smartcloudage.stats import IntegrationStats
+from custom_components.smartcloudage.write_policy import (
+    CONF_HEARTBEAT_MINUTES,
+    CONF_RSSI_DEADBAND,
+    WritePolicy,
+    WriteThrottle,
+    write_policy_from_options,
+)
+
+
+def test_first_value_is_always_written():
+    """An entity without a previous write publishes its first value."""
+    throttle = WriteThrottle(WritePolicy(deadband=10, min_interval=60))
+
+    assert throttle.should_write(5, now=0) is True
+
+
+def test_unchanged_value_is_suppressed():
+    """The default policy writes only when the value changes."""
+    throttle = WriteThrottle(WritePolicy())
+
+    assert throttle.should_write(208, now=0) is True
+    assert throttle.should_write(208, now=1) is False
+    assert throttle.should_write(209, now=2) is True
+
+
+def test_deadband_is_measured_against_last_written_value():
+    """Slow drift is written once it leaves the deadband of the last write."""
+    throttle = WriteThrottle(WritePolicy(deadband=2))
+
+    assert throttle.should_write(-70, now=0) is True
+    assert throttle.should_write(-72, now=1) is False
+    assert throttle.should_write(-73, now=2) is True
+
+
+def test_min_interval_and_force():
+    """Writes inside the minimum interval are dropped unless forced."""
+    throttle = WriteThrottle(WritePolicy(min_interval=30))
+
+    assert throttle.should_write(1, now=0) is True
+    assert throttle.should_write(2, now=10) is False
+    assert throttle.should_write(3, now=20, force=True) is True
+    assert throttle.should_write(4, now=50) is True
+
+
+def test_heartbeat_forces_periodic_write():
+    """An unchanged value is written again once the heartbeat expires."""
+    throttle = WriteThrottle(WritePolicy(deadband=60, heartbeat=600))
+
+    assert throttle.should_write(100, now=0) is True
+    assert throttle.should_write(130, now=599) is False
+    assert throttle.should_write(130, now=600) is True
+
+
+def test_policy_from_options():
+    """Entry options configure deadbands and the heartbeat in minutes."""
+    policy = write_policy_from_options(
+        {CONF_RSSI_DEADBAND: 3, CONF_HEARTBEAT_MINUTES: 0},
+        CONF_RSSI_DEADBAND,
+        2,
+    )
+
+    assert policy == WritePolicy(deadband=3, min_interval=0, heartbeat=None)
+
+
+def test_throttle_counts_issued_and_suppressed_writes():
+    """Decisions are reported to the entry counters."""
+    stats = IntegrationStats()
+    throttle = WriteThrottle(WritePolicy(deadband=2), stats)
+
+    throttle.should_write(10, now=0)
+    throttle.should_write(11, now=1)
+    throttle.should_write(20, now=2)
+
+    assert stats.state_writes == 2
+    assert stats.state_writes_suppressed == 1
+
+
+def test_primed_value_counts_as_written():
+    """A restored value suppresses an identical first update."""
+    stats = IntegrationStats()
+    throttle = WriteThrottle(WritePolicy(deadband=2), stats)
+
+    throttle.prime(None, now=0)
+    throttle.prime(-60, now=0)
+
+    assert throttle.should_write(-61, now=1) is False
+    assert throttle.should_write(-65, now=2) is True
+    assert stats.state_writes == 1